@@ -0,0 +1,78 @@
+"""
+
+Measures how long importing each corvid module takes in a fresh interpreter
+(via `python -X importtime`), and checks that heavy dependencies aren't
+imported until they're used.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --max-ms 250
+
+Exits with status 1 if any module imports a deferred dependency, or takes
+longer than `--max-ms` (best of `--repeat` runs) to import.
+
+"""
+
+import sys
+import argparse
+import subprocess
+
+from typing import Dict, List, Tuple
+
+MODULES = [
+    'corvid.table.table',
+    'corvid.table.table_loader',
+    'corvid.util.lists',
+    'corvid.semantic_table.semantic_table',
+    'corvid.table_aggregation.schema_matcher',
+    'corvid.table_aggregation.evaluate',
+    'corvid.table_aggregation.oracle',
+    'corvid.table_filter.table_filter',
+]
+
+# only imported on first use (see `corvid.util.lazy`)
+DEFERRED_DEPENDENCIES = ['scipy', 'fuzzywuzzy']
+
+
+def measure_import(module: str) -> Tuple[float, List[str]]:
+    """Returns the cumulative import time (ms) of `module` in a fresh
+    interpreter, and which of `DEFERRED_DEPENDENCIES` it imported"""
+    code = 'import sys, {0}; print(" ".join(sorted(sys.modules)))' \
+        .format(module)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True, check=True)
+    microseconds = None
+    for line in process.stderr.splitlines():
+        # e.g. 'import time:      1197 |     400586 | corvid.util.lists'
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module:
+            microseconds = int(fields[1].strip())
+    loaded = process.stdout.split()
+    deferred = [d for d in DEFERRED_DEPENDENCIES
+                if any(m == d or m.startswith(d + '.') for m in loaded)]
+    return microseconds / 1000.0, deferred
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Time corvid imports')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='fail if any module takes longer to import')
+    args = parser.parse_args(argv)
+
+    num_failures = 0
+    for module in MODULES:
+        results = [measure_import(module) for _ in range(args.repeat)]
+        best_ms = min(ms for ms, _ in results)
+        deferred = results[0][1]
+        is_failure = bool(deferred) or \
+                     (args.max_ms is not None and best_ms > args.max_ms)
+        num_failures += is_failure
+        print('{:>42}:  {:8.1f} ms{}'.format(
+            module, best_ms,
+            '  imports {}'.format(', '.join(deferred)) if deferred else ''))
+    return 1 if num_failures > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
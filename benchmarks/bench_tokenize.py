@@ -0,0 +1,48 @@
+"""
+
+Microbenchmark of `corvid.util.strings` tokenization against the per-call
+`re.findall` approach (uncompiled pattern looked up on every call) used by
+the other string helpers.
+
+    python -m benchmarks.bench_tokenize
+
+"""
+
+import re
+import random
+import timeit
+
+from corvid.util.strings import TOKEN_PATTERN, tokenize, tokenize_cached, \
+    tokenize_many
+
+
+def tokenize_per_call(s: str):
+    return re.findall(pattern=TOKEN_PATTERN.pattern, string=s)
+
+
+def make_strings(n: int, cardinality: int, seed: int = 0):
+    random.seed(seed)
+    vocab = ['Acc.', 'F1', 'BLEU-4', '92.3%', '0.85±0.02', '1,234',
+             'Smith et al. (2017)', '—', 'ours', 'baseline']
+    distinct = ['{} {}'.format(random.choice(vocab), i)
+                for i in range(cardinality)]
+    return [random.choice(distinct) for _ in range(n)]
+
+
+def main(n: int = 100000, cardinality: int = 1000, number: int = 5):
+    strings = make_strings(n=n, cardinality=cardinality)
+    tokenize_cached.cache_clear()
+    timings = {
+        'per_call_re_findall': lambda: [tokenize_per_call(s) for s in strings],
+        'tokenize': lambda: [tokenize(s) for s in strings],
+        'tokenize_cached': lambda: [tokenize_cached(s) for s in strings],
+        'tokenize_many': lambda: tokenize_many(strings),
+    }
+    print('{} strings ({} distinct), best of {}'.format(n, cardinality, number))
+    for name, func in timings.items():
+        seconds = min(timeit.repeat(func, number=1, repeat=number))
+        print('{:>20}:  {:.4f} sec'.format(name, seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+
+Synthetic Tables for benchmarks.
+
+Generated Tables look like results tables:  a header row of column names, a
+first column of subject (e.g. method) names, and numeric value cells.  The
+knobs control how hard they are to process:
+
+    `span_density`  fraction of header cells merged with their right
+                    neighbor (i.e. multispan Cells)
+    `label_ratio`   fraction of value cells replaced by text labels
+    `cardinality`   number of distinct strings each kind of cell is drawn
+                    from (lower means more repeated cells)
+
+"""
+
+import random
+
+from typing import List, Tuple
+
+from corvid.table.table import Cell, Table
+
+
+def _column_name(k: int) -> str:
+    return 'metric {}'.format(k)
+
+
+def _subject_name(k: int) -> str:
+    return 'method {} et al. ({})'.format(k, 2000 + k % 20)
+
+
+def _value(k: int) -> str:
+    return '{:.1f}'.format(50.0 + (k * 7.3) % 50.0)
+
+
+def _label(k: int) -> str:
+    return 'label {}'.format(k)
+
+
+def generate_table(nrow: int = 10,
+                   ncol: int = 5,
+                   span_density: float = 0.0,
+                   label_ratio: float = 0.0,
+                   cardinality: int = 100,
+                   seed: int = 0) -> Table:
+    assert nrow > 1 and ncol > 1 and cardinality > 0
+    rng = random.Random(seed)
+    cells = [Cell(tokens=[''], index_topleft_row=0, index_topleft_col=0)]
+
+    # header, possibly with multispan cells
+    j = 1
+    while j < ncol:
+        colspan = 2 if j + 1 < ncol and rng.random() < span_density else 1
+        cells.append(Cell(tokens=[_column_name(rng.randrange(cardinality))],
+                          index_topleft_row=0, index_topleft_col=j,
+                          rowspan=1, colspan=colspan))
+        j += colspan
+
+    for i in range(1, nrow):
+        cells.append(Cell(tokens=[_subject_name(rng.randrange(cardinality))],
+                          index_topleft_row=i, index_topleft_col=0))
+        for j in range(1, ncol):
+            k = rng.randrange(cardinality)
+            text = _label(k) if rng.random() < label_ratio else _value(k)
+            cells.append(Cell(tokens=[text], index_topleft_row=i,
+                              index_topleft_col=j))
+
+    return Table(cells=cells, nrow=nrow, ncol=ncol)
+
+
+def generate_tables(n: int, seed: int = 0, **kwargs) -> List[Table]:
+    return [generate_table(seed=seed + k, **kwargs) for k in range(n)]
+
+
+def generate_aggregation_inputs(num_sources: int = 5,
+                                nrow: int = 20,
+                                ncol: int = 5,
+                                cardinality: int = 100,
+                                seed: int = 0) -> Tuple[List[Table], Table]:
+    """Returns source Tables and a gold Table that aggregates them.  Every
+    source has the gold schema with its value columns shuffled, and a random
+    subset of the gold rows."""
+    rng = random.Random(seed)
+    header = [''] + [_column_name(j) for j in range(1, ncol)]
+    rows = [[_subject_name(rng.randrange(cardinality))] +
+            [_value(rng.randrange(cardinality)) for _ in range(1, ncol)]
+            for _ in range(1, nrow)]
+
+    def _to_table(grid: List[List[str]]) -> Table:
+        return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                                 index_topleft_col=j)
+                            for j, s in enumerate(row)]
+                           for i, row in enumerate(grid)])
+
+    sources = []
+    for _ in range(num_sources):
+        permutation = [0] + rng.sample(range(1, ncol), ncol - 1)
+        subset = rng.sample(rows, max(1, len(rows) // 2))
+        sources.append(_to_table([[row[j] for j in permutation]
+                                  for row in [header] + subset]))
+    return sources, _to_table([header] + rows)
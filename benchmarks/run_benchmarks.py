@@ -0,0 +1,339 @@
+"""
+
+Times the main corvid operations on synthetic Tables (see `generators.py`)
+at several scales, saves the timings as JSON and optionally compares them
+against a baseline, failing if anything got slower than a threshold.
+
+    # record a baseline (e.g. on master)
+    python -m benchmarks.run_benchmarks --output baseline.json
+
+    # after a change, compare against it; exits with status 1 on regression
+    python -m benchmarks.run_benchmarks --output results.json \
+        --baseline baseline.json --threshold 0.25
+
+Baselines are machine-specific, so only compare timings taken on the same
+machine.  `benchmarks/baseline.json` is a reference baseline over all scales
+(its `meta` records the machine and versions); it shows the expected relative
+costs, but record your own before comparing.  Use `--scales small` for a
+quick run and `--filter NAME` to only run benchmarks whose name contains NAME.
+Set `CORVID_PROFILE` (see `corvid.util.profiling`) to also profile the run.
+
+"""
+
+import sys
+import json
+import copy
+import time
+import pickle
+import random
+import argparse
+import platform
+import statistics
+import timeit
+
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from corvid.table.table import Cell, Table
+from corvid.table.table_loader import TableLoader, CellLoader
+from corvid.table.shared_table import SharedTables
+from corvid.semantic_table.semantic_table import LabelCollapseSemanticTable, \
+    NormalizationError
+from corvid.semantic_table.numeric_columns import extract_numeric_columns
+from corvid.table_aggregation.schema_matcher import ColNameSchemaMatcher
+from corvid.table_aggregation.oracle import predict_oracle
+from corvid.table_aggregation.evaluate import row_level_recall, \
+    cell_level_recall
+from corvid.util.lists import compute_best_alignments, \
+    compute_best_alignments_sparse, compute_best_permutation
+from corvid.util.profiling import profile_from_env
+
+from benchmarks.generators import generate_tables, \
+    generate_aggregation_inputs
+
+SCALES = OrderedDict([
+    ('small', {'num_tables': 10, 'nrow': 10, 'ncol': 5, 'list_size': 8}),
+    ('medium', {'num_tables': 50, 'nrow': 50, 'ncol': 10, 'list_size': 50}),
+    ('large', {'num_tables': 100, 'nrow': 200, 'ncol': 20, 'list_size': 200}),
+])
+
+DEFAULT_THRESHOLD = 0.25
+
+
+# each benchmark takes scale parameters and does any setup, then returns the
+# function to be timed
+def bench_table_construction(scale: Dict) -> Callable:
+    tables = generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], span_density=0.2)
+    args = [(table.cells, table.nrow, table.ncol) for table in tables]
+    return lambda: [Table(cells=cells, nrow=nrow, ncol=ncol)
+                    for cells, nrow, ncol in args]
+
+
+def bench_table_to_json(scale: Dict) -> Callable:
+    tables = generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], span_density=0.2)
+    return lambda: [table.to_json() for table in tables]
+
+
+def bench_table_from_json(scale: Dict) -> Callable:
+    jsons = [table.to_json() for table in
+             generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], span_density=0.2)]
+    loader = TableLoader(table_type=Table,
+                         cell_loader=CellLoader(cell_type=Cell))
+    return lambda: [loader.from_json(json) for json in jsons]
+
+
+def bench_table_pickle(scale: Dict) -> Callable:
+    tables = generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], span_density=0.2)
+    return lambda: pickle.loads(pickle.dumps(tables,
+                                             pickle.HIGHEST_PROTOCOL))
+
+
+def bench_table_deepcopy(scale: Dict) -> Callable:
+    tables = generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], span_density=0.2)
+    return lambda: copy.deepcopy(tables)
+
+
+def bench_shared_tables_handle(scale: Dict) -> Callable:
+    # what's sent to each worker once the Tables are in shared memory
+    shared_tables = SharedTables.create(
+        generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                        ncol=scale['ncol'], span_density=0.2))
+    return lambda: pickle.loads(pickle.dumps(shared_tables,
+                                             pickle.HIGHEST_PROTOCOL))
+
+
+def bench_shared_tables(scale: Dict) -> Callable:
+    # pack, send a handle, and rebuild every Table on the other side
+    tables = generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], span_density=0.2)
+
+    def _roundtrip():
+        with SharedTables.create(tables) as shared_tables:
+            handle = pickle.loads(pickle.dumps(shared_tables,
+                                               pickle.HIGHEST_PROTOCOL))
+            rebuilt_tables = list(handle)
+            handle.close()
+        return rebuilt_tables
+
+    return _roundtrip
+
+
+def bench_label_collapse(scale: Dict) -> Callable:
+    tables = generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], span_density=0.2,
+                             label_ratio=0.1)
+
+    def _normalize():
+        for table in tables:
+            try:
+                LabelCollapseSemanticTable(table)
+            except NormalizationError:
+                pass
+
+    return _normalize
+
+
+def bench_numeric_columns(scale: Dict) -> Callable:
+    tables = generate_tables(n=scale['num_tables'], nrow=scale['nrow'],
+                             ncol=scale['ncol'], label_ratio=0.0)
+
+    def _extract():
+        return [extract_numeric_columns(table) for table in tables]
+
+    return _extract
+
+
+def bench_schema_matcher(scale: Dict) -> Callable:
+    sources, gold = generate_aggregation_inputs(
+        num_sources=scale['num_tables'], nrow=scale['nrow'],
+        ncol=scale['ncol'])
+    target_schema = [str(cell) for cell in gold.grid[0, :]]
+    matcher = ColNameSchemaMatcher()
+    return lambda: matcher.predict(tables=sources, target_schema=target_schema)
+
+
+def bench_predict_oracle(scale: Dict) -> Callable:
+    sources, gold = generate_aggregation_inputs(
+        num_sources=scale['num_tables'], nrow=scale['nrow'],
+        ncol=scale['ncol'])
+    return lambda: predict_oracle(source_tables=sources, gold_table=gold)
+
+
+def _recall_inputs(scale: Dict) -> Tuple[Table, Table]:
+    sources, gold = generate_aggregation_inputs(
+        num_sources=scale['num_tables'], nrow=scale['nrow'],
+        ncol=scale['ncol'])
+    return gold, predict_oracle(source_tables=sources, gold_table=gold)
+
+
+def bench_row_level_recall(scale: Dict) -> Callable:
+    gold, pred = _recall_inputs(scale)
+    return lambda: row_level_recall(gold_table=gold, pred_table=pred)
+
+
+def bench_cell_level_recall_exact(scale: Dict) -> Callable:
+    gold, pred = _recall_inputs(scale)
+    return lambda: cell_level_recall(gold_table=gold, pred_table=pred,
+                                     mode='exact')
+
+
+def bench_cell_level_recall_fast(scale: Dict) -> Callable:
+    gold, pred = _recall_inputs(scale)
+    return lambda: cell_level_recall(gold_table=gold, pred_table=pred,
+                                     mode='fast')
+
+
+def _random_lists(scale: Dict) -> Tuple[List[int], List[int]]:
+    rng = random.Random(0)
+    n = scale['list_size']
+    return [rng.randrange(n) for _ in range(n)], \
+           [rng.randrange(n) for _ in range(n)]
+
+
+def bench_best_alignments(scale: Dict) -> Callable:
+    x, y = _random_lists(scale)
+    return lambda: compute_best_alignments(x=x, y=y,
+                                           sim=lambda a, b: -abs(a - b))
+
+
+def bench_best_alignments_sparse(scale: Dict) -> Callable:
+    n = scale['list_size']
+    rng = np.random.RandomState(0)
+    dense = rng.randint(0, 5, size=(n, n)) * (rng.rand(n, n) < 0.05)
+    sim_matrix = csr_matrix(dense.astype(float))
+    return lambda: compute_best_alignments_sparse(sim_matrix=sim_matrix)
+
+
+def bench_best_permutation_min(scale: Dict) -> Callable:
+    x, y = _random_lists(scale)
+    return lambda: compute_best_permutation(x=x, y=y,
+                                            sim=lambda a, b: -abs(a - b),
+                                            agg=min)
+
+
+BENCHMARKS = OrderedDict([
+    ('table_construction', bench_table_construction),
+    ('table_to_json', bench_table_to_json),
+    ('table_from_json', bench_table_from_json),
+    ('table_pickle', bench_table_pickle),
+    ('table_deepcopy', bench_table_deepcopy),
+    ('shared_tables_handle', bench_shared_tables_handle),
+    ('shared_tables', bench_shared_tables),
+    ('label_collapse', bench_label_collapse),
+    ('numeric_columns', bench_numeric_columns),
+    ('schema_matcher', bench_schema_matcher),
+    ('predict_oracle', bench_predict_oracle),
+    ('row_level_recall', bench_row_level_recall),
+    ('cell_level_recall_exact', bench_cell_level_recall_exact),
+    ('cell_level_recall_fast', bench_cell_level_recall_fast),
+    ('best_alignments', bench_best_alignments),
+    ('best_alignments_sparse', bench_best_alignments_sparse),
+    ('best_permutation_min', bench_best_permutation_min),
+])
+
+
+def time_function(func: Callable, repeat: int = 5,
+                  min_seconds: float = 0.2) -> Dict:
+    """Best and median seconds per call over `repeat` rounds.  Each round
+    calls `func` enough times to take about `min_seconds`."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    number = max(1, int(min_seconds / max(elapsed, 1e-9)))
+    timings = [t / number for t in
+               timeit.repeat(func, number=number, repeat=repeat)]
+    return {'best': min(timings), 'median': statistics.median(timings),
+            'number': number, 'repeat': repeat}
+
+
+def run_benchmarks(scales: List[str], name_filter: str = None,
+                   repeat: int = 5) -> Dict:
+    results = OrderedDict()
+    for scale_name in scales:
+        for name, benchmark in BENCHMARKS.items():
+            if name_filter and name_filter not in name:
+                continue
+            key = '{}[{}]'.format(name, scale_name)
+            func = benchmark(SCALES[scale_name])
+            results[key] = time_function(func, repeat=repeat)
+            print('{:>40}:  {:.6f} sec'.format(key, results[key]['best']))
+            sys.stdout.flush()
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+        },
+        'results': results
+    }
+
+
+def compare_results(results: Dict, baseline: Dict,
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Tuple]:
+    """Returns (name, baseline seconds, current seconds, ratio,
+    is_regression) for each benchmark in both `results` and `baseline`.
+    A regression is a best time more than `threshold` (fractionally) slower
+    than the baseline's."""
+    comparisons = []
+    for name, current in results['results'].items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        ratio = current['best'] / max(previous['best'], 1e-12)
+        comparisons.append((name, previous['best'], current['best'], ratio,
+                            ratio > 1.0 + threshold))
+    return comparisons
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run corvid benchmarks')
+    parser.add_argument('--scales', nargs='+', default=list(SCALES),
+                        choices=list(SCALES))
+    parser.add_argument('--filter', default=None,
+                        help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None,
+                        help='path to save results JSON')
+    parser.add_argument('--baseline', default=None,
+                        help='path to baseline results JSON to compare with')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed fractional slowdown vs. the baseline')
+    args = parser.parse_args(argv)
+
+    with profile_from_env('run_benchmarks'):
+        results = run_benchmarks(scales=args.scales, name_filter=args.filter,
+                                 repeat=args.repeat)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    comparisons = compare_results(results, baseline, threshold=args.threshold)
+    num_regressions = 0
+    print('\n{:>40}  {:>12}  {:>12}  {:>7}'.format('benchmark', 'baseline',
+                                                  'current', 'ratio'))
+    for name, previous, current, ratio, is_regression in comparisons:
+        num_regressions += is_regression
+        print('{:>40}  {:>12.6f}  {:>12.6f}  {:>6.2f}x{}'.format(
+            name, previous, current, ratio,
+            '  REGRESSION' if is_regression else ''))
+    print('\n{} regression(s) beyond {:.0%}'.format(num_regressions,
+                                                    args.threshold))
+    return 1 if num_regressions > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,49 +2,189 @@
 
 Evaluates predicted (i.e. extracted) Tables against gold Tables
 
+Cell text is compared after `remove_non_alphanumeric`.  Every Table is
+encoded once into integer ids by a shared `Vocabulary`, so all metrics are
+NumPy comparisons over id arrays, and `evaluate_many` computes them for a
+whole batch of (gold, pred) pairs at once.
+
 """
-#
-# from typing import Dict, Callable
-#
-# from s2_corvid.types.table import Table
-# from corvid.util.strings import remove_non_alphanumeric
-# from corvid.util.lists import compute_intersection, compute_union
-#
-#
-# def is_same_dimensions(gold: Table, pred: Table) -> bool:
-#     return pred.shape == gold.shape
-#
-#
-# def bag_of_cells_iou(gold: Table, pred: Table) -> float:
-#     """Computes Intersection over Union (IOU) between `gold` and `pred`
-#     Tables where each Table is treated like a Bag of Cells"""
-#
-#     pass
-#
-#
-# def cell_level_grid_accuracy(gold: Table, pred: Table,
-#                              sim: Callable, agg: Callable) -> float:
-#     """"""
-#     if not is_same_dimensions(pred, gold):
-#         raise Exception('Cant compare tables of different dimensions')
-#
-#     return agg([sim(gold[i, j], pred[i, j])
-#                 for i in range(gold.nrow)
-#                 for j in range(gold.ncol)]) / (gold.nrow * gold.ncol)
-#
-#
-# def evaluate(gold_table: Table, pred_table: Table) -> Dict[str, float]:
-#     """Computes all evaluation metrics between a `gold` and `pred` Table pair"""
-#
-#     if not is_same_dimensions(gold_table, pred_table):
-#         raise Exception('`gold` and `pred` requires identical dimensions')
-#
-#     return {
-#         'cell_level_grid_accuracy': cell_level_grid_accuracy(
-#             gold_table,
-#             pred_table,
-#             sim=lambda cell1, cell2: remove_non_alphanumeric(str(cell1)) == \
-#                                      remove_non_alphanumeric(str(cell2)),
-#             agg=sum
-#         )
-#     }
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from corvid.table.table import Table
+from corvid.table.vocabulary import Vocabulary, UNKNOWN_ID
+from corvid.util.strings import remove_non_alphanumeric
+
+
+def _build_vocabulary() -> Vocabulary:
+    return Vocabulary(normalize=remove_non_alphanumeric)
+
+
+def _encode(table: Table, vocabulary: Vocabulary,
+            cache: Dict[str, int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the grid of cell ids of `table` (reusing `table.cell_ids` if
+    it was encoded by `vocabulary` without any unknown ids) and the id of
+    each of its Cells.
+
+    `cache` maps raw cell text to ids so each distinct string is only
+    normalized once per batch."""
+    cells = table.cells
+    # unknown ids (e.g. from `attach(table, is_grow=False)`) would all
+    # compare equal, so such Tables are encoded again
+    if table.vocabulary is vocabulary and table.cell_ids is not None and \
+            not np.any(table.cell_ids == UNKNOWN_ID):
+        grid_ids = table.cell_ids
+        cell_ids = grid_ids[[cell.index_topleft_row for cell in cells],
+                            [cell.index_topleft_col for cell in cells]]
+        return grid_ids, cell_ids
+
+    grid_ids = np.empty(table.shape, dtype=np.int32)
+    cell_ids = np.empty(len(cells), dtype=np.int32)
+    for k, cell in enumerate(cells):
+        s = str(cell)
+        index = cache.get(s)
+        if index is None:
+            index = cache[s] = vocabulary.add(s)
+        cell_ids[k] = index
+        # (Cells built with zero spans still occupy their top-left position)
+        if cell.rowspan <= 1 and cell.colspan <= 1:
+            grid_ids[cell.index_topleft_row, cell.index_topleft_col] = index
+        else:
+            for i, j in cell.indices:
+                grid_ids[i, j] = index
+    return grid_ids, cell_ids
+
+
+def is_same_dimensions(gold: Table, pred: Table) -> bool:
+    return pred.shape == gold.shape
+
+
+def shape_agreement(gold: Table, pred: Table) -> float:
+    """Product of the row count ratio and column count ratio (smaller over
+    larger), so 1.0 iff the Tables have the same dimensions"""
+    return min(gold.nrow, pred.nrow) / max(gold.nrow, pred.nrow) * \
+           min(gold.ncol, pred.ncol) / max(gold.ncol, pred.ncol)
+
+
+def bag_of_cells_iou(gold: Table, pred: Table) -> float:
+    """Computes Intersection over Union (IOU) between `gold` and `pred`
+    Tables where each Table is treated like a Bag of Cells"""
+    return float(evaluate_many([(gold, pred)])['bag_of_cells_iou'][0])
+
+
+def cell_level_grid_accuracy(gold: Table, pred: Table) -> float:
+    """Fraction of grid positions `[i, j]` where `gold` and `pred` have the
+    same cell text"""
+    if not is_same_dimensions(gold, pred):
+        raise Exception('Cant compare tables of different dimensions')
+    return float(evaluate_many([(gold, pred)])['cell_level_grid_accuracy'][0])
+
+
+def evaluate(gold_table: Table, pred_table: Table) -> Dict[str, float]:
+    """Computes all evaluation metrics between a `gold` and `pred` Table pair"""
+
+    if not is_same_dimensions(gold_table, pred_table):
+        raise Exception('`gold` and `pred` requires identical dimensions')
+
+    return {name: float(values[0]) for name, values in
+            evaluate_many([(gold_table, pred_table)]).items()}
+
+
+def evaluate_many(pairs: Iterable[Tuple[Table, Table]],
+                  vocabulary: Vocabulary = None) -> Dict[str, np.ndarray]:
+    """Computes all evaluation metrics for each (gold, pred) Table pair.
+    Returns a dict from metric name to an array with one value per pair.
+
+    Unlike `evaluate`, pairs with different dimensions are allowed; their
+    `cell_level_grid_accuracy` is NaN (so use e.g. `np.nanmean` to average).
+
+    If `vocabulary` is given (e.g. the one used by `TableLoader`), it must
+    normalize with `remove_non_alphanumeric` for results to match
+    `evaluate`, and Tables already encoded by it aren't re-encoded."""
+    vocabulary = vocabulary or _build_vocabulary()
+    cache = {}
+
+    gold_grids, pred_grids = [], []
+    gold_cells, pred_cells = [], []
+    for gold, pred in pairs:
+        grid_ids, cell_ids = _encode(gold, vocabulary, cache)
+        gold_grids.append(grid_ids)
+        gold_cells.append(cell_ids)
+        grid_ids, cell_ids = _encode(pred, vocabulary, cache)
+        pred_grids.append(grid_ids)
+        pred_cells.append(cell_ids)
+
+    gold_shapes = np.array([g.shape for g in gold_grids],
+                           dtype=float).reshape(-1, 2)
+    pred_shapes = np.array([p.shape for p in pred_grids],
+                           dtype=float).reshape(-1, 2)
+    is_same = np.all(gold_shapes == pred_shapes, axis=1)
+    agreement = np.prod(np.minimum(gold_shapes, pred_shapes) /
+                        np.maximum(gold_shapes, pred_shapes), axis=1)
+
+    return {
+        'is_same_dimensions': is_same,
+        'shape_agreement': agreement,
+        'bag_of_cells_iou': _compute_bag_iou(gold_cells, pred_cells,
+                                             num_ids=len(vocabulary)),
+        'cell_level_grid_accuracy': _compute_grid_accuracy(gold_grids,
+                                                           pred_grids,
+                                                           is_same)
+    }
+
+
+def _compute_grid_accuracy(gold_grids: List[np.ndarray],
+                           pred_grids: List[np.ndarray],
+                           is_same: np.ndarray) -> np.ndarray:
+    """Compares all same-shape pairs with a single elementwise comparison
+    over their concatenated grids"""
+    accuracy = np.full(len(gold_grids), np.nan)
+    index_same = np.flatnonzero(is_same)
+    if len(index_same) == 0:
+        return accuracy
+    gold = np.concatenate([gold_grids[i].ravel() for i in index_same])
+    pred = np.concatenate([pred_grids[i].ravel() for i in index_same])
+    sizes = np.array([gold_grids[i].size for i in index_same])
+    index_pair = np.repeat(np.arange(len(index_same)), sizes)
+    num_matches = np.bincount(index_pair, weights=(gold == pred),
+                              minlength=len(index_same))
+    accuracy[index_same] = num_matches / sizes
+    return accuracy
+
+
+def _compute_bag_iou(gold_cells: List[np.ndarray],
+                     pred_cells: List[np.ndarray],
+                     num_ids: int) -> np.ndarray:
+    """Multiset IOU of each pair of cell id arrays.  Each id is offset by its
+    pair's index so a single `np.unique` counts the cells of every pair."""
+    num_pairs = len(gold_cells)
+    if num_pairs == 0:
+        return np.zeros(0)
+    num_ids = max(num_ids, 1)
+
+    def _keys(cells: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        sizes = [len(c) for c in cells]
+        index_pair = np.repeat(np.arange(num_pairs, dtype=np.int64), sizes)
+        ids = np.concatenate(cells).astype(np.int64) if sum(sizes) else \
+            np.zeros(0, dtype=np.int64)
+        return np.unique(index_pair * num_ids + ids, return_counts=True)
+
+    gold_keys, gold_counts = _keys(gold_cells)
+    pred_keys, pred_counts = _keys(pred_cells)
+
+    # positions of pred keys among the (sorted) gold keys
+    index = np.minimum(np.searchsorted(gold_keys, pred_keys),
+                       max(len(gold_keys) - 1, 0))
+    is_shared = gold_keys[index] == pred_keys if len(gold_keys) else \
+        np.zeros(len(pred_keys), dtype=bool)
+    overlap = np.minimum(gold_counts[index[is_shared]],
+                         pred_counts[is_shared])
+    intersection = np.bincount(pred_keys[is_shared] // num_ids,
+                               weights=overlap, minlength=num_pairs)
+
+    union = np.array([len(g) + len(p) for g, p in
+                      zip(gold_cells, pred_cells)]) - intersection
+    # two Tables without any cells are identical bags
+    return np.where(union > 0, intersection / np.maximum(union, 1), 1.0)
@@ -0,0 +1,54 @@
+"""
+
+Typed numeric columns of a normalized Table (e.g. of a `SemanticTable`),
+whose first row is the header and first column is the subject.
+
+Every other column whose VALUE cells are mostly numbers (e.g. '92.3%',
+'0.85±0.02', '1,234') is parsed in bulk into float arrays with one entry per
+row below the header, together with uncertainties and masks of which cells
+are numbers, have an uncertainty, or are percentages.  For example:
+
+    for column in extract_numeric_columns(semantic_table):
+        best_row = 1 + np.nanargmax(column.values)
+
+"""
+
+from typing import List, Union
+
+from collections import namedtuple
+
+import numpy as np
+
+from corvid.table.table import Table
+from corvid.util.strings import ParsedNumbers, parse_numbers_many
+
+NumericColumn = namedtuple('NumericColumn',
+                           ['index_col', 'name'] + list(ParsedNumbers._fields))
+
+
+def extract_numeric_columns(table: Union[Table, 'SemanticTable'],
+                            min_fraction_numeric: float = 0.5) -> \
+        List[NumericColumn]:
+    """Numeric columns of a normalized Table (or `SemanticTable`), i.e.
+    those where at least `min_fraction_numeric` of the nonempty cells below
+    the header are numbers.  The subject column is never included."""
+    table = getattr(table, 'normalized_table', table)
+    num_values = table.nrow - 1
+
+    # parse every VALUE cell of the Table at once, column by column
+    texts = [str(cell) for cell in table.grid[1:, 1:].T.flat]
+    numbers = parse_numbers_many(texts)
+    is_nonempty = np.array([len(text.strip()) > 0 for text in texts],
+                           dtype=bool)
+
+    columns = []
+    for index_col in range(1, table.ncol):
+        rows = slice((index_col - 1) * num_values, index_col * num_values)
+        num_numbers = int(numbers.is_number[rows].sum())
+        num_nonempty = int(is_nonempty[rows].sum())
+        if num_numbers > 0 and \
+                num_numbers >= min_fraction_numeric * num_nonempty:
+            columns.append(NumericColumn(
+                index_col, str(table[0, index_col]),
+                *[array[rows] for array in numbers]))
+    return columns
@@ -24,8 +24,8 @@ from functools import reduce
 from copy import deepcopy
 
 from corvid.table.table import Table, Cell
-from corvid.util.strings import format_grid, count_digits, \
-    remove_non_alphanumeric, is_like_citation
+from corvid.util.strings import format_grid, extract_cell_features_many
+from corvid.util.profiling import timed, count
 
 
 class NormalizationError(Exception):
@@ -122,6 +122,7 @@ class LabelCollapseSemanticTable(SemanticTable):
             self._classify_cells(table=table)
 
         if 'VALUE' not in labels:
+            count('normalization_errors')
             raise NormalizationError('No values in this table')
 
         # (2) split multispan cells into copies w/ span = 1
@@ -142,6 +143,7 @@ class LabelCollapseSemanticTable(SemanticTable):
 
         return new_table
 
+    @timed()
     def _classify_cells(self, table: Table) -> Tuple[np.ndarray, int, int]:
         """
         Some thoughts:
@@ -177,12 +179,16 @@ class LabelCollapseSemanticTable(SemanticTable):
         labels = np.empty((nrow, ncol), dtype='<U10')
 
         # (1) first pass to do easy ones
-        for cell in table.cells:
+        all_features = extract_cell_features_many([str(cell)
+                                                   for cell in table.cells])
+        for cell, features in zip(table.cells, all_features):
 
-            text = remove_non_alphanumeric(str(cell))
+            # features of the cell text w/ non-alphanumeric chars removed
+            num_chars = features.num_alphanumeric
+            num_digits = features.num_alphanumeric_digits
 
             # RULE 0:  EMPTY CELLS ARE IGNORED
-            if text == '':
+            if num_chars == 0:
                 label = 'EMPTY'
 
             # RULE 1:  MULTIROW/COL CELLS ARE PROBABLY LABELS
@@ -190,11 +196,11 @@ class LabelCollapseSemanticTable(SemanticTable):
                 label = 'LABEL'
 
             # RULE 2:  A CELL WITH 100% TEXT IS PROBABLY A LABEL
-            elif count_digits(text) == 0:
+            elif num_digits == 0:
                 label = 'LABEL'
 
             # RULE 3:  A CELL WITH >50% DIGITS IS PROBABLY A VALUE
-            elif count_digits(text) / len(text) > 0.5:
+            elif num_digits / num_chars > 0.5:
                 label = 'VALUE'
 
             else:
@@ -240,6 +246,7 @@ class LabelCollapseSemanticTable(SemanticTable):
 
         return labels, index_topmost_value_row, index_leftmost_value_col
 
+    @timed()
     def _standardize_cell_sizes(self, table: Table) -> Table:
         """Creates new cells for multispan cells"""
         new_cells = []
@@ -252,6 +259,7 @@ class LabelCollapseSemanticTable(SemanticTable):
                 new_cells.append(new_cell)
         return Table(cells=new_cells, nrow=table.nrow, ncol=table.ncol)
 
+    @timed()
     def _merge_label_cells(self, table: Table,
                            index_topmost_value_row: int,
                            index_leftmost_value_col: int) -> Table:
@@ -0,0 +1,149 @@
+"""
+
+A blocking client for the corvid service.  `LocalClient` also runs the
+server in a background thread of the current process, which is handy for
+tests and notebooks.  For example:
+
+    with LocalClient(CorvidService(executor='thread')) as client:
+        normalized_tables = client.normalize(tables)
+        aggregated_table = client.aggregate(tables, target_schema)
+        print(client.metrics()['latency'])
+
+"""
+
+import json
+import asyncio
+import threading
+
+from http.client import HTTPConnection
+from typing import Dict, List, Tuple, Union
+
+from corvid.table.table import Table
+from corvid.service.handlers import load_table
+from corvid.service.server import CorvidService
+
+
+class ServiceError(Exception):
+    def __init__(self, status: int, message: str):
+        super(ServiceError, self).__init__('{}: {}'.format(status, message))
+        self.status = status
+
+
+class Client(object):
+    """Talks to a corvid service at `host`:`port` over one keep-alive
+    connection (so a Client shouldn't be shared across threads)"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8080,
+                 timeout: float = 60.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._connection = None
+
+    def request(self, method: str, path: str,
+                payload: Dict = None) -> Tuple[int, Dict]:
+        """Returns (HTTP status, JSON response)"""
+        if self._connection is None:
+            self._connection = HTTPConnection(self.host, self.port,
+                                              timeout=self.timeout)
+        body = json.dumps(payload).encode('utf-8') \
+            if payload is not None else None
+        try:
+            self._connection.request(
+                method, path, body=body,
+                headers={'Content-Type': 'application/json'})
+            response = self._connection.getresponse()
+            status, data = response.status, response.read()
+        except Exception:
+            self.close()
+            raise
+        if response.getheader('Connection', '').lower() == 'close':
+            self.close()
+        return status, json.loads(data.decode('utf-8'))
+
+    def _post(self, path: str, payload: Dict) -> Dict:
+        status, response = self.request('POST', path, payload)
+        if status != 200:
+            raise ServiceError(status, response.get('error', ''))
+        return response
+
+    def normalize(self, tables: List[Table],
+                  strategy: str = 'label_collapse') -> List[Union[Table,
+                                                                  None]]:
+        """Normalized Tables, with None for Tables that couldn't be"""
+        results = self._post('/normalize', {
+            'tables': [table.to_json() for table in tables],
+            'strategy': strategy})['results']
+        return [load_table(r['table']) if 'table' in r else None
+                for r in results]
+
+    def match(self, tables: List[Table],
+              target_schema: List[str]) -> List[Tuple[float,
+                                                      List[Tuple[int, int]]]]:
+        results = self._post('/match', {
+            'tables': [table.to_json() for table in tables],
+            'target_schema': target_schema})['results']
+        return [(r['score'], [tuple(a) for a in r['column_alignments']])
+                for r in results]
+
+    def aggregate(self, tables: List[Table],
+                  target_schema: List[str]) -> Table:
+        return load_table(self._post('/aggregate', {
+            'tables': [table.to_json() for table in tables],
+            'target_schema': target_schema})['table'])
+
+    def evaluate(self, gold_table: Table, pred_table: Table,
+                 task: str = 'semantic') -> Dict[str, float]:
+        return self._post('/evaluate', {'gold': gold_table.to_json(),
+                                        'pred': pred_table.to_json(),
+                                        'task': task})['metrics']
+
+    def metrics(self) -> Dict:
+        return self.request('GET', '/metrics')[1]
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LocalClient(Client):
+    """Runs `service` on a free local port in a background thread for as
+    long as the client is open"""
+
+    def __init__(self, service: CorvidService = None, timeout: float = 60.0):
+        super(LocalClient, self).__init__(port=None, timeout=timeout)
+        self.service = service or CorvidService()
+        self._loop = None
+        self._thread = None
+
+    def start(self) -> 'LocalClient':
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        daemon=True)
+        self._thread.start()
+        self.port = asyncio.run_coroutine_threadsafe(
+            self.service.start(self.host, 0), self._loop).result()
+        return self
+
+    def stop(self):
+        self.close()
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.service.stop(),
+                                             self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+
+    def __enter__(self) -> 'LocalClient':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,141 @@
+"""
+
+Request handlers behind the corvid service (see `corvid.service.server`).
+
+Handlers take and return JSON-serializable objects (Tables as given by
+`Table.to_json`), and are module-level functions so they can run in worker
+processes.  Invalid requests raise `RequestError`.
+
+"""
+
+from typing import Dict, List, Tuple
+
+from corvid.table.table import Cell, Table
+from corvid.table.table_loader import CellLoader, TableLoader
+from corvid.semantic_table.semantic_table import IdentitySemanticTable, \
+    LabelCollapseSemanticTable, NormalizationError
+from corvid.semantic_table import evaluate as semantic_evaluate
+from corvid.table_aggregation import evaluate as aggregation_evaluate
+from corvid.table_aggregation.schema_matcher import ColNameSchemaMatcher, \
+    build_schema_table
+
+NORMALIZATION_STRATEGIES = {
+    'identity': IdentitySemanticTable,
+    'label_collapse': LabelCollapseSemanticTable
+}
+
+EVALUATION_TASKS = ['semantic', 'aggregation']
+
+TABLE_LOADER = TableLoader(table_type=Table,
+                           cell_loader=CellLoader(cell_type=Cell))
+
+
+class RequestError(Exception):
+    pass
+
+
+def load_table(json: Dict) -> Table:
+    try:
+        return TABLE_LOADER.from_json(json)
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        raise RequestError('Invalid table: {}'.format(e))
+
+
+def warm_up():
+    """Imports and touches heavy dependencies, so the first request handled
+    by a fresh worker isn't slower than the rest"""
+    matcher = ColNameSchemaMatcher()
+    table = build_schema_table(['', 'a', 'b'])
+    matcher.compute_column_alignments_by_column_names(table, table)
+
+
+def normalize_tables(table_jsons: List[Dict], strategy: str) -> List[Dict]:
+    """Normalizes each Table with a `SemanticTable` strategy.  Returns, for
+    each Table, either {'table': normalized} or {'error': message}, so one
+    bad Table doesn't fail a whole batch."""
+    if strategy not in NORMALIZATION_STRATEGIES:
+        raise RequestError('`strategy` must be one of {}'.format(
+            sorted(NORMALIZATION_STRATEGIES)))
+    semantic_table_type = NORMALIZATION_STRATEGIES[strategy]
+
+    results = []
+    for table_json in table_jsons:
+        try:
+            semantic_table = semantic_table_type(load_table(table_json))
+            results.append(
+                {'table': semantic_table.normalized_table.to_json()})
+        except (RequestError, NormalizationError) as e:
+            results.append({'error': str(e)})
+    return results
+
+
+def _load_tables(table_jsons: List[Dict]) -> Tuple[List[Table], List[str]]:
+    """Loaded Tables (None if invalid) and error messages (None if valid)"""
+    tables, errors = [], []
+    for table_json in table_jsons:
+        try:
+            tables.append(load_table(table_json))
+            errors.append(None)
+        except RequestError as e:
+            tables.append(None)
+            errors.append(str(e))
+    return tables, errors
+
+
+def match_tables(table_jsons: List[Dict],
+                 target_schema: List[str]) -> List[Dict]:
+    """Column alignments of each Table to `target_schema`, all computed in
+    one batch.  Returns, for each Table, either {'score': ...,
+    'column_alignments': ...} or {'error': message}."""
+    tables, errors = _load_tables(table_jsons)
+    alignments = iter(ColNameSchemaMatcher().compute_column_alignments_many(
+        build_schema_table(target_schema),
+        [table for table in tables if table is not None]))
+
+    results = []
+    for error in errors:
+        if error is not None:
+            results.append({'error': error})
+            continue
+        score, column_alignments = next(alignments)
+        results.append({'score': float(score),
+                        'column_alignments': [[int(i), int(j)] for i, j
+                                              in column_alignments]})
+    return results
+
+
+def aggregate_table_lists(table_json_lists: List[List[Dict]],
+                          target_schema: List[str]) -> List[Dict]:
+    """Aggregates each list of Tables into a single Table with
+    `target_schema`, aligning all Tables in one batch.  Returns, for each
+    list, either {'table': aggregated} or {'error': message}."""
+    table_lists, errors = [], []
+    for table_jsons in table_json_lists:
+        tables, table_errors = _load_tables(table_jsons)
+        error = next((e for e in table_errors if e is not None), None)
+        errors.append(error)
+        if error is None:
+            table_lists.append(tables)
+    predicted_tables = iter(ColNameSchemaMatcher().predict_many(
+        table_lists=table_lists, target_schema=target_schema))
+    return [{'error': error} if error is not None
+            else {'table': next(predicted_tables).to_json()}
+            for error in errors]
+
+
+def evaluate_tables(gold_json: Dict, pred_json: Dict,
+                    task: str) -> Dict[str, float]:
+    """Evaluation metrics of a predicted Table for a `task`, i.e. either
+    normalization ('semantic') or aggregation"""
+    if task not in EVALUATION_TASKS:
+        raise RequestError('`task` must be one of {}'.format(
+            EVALUATION_TASKS))
+    gold_table, pred_table = load_table(gold_json), load_table(pred_json)
+    evaluate = semantic_evaluate.evaluate if task == 'semantic' \
+        else aggregation_evaluate.evaluate
+    try:
+        metrics = evaluate(gold_table, pred_table)
+    except Exception as e:
+        # both raise a plain Exception when the Tables aren't comparable
+        raise RequestError(str(e))
+    return {name: float(value) for name, value in metrics.items()}
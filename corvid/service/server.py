@@ -0,0 +1,433 @@
+"""
+
+An asyncio HTTP/1.1 server exposing corvid to other services, so they don't
+each pay corvid's import and warm-up costs.  All requests and responses are
+JSON, with Tables given by `Table.to_json`:
+
+    POST /normalize  {"tables": [...], "strategy": "label_collapse"}
+                  -> {"results": [{"table": ...} or {"error": ...}, ...]}
+    POST /match      {"tables": [...], "target_schema": ["", "BLEU", ...]}
+                  -> {"results": [{"score": ..., "column_alignments": ...}]}
+    POST /aggregate  {"tables": [...], "target_schema": [...]}
+                  -> {"table": ...}
+    POST /evaluate   {"gold": ..., "pred": ..., "task": "semantic"}
+                  -> {"metrics": {...}}
+    GET  /metrics    latency histograms per endpoint, and batching counters
+    GET  /health
+
+CPU-bound work runs in a pool of worker processes (or threads), at most
+`max_concurrency` jobs at a time.  Concurrent requests are coalesced into
+one job, waiting at most `max_batch_wait` seconds for a batch to fill:
+
+ - Tables sent to /normalize with the same strategy, and to /match with the
+   same target schema, in batches of up to `max_batch_size` Tables
+ - requests to /aggregate with the same target schema, in batches of up to
+   `max_batch_size` requests
+
+so a batch of Tables is aligned to a target schema with one similarity
+matrix over all their distinct column names.  Requests beyond `max_pending`
+in flight are rejected with 503.
+
+    python -m corvid.service.server --port 8080 --num-workers 4
+
+See `corvid.service.client.LocalClient` for running the server in-process.
+
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import functools
+
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from corvid.service import handlers
+from corvid.service.handlers import RequestError
+
+EXECUTORS = ['thread', 'process']
+
+# upper bounds (ms) of latency histogram buckets;  the last is unbounded
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500,
+                      1000, 2000, 5000, 10000, float('inf')]
+
+STATUS_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+                  405: 'Method Not Allowed', 413: 'Payload Too Large',
+                  500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class LatencyHistogram(object):
+    """Counts of request latencies in fixed, roughly log-spaced buckets"""
+
+    def __init__(self, buckets_ms: List[float] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * len(self.buckets_ms)
+        self.num_requests = 0
+        self.total_ms = 0.0
+
+    def record(self, seconds: float):
+        ms = seconds * 1000.0
+        self.counts[bisect_left(self.buckets_ms, ms)] += 1
+        self.num_requests += 1
+        self.total_ms += ms
+
+    def percentile(self, q: float) -> float:
+        """Upper bound (ms) of the bucket containing the `q`-th percentile"""
+        assert 0.0 <= q <= 100.0
+        if self.num_requests == 0:
+            return 0.0
+        rank = q / 100.0 * self.num_requests
+        cumulative = 0
+        for bound, count in zip(self.buckets_ms, self.counts):
+            cumulative += count
+            if count > 0 and cumulative >= rank:
+                return bound
+        return self.buckets_ms[-1]
+
+    def to_json(self) -> Dict:
+        return OrderedDict([
+            ('num_requests', self.num_requests),
+            ('mean_ms', self.total_ms / max(self.num_requests, 1)),
+            ('p50_ms', self.percentile(50)),
+            ('p90_ms', self.percentile(90)),
+            ('p99_ms', self.percentile(99)),
+            # JSON has no infinity, so the last bucket is labeled 'inf'
+            ('buckets', OrderedDict(
+                ('{:g}'.format(bound), count)
+                for bound, count in zip(self.buckets_ms, self.counts)))
+        ])
+
+
+class _Batcher(object):
+    """Coalesces items submitted under the same key (e.g. a target schema) by
+    concurrent requests into batches for `run_batch(key, items) -> results`,
+    one result per item"""
+
+    def __init__(self, run_batch: Callable, max_batch_size: int,
+                 max_batch_wait: float):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self.num_batches = 0
+        self.num_items = 0
+        self._pending = {}  # key -> (items, futures, timer)
+
+    async def submit(self, key: Hashable, items: List) -> List:
+        loop = asyncio.get_event_loop()
+        futures = []
+        for item in items:
+            pending = self._pending.get(key)
+            if pending is None:
+                timer = loop.call_later(self.max_batch_wait, self._flush, key)
+                pending = self._pending[key] = ([], [], timer)
+            future = loop.create_future()
+            pending[0].append(item)
+            pending[1].append(future)
+            futures.append(future)
+            if len(pending[0]) >= self.max_batch_size:
+                self._flush(key)
+        return await asyncio.gather(*futures)
+
+    def _flush(self, key: Hashable):
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        items, futures, timer = pending
+        timer.cancel()
+        self.num_batches += 1
+        self.num_items += len(items)
+        asyncio.ensure_future(self._run(key, items, futures))
+
+    async def _run(self, key: Hashable, items: List,
+                   futures: List[asyncio.Future]):
+        try:
+            results = await self.run_batch(key, items)
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+    def to_json(self) -> Dict:
+        return {'num_batches': self.num_batches,
+                'num_items': self.num_items,
+                'mean_batch_size': self.num_items / max(self.num_batches, 1)}
+
+
+def _to_schema_key(target_schema: List[str]) -> Tuple[str, ...]:
+    if not isinstance(target_schema, list) or \
+            not all(isinstance(s, str) for s in target_schema):
+        raise RequestError('`target_schema` must be a list of strings')
+    return tuple(target_schema)
+
+
+def _raise_first_error(results: List[Dict]):
+    for result in results:
+        if 'error' in result:
+            raise RequestError(result['error'])
+
+
+class CorvidService(object):
+    def __init__(self,
+                 num_workers: int = 2,
+                 executor: str = 'process',
+                 max_concurrency: int = None,
+                 max_pending: int = 256,
+                 max_batch_size: int = 32,
+                 max_batch_wait: float = 0.005,
+                 max_body_bytes: int = 64 * 2 ** 20):
+        """`max_concurrency` (default: `num_workers`) bounds the number of
+        jobs submitted to the workers at once;  the rest wait their turn"""
+        if executor not in EXECUTORS:
+            raise ValueError('`executor` must be one of {}'.format(EXECUTORS))
+        assert num_workers > 0 and max_pending > 0 and max_batch_size > 0
+        self.num_workers = num_workers
+        self.executor = executor
+        self.max_concurrency = max_concurrency or num_workers
+        self.max_pending = max_pending
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self.max_body_bytes = max_body_bytes
+
+        self.histograms = OrderedDict()
+        self.num_pending = 0
+        self.port = None
+        self._pool = None
+        self._semaphore = None
+        # requests for the same strategy or target schema are coalesced
+        self._batchers = OrderedDict([
+            ('normalize', self._build_batcher(
+                lambda strategy, tables: self.run_job(
+                    handlers.normalize_tables, tables, strategy))),
+            ('match', self._build_batcher(
+                lambda schema, tables: self.run_job(
+                    handlers.match_tables, tables, list(schema)))),
+            ('aggregate', self._build_batcher(
+                lambda schema, table_lists: self.run_job(
+                    handlers.aggregate_table_lists, table_lists,
+                    list(schema))))
+        ])
+        self._server = None
+        self._routes = {
+            ('POST', '/normalize'): self._normalize,
+            ('POST', '/match'): self._match,
+            ('POST', '/aggregate'): self._aggregate,
+            ('POST', '/evaluate'): self._evaluate,
+            ('GET', '/metrics'): self._metrics,
+            ('GET', '/health'): self._health,
+        }
+
+    def _build_batcher(self, run_batch: Callable) -> _Batcher:
+        return _Batcher(run_batch=run_batch,
+                        max_batch_size=self.max_batch_size,
+                        max_batch_wait=self.max_batch_wait)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8080) -> int:
+        """Starts the worker pool and listens on `host`:`port` (port 0 picks
+        a free one).  Returns the bound port."""
+        pool_type = ProcessPoolExecutor if self.executor == 'process' \
+            else ThreadPoolExecutor
+        self._pool = pool_type(max_workers=self.num_workers)
+        # spawns the workers and pays import costs before the first request
+        for _ in range(self.num_workers):
+            self._pool.submit(handlers.warm_up)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._server = await asyncio.start_server(self._handle_connection,
+                                                  host=host, port=port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def run_job(self, func: Callable, *args) -> Any:
+        """Runs `func(*args)` on the worker pool, respecting
+        `max_concurrency`"""
+        async with self._semaphore:
+            return await asyncio.get_event_loop().run_in_executor(
+                self._pool, functools.partial(func, *args))
+
+    async def handle(self, method: str, path: str,
+                     body: bytes) -> Tuple[int, Dict]:
+        """Handles a single request, returning (HTTP status, JSON response).
+        Latency is recorded per route, including failed requests."""
+        route = self._routes.get((method, path))
+        if route is None:
+            is_known_path = any(p == path for _, p in self._routes)
+            return (405, {'error': 'Method not allowed'}) if is_known_path \
+                else (404, {'error': 'Not found'})
+
+        if method == 'POST' and self.num_pending >= self.max_pending:
+            return 503, {'error': 'Too many pending requests'}
+
+        start = time.perf_counter()
+        self.num_pending += 1
+        try:
+            payload = json.loads(body.decode('utf-8')) if body else {}
+            if not isinstance(payload, dict):
+                raise RequestError('Request body must be a JSON object')
+            return 200, await route(payload)
+        except (RequestError, ValueError, KeyError, TypeError) as e:
+            return 400, {'error': '{}: {}'.format(type(e).__name__, e)}
+        except Exception as e:
+            return 500, {'error': '{}: {}'.format(type(e).__name__, e)}
+        finally:
+            self.num_pending -= 1
+            histogram = self.histograms.get(path)
+            if histogram is None:
+                histogram = self.histograms[path] = LatencyHistogram()
+            histogram.record(time.perf_counter() - start)
+
+    async def _normalize(self, payload: Dict) -> Dict:
+        strategy = payload.get('strategy', 'label_collapse')
+        if strategy not in handlers.NORMALIZATION_STRATEGIES:
+            raise RequestError('`strategy` must be one of {}'.format(
+                sorted(handlers.NORMALIZATION_STRATEGIES)))
+        results = await self._batchers['normalize'].submit(
+            strategy, list(payload['tables']))
+        return {'results': results}
+
+    async def _match(self, payload: Dict) -> Dict:
+        results = await self._batchers['match'].submit(
+            _to_schema_key(payload['target_schema']),
+            list(payload['tables']))
+        _raise_first_error(results)
+        return {'results': results}
+
+    async def _aggregate(self, payload: Dict) -> Dict:
+        result, = await self._batchers['aggregate'].submit(
+            _to_schema_key(payload['target_schema']),
+            [list(payload['tables'])])
+        _raise_first_error([result])
+        return result
+
+    async def _evaluate(self, payload: Dict) -> Dict:
+        metrics = await self.run_job(handlers.evaluate_tables,
+                                     payload['gold'], payload['pred'],
+                                     payload.get('task', 'semantic'))
+        return {'metrics': metrics}
+
+    async def _metrics(self, payload: Dict) -> Dict:
+        return {
+            'num_pending': self.num_pending,
+            'latency': OrderedDict((path, histogram.to_json())
+                                   for path, histogram
+                                   in self.histograms.items()),
+            'batching': OrderedDict((name, batcher.to_json())
+                                    for name, batcher
+                                    in self._batchers.items())
+        }
+
+    async def _health(self, payload: Dict) -> Dict:
+        return {'status': 'ok'}
+
+    async def _handle_connection(self, reader: asyncio.StreamReader,
+                                 writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, is_keep_alive, body = request
+                if body is None:
+                    status, response = 413, {'error': 'Payload too large'}
+                    is_keep_alive = False
+                else:
+                    status, response = await self.handle(method, path, body)
+                self._write_response(writer, status, response, is_keep_alive)
+                await writer.drain()
+                if not is_keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple:
+        """Returns (method, path, is_keep_alive, body), with body None if
+        it's too large, or None if the connection was closed"""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        method, target, version = request_line.decode('latin-1').split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        is_keep_alive = connection == 'keep-alive' or \
+            (version == 'HTTP/1.1' and connection != 'close')
+        content_length = int(headers.get('content-length', 0))
+        if content_length > self.max_body_bytes:
+            return method, target.split('?')[0], False, None
+        body = await reader.readexactly(content_length) \
+            if content_length > 0 else b''
+        return method, target.split('?')[0], is_keep_alive, body
+
+    def _write_response(self, writer: asyncio.StreamWriter, status: int,
+                        response: Dict, is_keep_alive: bool):
+        try:
+            body = json.dumps(response).encode('utf-8')
+        except (TypeError, ValueError) as e:
+            status = 500
+            body = json.dumps({'error': 'Unserializable response: {}'
+                              .format(e)}).encode('utf-8')
+        head = ('HTTP/1.1 {} {}\r\n'
+                'Content-Type: application/json\r\n'
+                'Content-Length: {}\r\n'
+                'Connection: {}\r\n\r\n').format(
+            status, STATUS_REASONS.get(status, ''), len(body),
+            'keep-alive' if is_keep_alive else 'close')
+        writer.write(head.encode('latin-1') + body)
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Serve corvid over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--num-workers', type=int, default=2)
+    parser.add_argument('--executor', choices=EXECUTORS, default='process')
+    parser.add_argument('--max-concurrency', type=int, default=None)
+    parser.add_argument('--max-pending', type=int, default=256)
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-batch-wait', type=float, default=0.005)
+    args = parser.parse_args(argv)
+
+    service = CorvidService(num_workers=args.num_workers,
+                            executor=args.executor,
+                            max_concurrency=args.max_concurrency,
+                            max_pending=args.max_pending,
+                            max_batch_size=args.max_batch_size,
+                            max_batch_wait=args.max_batch_wait)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    port = loop.run_until_complete(service.start(args.host, args.port))
+    print('Serving corvid on {}:{}'.format(args.host, port), file=sys.stderr)
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.run_until_complete(service.stop())
+        loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+
+Export of Tables (e.g. normalized `SemanticTable`s, or aggregate Tables from
+`ColNameSchemaMatcher` and `predict_oracle`) to Apache Arrow and Parquet, and
+import back into Tables.
+
+The first row of a Table becomes the column names, and every other row a
+record.  Columns whose values are all numeric (as per `is_floatable`), apart
+from missing values like '' or the 'NONE' padding of aggregate Tables, are
+typed as int64 or float64 with missing values as nulls;  all other columns
+are strings.  The original column names are kept in the schema metadata, so
+duplicate or empty names survive a round trip.  For example:
+
+    write_parquet(aggregate_table, 'results.parquet')
+    table = read_parquet('results.parquet')
+
+    for batch in to_record_batches(semantic_table, batch_size=10000):
+        ...
+
+Numeric columns round trip by value, not text (e.g. '0.80' is read back as
+'0.8'), and missing values are read back as `null_text`;  pass
+`is_typed=False` to keep every value's exact text.  Requires `pyarrow`,
+which is imported on first use.
+
+"""
+
+import re
+import json
+
+from typing import Iterator, List, Tuple, Union
+
+from corvid.table.table import Cell, Table
+from corvid.util.lazy import lazy_import
+
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+
+NULL_VALUES = ('', 'NONE')
+
+HEADER_METADATA_KEY = b'corvid.header'
+
+# at most 18 digits, so always fits in an int64
+INT_PATTERN = re.compile(r'^[+-]?[0-9]{1,18}$')
+
+# Parquet row groups (and record batches) of this many rows by default
+DEFAULT_BATCH_SIZE = 65536
+
+
+def _get_table(table: Union[Table, 'SemanticTable']) -> Table:
+    # SemanticTables are exported via their normalized Table
+    return getattr(table, 'normalized_table', table)
+
+
+def _grid_texts(table: Table) -> List[List[str]]:
+    """Text of every grid position, computing each (spanned) Cell once"""
+    texts = {}
+    rows = []
+    for row in table.grid:
+        texts_row = []
+        for cell in row:
+            text = texts.get(id(cell))
+            if text is None:
+                text = texts[id(cell)] = str(cell)
+            texts_row.append(text)
+        rows.append(texts_row)
+    return rows
+
+
+def _to_column(texts: List[str], is_typed: bool,
+               null_values: Tuple[str, ...]) -> Tuple['DataType', List]:
+    """Arrow type and values of a column of texts"""
+    if not is_typed:
+        return pa.string(), texts
+    is_int = True
+    values = []
+    for text in texts:
+        if text in null_values:
+            values.append(None)
+            continue
+        try:
+            values.append(float(text))
+        except ValueError:
+            return pa.string(), texts
+        is_int = is_int and INT_PATTERN.match(text) is not None
+    if all(value is None for value in values):
+        return pa.string(), texts
+    if is_int:
+        values = [int(text) if value is not None else None
+                  for text, value in zip(texts, values)]
+        return pa.int64(), values
+    return pa.float64(), values
+
+
+def _unique_names(header: List[str]) -> List[str]:
+    """Column names made nonempty and unique (e.g. '', 'a', 'a' becomes
+    'column_0', 'a', 'a_2')"""
+    names, seen = [], set()
+    for j, name in enumerate(header):
+        name = name or 'column_{}'.format(j)
+        unique_name, k = name, 1
+        while unique_name in seen:
+            k += 1
+            unique_name = '{}_{}'.format(name, k)
+        seen.add(unique_name)
+        names.append(unique_name)
+    return names
+
+
+def _to_columns(table: Table, is_typed: bool,
+                null_values: Tuple[str, ...]) -> Tuple['Schema', List[List]]:
+    rows = _grid_texts(_get_table(table))
+    header, records = rows[0], rows[1:]
+    types, columns = [], []
+    for j in range(len(header)):
+        arrow_type, values = _to_column([record[j] for record in records],
+                                        is_typed, null_values)
+        types.append(arrow_type)
+        columns.append(values)
+    schema = pa.schema(
+        [pa.field(name, arrow_type)
+         for name, arrow_type in zip(_unique_names(header), types)],
+        metadata={HEADER_METADATA_KEY: json.dumps(header).encode('utf-8')})
+    return schema, columns
+
+
+def to_record_batches(table: Union[Table, 'SemanticTable'],
+                      batch_size: int = DEFAULT_BATCH_SIZE,
+                      is_typed: bool = True,
+                      null_values: Tuple[str, ...] = NULL_VALUES) -> \
+        Iterator['RecordBatch']:
+    """Streams the records of `table` as Arrow RecordBatches of up to
+    `batch_size` rows, all with the same schema"""
+    assert batch_size > 0
+    schema, columns = _to_columns(table, is_typed, null_values)
+    num_records = len(columns[0]) if columns else 0
+    for start in range(0, max(num_records, 1), batch_size):
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(values[start:start + batch_size], type=field.type)
+             for values, field in zip(columns, schema)], schema=schema)
+
+
+def to_arrow(table: Union[Table, 'SemanticTable'], is_typed: bool = True,
+             null_values: Tuple[str, ...] = NULL_VALUES) -> 'pa.Table':
+    """All records of `table` as a single Arrow Table"""
+    schema, columns = _to_columns(table, is_typed, null_values)
+    return pa.Table.from_arrays(
+        [pa.array(values, type=field.type)
+         for values, field in zip(columns, schema)], schema=schema)
+
+
+def write_parquet(table: Union[Table, 'SemanticTable'], path: str,
+                  batch_size: int = DEFAULT_BATCH_SIZE, is_typed: bool = True,
+                  null_values: Tuple[str, ...] = NULL_VALUES, **kwargs):
+    """Writes `table` to a Parquet file, one row group per `batch_size`
+    records.  Other `kwargs` are passed to `pyarrow.parquet.ParquetWriter`
+    (e.g. compression)."""
+    writer = None
+    try:
+        for batch in to_record_batches(table, batch_size=batch_size,
+                                       is_typed=is_typed,
+                                       null_values=null_values):
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema, **kwargs)
+            writer.write_table(pa.Table.from_batches([batch]))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _format_value(value, arrow_type: 'DataType', null_text: str) -> str:
+    if value is None:
+        return null_text
+    if pa.types.is_floating(arrow_type):
+        return repr(float(value))
+    return str(value)
+
+
+def from_arrow(data: Union['pa.Table', 'RecordBatch'],
+               null_text: str = '') -> Table:
+    """Table whose first row is the column names of `data` (or the original
+    header, if `data` was exported from a Table), and every other row is a
+    record.  Every Cell has a single token."""
+    metadata = data.schema.metadata or {}
+    header = list(data.schema.names)
+    if HEADER_METADATA_KEY in metadata:
+        original_header = json.loads(
+            metadata[HEADER_METADATA_KEY].decode('utf-8'))
+        # e.g. unless only some of the columns were read
+        if len(original_header) == len(header):
+            header = original_header
+
+    columns = []
+    for field, column in zip(data.schema, data.columns):
+        values = column.to_pylist()
+        if pa.types.is_string(field.type) or \
+                pa.types.is_large_string(field.type):
+            columns.append([null_text if v is None else v for v in values])
+        else:
+            columns.append([_format_value(v, field.type, null_text)
+                            for v in values])
+
+    nrow, ncol = data.num_rows + 1, len(header)
+    cells = [Cell(tokens=[text], index_topleft_row=0, index_topleft_col=j)
+             for j, text in enumerate(header)]
+    for i, texts in enumerate(zip(*columns)):
+        cells.extend(Cell(tokens=[text], index_topleft_row=i + 1,
+                          index_topleft_col=j)
+                     for j, text in enumerate(texts))
+    return Table._from_valid_cells(cells=cells, nrow=nrow, ncol=ncol)
+
+
+def read_parquet(path: str, null_text: str = '') -> Table:
+    return from_arrow(pq.read_table(path), null_text=null_text)
@@ -0,0 +1,228 @@
+"""
+
+Streams Tables out of the XML (`DTXT_XMLCOORD` format) written by the
+`omnipage/` command-line tool.
+
+Rather than loading the whole document into a DOM (e.g. with BeautifulSoup),
+the XML is read incrementally with `iterparse`.  Each Table is emitted as soon
+as its `<table>` element closes, and processed elements are cleared, so memory
+stays bounded by roughly a single page even on very long documents.
+
+The relevant parts of the XML look like:
+
+    <page>
+      <description>
+        <theoreticalPage width="12240" height="15840" ... />
+      </description>
+      ...
+      <table l="..." t="..." r="..." b="...">
+        <gridTable>
+          <gridCol>...</gridCol> ...
+          <gridRow>...</gridRow> ...
+        </gridTable>
+        <cell gridColFrom="0" gridColTill="1" gridRowFrom="0" gridRowTill="0"
+              l="..." t="..." r="..." b="...">
+          <para><ln><wd l="..." t="..." r="..." b="...">Accuracy</wd></ln></para>
+        </cell>
+        ...
+      </table>
+    </page>
+
+Coordinates are measured down from the top of the page, whereas `Box` has `y`
+increasing upwards, so `y` is flipped using the page height (or negated if
+the page height is unknown).
+
+"""
+
+from typing import Callable, Dict, List, Iterable, Iterator, Union, IO, \
+    Tuple
+
+from xml.etree.ElementTree import iterparse, Element
+
+from corvid.table.table import Cell, Table
+from corvid.util.geom import Box
+
+
+class BoxCell(Cell):
+    """A Cell that also records the Box around it on the page"""
+
+    def __init__(self,
+                 tokens: List[str],
+                 index_topleft_row: int,
+                 index_topleft_col: int,
+                 rowspan: int = 1,
+                 colspan: int = 1,
+                 box: Union[Box, Dict] = None):
+        super().__init__(tokens=tokens,
+                         index_topleft_row=index_topleft_row,
+                         index_topleft_col=index_topleft_col,
+                         rowspan=rowspan,
+                         colspan=colspan)
+        self.box = Box.from_json(box) if isinstance(box, dict) else box
+
+    def to_json(self) -> Dict:
+        json = super().to_json()
+        json['box'] = self.box.to_json() if self.box is not None else None
+        return json
+
+
+class BoxTable(Table):
+    """A Table that also records which page it's on and its Box"""
+
+    def __init__(self,
+                 grid: Iterable[Iterable[Cell]] = None,
+                 cells: Iterable[Cell] = None,
+                 nrow: int = None, ncol: int = None,
+                 page_num: int = None,
+                 box: Union[Box, Dict] = None):
+        super().__init__(grid=grid, cells=cells, nrow=nrow, ncol=ncol)
+        self.page_num = page_num
+        self.box = Box.from_json(box) if isinstance(box, dict) else box
+
+    def to_json(self) -> Dict:
+        json = super().to_json()
+        json['page_num'] = self.page_num
+        json['box'] = self.box.to_json() if self.box is not None else None
+        return json
+
+
+def _local_name(tag: str) -> str:
+    """Strips the namespace from an XML tag, e.g. '{ns}cell' -> 'cell'"""
+    return tag.rsplit('}', 1)[-1]
+
+
+class OmniPageTableLoader(object):
+    """Loads Tables from OmniPage XML.  For example:
+
+        loader = OmniPageTableLoader()
+        for table in loader.iter_tables('PAPER_ID.xml'):
+            ...
+
+    As with `TableLoader`, the types of the produced Cells and Tables can be
+    swapped for subclasses that accept the same arguments.
+    """
+
+    def __init__(self,
+                 table_type: Callable[..., Table] = BoxTable,
+                 cell_type: Callable[..., Cell] = BoxCell):
+        self.table_type = table_type
+        self.cell_type = cell_type
+
+    def iter_tables(self, source: Union[str, IO]) -> Iterator[Table]:
+        """Yields each Table in `source` (a path or file object) in
+        document order"""
+        page_num = -1
+        page_height = None
+        root = None
+        is_in_cell = False
+        words = []  # (text, Box) of each word in the current cell
+        cells = []  # (attributes, words, Box) of each cell in current table
+        grid_shape = [0, 0]  # number of gridRow & gridCol in current table
+
+        for event, elem in iterparse(source, events=('start', 'end')):
+            tag = _local_name(elem.tag)
+
+            if event == 'start':
+                if root is None:
+                    root = elem
+                if tag == 'page':
+                    page_num += 1
+                    page_height = None
+                elif tag == 'table':
+                    cells, grid_shape = [], [0, 0]
+                elif tag == 'cell':
+                    is_in_cell = True
+                    words = []
+                continue
+
+            if tag == 'theoreticalPage' and elem.get('height') is not None:
+                page_height = float(elem.get('height'))
+            elif tag == 'wd' and is_in_cell:
+                text = ''.join(elem.itertext()).strip()
+                if text:
+                    words.append((text, self._box(elem, page_height)))
+            elif tag == 'gridRow':
+                grid_shape[0] += 1
+            elif tag == 'gridCol':
+                grid_shape[1] += 1
+            elif tag == 'cell':
+                cells.append((dict(elem.attrib),
+                              words, self._box(elem, page_height)))
+                is_in_cell = False
+                words = []
+                elem.clear()
+            elif tag == 'table':
+                table = self._build_table(cells=cells, grid_shape=grid_shape,
+                                          page_num=page_num,
+                                          box=self._box(elem, page_height))
+                elem.clear()
+                cells = []
+                if table is not None:
+                    yield table
+            elif tag == 'page':
+                # everything on this page has been processed
+                root.clear()
+
+    def _box(self, elem: Element, page_height: float = None) -> Box:
+        """Box from `l`, `t`, `r`, `b` attributes, if present"""
+        try:
+            l, t, r, b = [float(elem.get(k)) for k in ('l', 't', 'r', 'b')]
+        except TypeError:
+            return None
+        if page_height is None:
+            return Box(llx=l, lly=-b, urx=r, ury=-t)
+        return Box(llx=l, lly=page_height - b, urx=r, ury=page_height - t)
+
+    def _build_table(self, cells: List[Tuple[Dict, List, Box]],
+                     grid_shape: List[int], page_num: int,
+                     box: Box) -> Table:
+        """Builds a Table from the cells of one `<table>` element.  Grid
+        positions not covered by any cell are filled with empty Cells.
+        Returns None if the cells don't form a valid Table."""
+        new_cells = []
+        nrow, ncol = grid_shape
+        for attributes, words, cell_box in cells:
+            try:
+                row_from = int(attributes['gridRowFrom'])
+                row_till = int(attributes.get('gridRowTill', row_from))
+                col_from = int(attributes['gridColFrom'])
+                col_till = int(attributes.get('gridColTill', col_from))
+            except (KeyError, ValueError):
+                return None
+            word_boxes = [b for _, b in words if b is not None]
+            if cell_box is None and word_boxes:
+                cell_box = Box.compute_bounding_box(word_boxes)
+            new_cells.append(self.cell_type(
+                tokens=[text for text, _ in words],
+                index_topleft_row=row_from,
+                index_topleft_col=col_from,
+                rowspan=row_till - row_from + 1,
+                colspan=col_till - col_from + 1,
+                box=cell_box))
+            nrow = max(nrow, row_till + 1)
+            ncol = max(ncol, col_till + 1)
+
+        if not new_cells:
+            return None
+
+        is_covered = [[False] * ncol for _ in range(nrow)]
+        for cell in new_cells:
+            for i, j in cell.indices:
+                is_covered[i][j] = True
+        for i in range(nrow):
+            for j in range(ncol):
+                if not is_covered[i][j]:
+                    new_cells.append(self.cell_type(tokens=[],
+                                                    index_topleft_row=i,
+                                                    index_topleft_col=j,
+                                                    rowspan=1, colspan=1,
+                                                    box=None))
+        new_cells.sort(key=lambda c: (c.index_topleft_row,
+                                      c.index_topleft_col))
+
+        try:
+            return self.table_type(cells=new_cells, nrow=nrow, ncol=ncol,
+                                   page_num=page_num, box=box)
+        except ValueError:
+            # overlapping cells
+            return None
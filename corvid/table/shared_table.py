@@ -0,0 +1,166 @@
+"""
+
+Packs many Tables into a single shared memory block, so process-pool workers
+can read them without pickling a grid of Cell objects per Table.
+
+Every Cell is stored once (not once per grid position it spans) as a row of
+ints (position, spans, range of tokens), and all token strings are stored as
+one UTF-8 blob.  A `SharedTables` handle pickles to just the name and layout
+of the block, and Tables are rebuilt from the block when accessed.  For
+example:
+
+    with SharedTables.create(tables) as shared_tables:
+        with ProcessPoolExecutor() as pool:
+            # workers get `shared_tables[i]` for each i
+            results = list(pool.map(work, repeat(shared_tables),
+                                    range(len(shared_tables))))
+
+Only the process that created the block (via `create`) unlinks it;  handles
+unpickled in other processes only detach from it.  Requires Python 3.8+
+(for `multiprocessing.shared_memory`).
+
+"""
+
+from typing import Iterator, List, Tuple
+
+import numpy as np
+
+from corvid.table.table import Cell, Table
+from corvid.util.lazy import lazy_import
+
+shared_memory = lazy_import('multiprocessing.shared_memory')
+
+# columns of the `cells` array
+CELL_FIELDS = ['index_topleft_row', 'index_topleft_col', 'rowspan',
+               'colspan', 'index_token_start', 'index_token_end']
+# columns of the `tables` array
+TABLE_FIELDS = ['nrow', 'ncol', 'index_cell_start', 'index_cell_end']
+
+_ALIGNMENT = 8
+
+
+class SharedTables(object):
+    """A read-only sequence of Tables backed by a shared memory block"""
+
+    def __init__(self, name: str, layout: List[Tuple[str, str, int, int]],
+                 is_owner: bool = False):
+        """Attaches to an existing block.  Use `create` to make a new one.
+        `layout` lists (array name, dtype, offset, length) in the block."""
+        self.name = name
+        self.layout = layout
+        self.is_owner = is_owner
+        self._shm = shared_memory.SharedMemory(name=name)
+        self._arrays = {
+            array_name: np.ndarray(shape=(length,), dtype=dtype,
+                                   buffer=self._shm.buf, offset=offset)
+            for array_name, dtype, offset, length in layout}
+        self._tables = self._arrays['tables'].reshape(-1, len(TABLE_FIELDS))
+        self._cells = self._arrays['cells'].reshape(-1, len(CELL_FIELDS))
+        self._num_tables = len(self._tables)
+
+    @classmethod
+    def create(cls, tables: List[Table]) -> 'SharedTables':
+        """Packs `tables` into a new shared memory block, which is unlinked
+        when this (owning) handle is closed"""
+        table_rows, cell_rows, token_offsets = [], [], [0]
+        blob = bytearray()
+        for table in tables:
+            table_rows.append([table.nrow, table.ncol, len(cell_rows),
+                               len(cell_rows) + len(table.cells)])
+            for cell in table.cells:
+                index_token_start = len(token_offsets) - 1
+                for token in cell.tokens:
+                    blob.extend(str(token).encode('utf-8'))
+                    token_offsets.append(len(blob))
+                cell_rows.append([cell.index_topleft_row,
+                                  cell.index_topleft_col,
+                                  cell.rowspan, cell.colspan,
+                                  index_token_start,
+                                  len(token_offsets) - 1])
+
+        arrays = [
+            ('tables', np.array(table_rows, dtype=np.int32).reshape(-1)),
+            ('cells', np.array(cell_rows, dtype=np.int32).reshape(-1)),
+            ('token_offsets', np.array(token_offsets, dtype=np.int64)),
+            ('blob', np.frombuffer(bytes(blob), dtype=np.uint8))
+        ]
+        layout, size = [], 0
+        for array_name, array in arrays:
+            layout.append((array_name, array.dtype.str, size, len(array)))
+            size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for (array_name, dtype, offset, length), (_, array) in zip(layout,
+                                                                   arrays):
+            np.ndarray(shape=(length,), dtype=dtype, buffer=shm.buf,
+                       offset=offset)[:] = array
+        shared_tables = cls(name=shm.name, layout=layout, is_owner=True)
+        shm.close()
+        return shared_tables
+
+    def __len__(self) -> int:
+        return self._num_tables
+
+    def __getitem__(self, index: int) -> Table:
+        if self._shm is None:
+            raise ValueError('SharedTables is closed')
+        nrow, ncol, index_cell_start, index_cell_end = \
+            self._tables[index].tolist()
+        if index_cell_start == index_cell_end:
+            raise ValueError('Table {} has no cells'.format(index))
+        rows, cols, rowspans, colspans, token_starts, token_ends = \
+            self._cells[index_cell_start:index_cell_end].T.tolist()
+
+        # decode every token of the Table from one copy of its part of blob
+        index_first_token = token_starts[0]
+        offsets = self._arrays['token_offsets'][
+            index_first_token:token_ends[-1] + 1].tolist()
+        data = self._arrays['blob'][offsets[0]:offsets[-1]].tobytes()
+        data_start = offsets[0]
+        tokens = [data[start - data_start:end - data_start].decode('utf-8')
+                  for start, end in zip(offsets[:-1], offsets[1:])]
+
+        cells = [Cell(tokens=tokens[token_start - index_first_token:
+                                    token_end - index_first_token],
+                      index_topleft_row=row, index_topleft_col=col,
+                      rowspan=rowspan, colspan=colspan)
+                 for row, col, rowspan, colspan, token_start, token_end
+                 in zip(rows, cols, rowspans, colspans, token_starts,
+                        token_ends)]
+        return Table._from_valid_cells(cells=cells, nrow=nrow, ncol=ncol)
+
+    def __iter__(self) -> Iterator[Table]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self._arrays.values())
+
+    def __reduce__(self):
+        # only the name and layout are pickled;  the unpickled handle never
+        # owns (i.e. unlinks) the block
+        return SharedTables, (self.name, self.layout, False)
+
+    def close(self):
+        """Detaches from the block, and unlinks it if this handle owns it"""
+        if self._shm is None:
+            return
+        # views into the buffer must be released before it can be closed
+        self._arrays, self._tables, self._cells = {}, None, None
+        self._shm.close()
+        if self.is_owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> 'SharedTables':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
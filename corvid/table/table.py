@@ -8,6 +8,8 @@ from typing import List, Dict, Tuple, Union, Iterable, Callable
 
 import numpy as np
 
+from copy import deepcopy
+
 from corvid.util.strings import format_grid
 
 
@@ -54,6 +56,22 @@ class Cell(object):
         return json
 
 
+_NUM_CELL_ATTRS = 5
+
+
+def _grid_from_valid_cells(cells: List[Cell], nrow: int,
+                           ncol: int) -> np.ndarray:
+    """Grid of `cells`, which are assumed to exactly fill it"""
+    grid = np.empty((nrow, ncol), dtype=object)
+    for cell in cells:
+        i, j = cell.index_topleft_row, cell.index_topleft_col
+        if cell.rowspan == 1 and cell.colspan == 1:
+            grid[i, j] = cell
+        else:
+            grid[i:i + cell.rowspan, j:j + cell.colspan] = cell
+    return grid
+
+
 # TODO: consider analogous method that returns all indices given a (multispan) cell
 class Table(object):
     """A Table is a collection of Cells.  Visually, it may look like:
@@ -92,6 +110,11 @@ class Table(object):
 
        Here, each Cell is treated as a single element of the list, regardless
        of its row/colspan.
+
+    Optionally, a Table can also carry `cell_ids`, an `int32` array with the
+    same shape as the grid holding the id of each Cell's text in a shared
+    `vocabulary` (see `corvid.table.vocabulary`).  These are None unless the
+    Table was encoded by a Vocabulary.
     """
 
     def __init__(self,
@@ -99,6 +122,8 @@ class Table(object):
                  cells: Iterable[Cell] = None,
                  nrow: int = None, ncol: int = None):
         assert bool(grid is not None) ^ bool(cells and nrow and ncol)
+        self.cell_ids = None
+        self.vocabulary = None
         if grid is not None:
             self.grid = np.array(grid)
             assert self.nrow > 0 and self.ncol > 0
@@ -108,6 +133,88 @@ class Table(object):
             self.grid = self._grid_from_cells(cells=self.cells,
                                               nrow=nrow, ncol=ncol)
 
+    @classmethod
+    def _from_valid_cells(cls, cells: List[Cell], nrow: int,
+                          ncol: int) -> 'Table':
+        """Same as `Table(cells=cells, nrow=nrow, ncol=ncol)`, but skips
+        checking that `cells` exactly fill the grid, so must only be given
+        cells unpacked from a valid Table"""
+        table = cls.__new__(cls)
+        table.cell_ids = None
+        table.vocabulary = None
+        table.cells = list(cells)
+        table.grid = _grid_from_valid_cells(table.cells, nrow, ncol)
+        return table
+
+    def __getstate__(self) -> Dict:
+        """Pickles the list of Cells and the shape, but not the grid (which
+        repeats spanned Cells), which is rebuilt on load.  Plain Cells with
+        string tokens are packed into an int array of their positions and
+        spans plus one flat list of tokens.
+
+        The `vocabulary` isn't pickled, since it's typically shared by a whole
+        corpus, and neither are the `cell_ids` that are meaningless without
+        it.  Use `vocabulary.attach(table)` to re-encode a loaded Table."""
+        state = self._get_packed_state()
+        state['vocabulary'] = None
+        state['cell_ids'] = None
+        return state
+
+    def _get_packed_state(self) -> Dict:
+        state = self.__dict__.copy()
+        del state['grid']
+        cells = state.pop('cells')
+        state['shape'] = self.shape
+        tokens = [token for cell in cells for token in cell.tokens]
+        if all(type(cell) is Cell and len(cell.__dict__) == _NUM_CELL_ATTRS
+               for cell in cells) and \
+                all(type(token) is str for token in tokens):
+            cell_positions = np.array(
+                [(cell.index_topleft_row, cell.index_topleft_col,
+                  cell.rowspan, cell.colspan, len(cell.tokens))
+                 for cell in cells], dtype=np.int64).reshape(-1, 5)
+            # smallest unsigned dtype that fits, usually uint8
+            state['cell_positions'] = cell_positions.astype(
+                np.min_scalar_type(cell_positions.max()
+                                   if len(cell_positions) > 0 else 0))
+            state['cell_tokens'] = tokens
+        else:
+            state['cells'] = cells
+        return state
+
+    def __setstate__(self, state: Dict):
+        state = dict(state)
+        nrow, ncol = state.pop('shape')
+        cell_positions = state.pop('cell_positions', None)
+        if cell_positions is not None:
+            tokens = state.pop('cell_tokens')
+            index_token_ends = np.cumsum(cell_positions[:, 4],
+                                         dtype=np.int64).tolist()
+            cells = [Cell(tokens[index_token_end - num_tokens:
+                                 index_token_end],
+                          index_topleft_row, index_topleft_col,
+                          rowspan, colspan)
+                     for (index_topleft_row, index_topleft_col, rowspan,
+                          colspan, num_tokens), index_token_end
+                     in zip(cell_positions.tolist(), index_token_ends)]
+        else:
+            cells = state.pop('cells')
+        self.__dict__.update(state)
+        self.cells = cells
+        self.grid = _grid_from_valid_cells(cells, nrow, ncol)
+
+    def __deepcopy__(self, memo: Dict) -> 'Table':
+        """Copies Cells once each (not once per grid position) and rebuilds
+        the grid.  The `vocabulary` is shared, not copied, since it's meant
+        to be shared across Tables."""
+        state = self._get_packed_state()
+        vocabulary = state.pop('vocabulary', None)
+        table = self.__class__.__new__(self.__class__)
+        memo[id(self)] = table
+        table.__setstate__(deepcopy(state, memo))
+        table.vocabulary = vocabulary
+        return table
+
     @property
     def nrow(self) -> int:
         return self.grid.shape[0]
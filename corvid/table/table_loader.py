@@ -9,6 +9,8 @@ and Table as opposed to needing to override @classmethods
 from typing import Callable, Dict, List
 
 from corvid.table.table import Cell, Table
+from corvid.table.vocabulary import Vocabulary
+from corvid.util.profiling import timed
 
 
 class CellLoader(object):
@@ -22,14 +24,23 @@ class CellLoader(object):
 
 
 class TableLoader(object):
+    """If given a `vocabulary`, every loaded Table has its cell text interned
+    and encoded into `table.cell_ids` (shared across all Tables loaded with
+    the same `vocabulary`)."""
+
     def __init__(self,
                  table_type: Callable[..., Table],
-                 cell_loader: CellLoader):
+                 cell_loader: CellLoader,
+                 vocabulary: Vocabulary = None):
         self.table_type = table_type
         self.cell_loader = cell_loader
+        self.vocabulary = vocabulary
 
+    @timed()
     def from_json(self, json: Dict) -> Table:
         cells = [self.cell_loader.from_json(d) for d in json['cells']]
         kwargs = {k: v for k, v in json.items() if k not in 'cells'}
         table = self.table_type(cells=cells, **kwargs)
+        if self.vocabulary is not None:
+            self.vocabulary.attach(table)
         return table
@@ -0,0 +1,114 @@
+"""
+
+A Vocabulary interns cell text across a corpus of Tables.  Each normalized
+cell string is assigned a dense integer id once (typically at load time via
+`TableLoader`), so Tables can expose an `int32` matrix of ids alongside their
+grid of Cells, and equality and hashing of cells and rows become NumPy
+operations on ids instead of Python string comparisons.
+
+"""
+
+import sys
+
+from typing import Callable
+
+import numpy as np
+
+from corvid.table.table import Cell, Table
+from corvid.util.strings import normalize_cell_text
+
+UNKNOWN_ID = -1
+
+
+class Vocabulary(object):
+    """Maps normalized cell strings to dense integer ids (and back).
+
+    The same Vocabulary must be used for all Tables whose ids are compared;
+    ids from different Vocabularies are meaningless relative to each other.
+    """
+
+    def __init__(self, normalize: Callable[[str], str] = normalize_cell_text):
+        self.normalize = normalize
+        self._string_to_id = {}
+        self._strings = []
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __contains__(self, s: str) -> bool:
+        return self.normalize(s) in self._string_to_id
+
+    def add(self, s: str) -> int:
+        """Returns the id of (normalized) `s`, adding it if unseen"""
+        s = self.normalize(s)
+        index = self._string_to_id.get(s)
+        if index is None:
+            index = len(self._strings)
+            s = sys.intern(s)
+            self._string_to_id[s] = index
+            self._strings.append(s)
+        return index
+
+    def lookup(self, s: str) -> int:
+        """Returns the id of (normalized) `s`, or `UNKNOWN_ID` if unseen"""
+        return self._string_to_id.get(self.normalize(s), UNKNOWN_ID)
+
+    def decode(self, index: int) -> str:
+        return self._strings[index]
+
+    def intern_cell(self, cell: Cell) -> int:
+        """Returns the id of the text of `cell`.  Also replaces `cell.tokens`
+        with a new list of interned strings, so equal tokens are shared by
+        every interned Cell (i.e. `cell` is modified in place)."""
+        cell.tokens = [sys.intern(token) if isinstance(token, str) else token
+                       for token in cell.tokens]
+        return self.add(str(cell))
+
+    def encode_table(self, table: Table, is_grow: bool = True) -> np.ndarray:
+        """Returns an `int32` array of ids with the same shape as
+        `table.grid`.  A multispan Cell's id is repeated over its indices.
+
+        If `is_grow` is False, unseen strings get `UNKNOWN_ID` instead of being
+        added to the Vocabulary."""
+        cell_ids = np.empty(table.shape, dtype=np.int32)
+        # filled via the grid (not `cell.indices`), so e.g. Cells built with
+        # zero spans still get an id;  each Cell is only encoded once
+        cell_to_id = {}
+        for i, row in enumerate(table.grid):
+            for j, cell in enumerate(row):
+                index = cell_to_id.get(id(cell))
+                if index is None:
+                    if is_grow:
+                        index = self.intern_cell(cell)
+                    else:
+                        index = self.lookup(str(cell))
+                    cell_to_id[id(cell)] = index
+                cell_ids[i, j] = index
+        return cell_ids
+
+    def attach(self, table: Table, is_grow: bool = True) -> Table:
+        """Encodes `table` and stores the ids on it as `table.cell_ids`"""
+        table.cell_ids = self.encode_table(table=table, is_grow=is_grow)
+        table.vocabulary = self
+        return table
+
+
+def count_matching_ids(ids1: np.ndarray, ids2: np.ndarray) -> np.ndarray:
+    """Counts positions where `ids1` and `ids2` are equal along the last axis.
+    Broadcasts, so `count_matching_ids(a[:, None, :], b[None, :, :])` gives
+    every pairwise row match count.  Unknown ids never match."""
+    return np.sum((ids1 == ids2) & (ids1 != UNKNOWN_ID), axis=-1)
+
+
+def hash_rows(ids: np.ndarray) -> np.ndarray:
+    """Computes a `uint64` hash of each row of a 2D id array.  Equal rows get
+    equal hashes; unequal rows collide with negligible probability, so
+    hashes are suited to blocking candidate rows for exact comparison."""
+    ids = np.asarray(ids, dtype=np.int64).astype(np.uint64)
+    hashes = np.full(ids.shape[0], np.uint64(14695981039346656037),
+                     dtype=np.uint64)
+    prime = np.uint64(1099511628211)
+    with np.errstate(over='ignore'):
+        for j in range(ids.shape[1]):
+            hashes = (hashes ^ ids[:, j]) * prime
+    return hashes
@@ -7,10 +7,19 @@ Compute evaluation metrics between `gold` and `pred` Tables
 from typing import Dict, List
 
 import numpy as np
-from scipy.optimize import linear_sum_assignment
 
 from corvid.table.table import Cell, Table
-from corvid.util.lists import compute_similarity, compute_best_alignments
+from corvid.table.vocabulary import UNKNOWN_ID, count_matching_ids, \
+    hash_rows
+from corvid.util.lists import compute_similarity, compute_best_alignments, \
+    compute_best_alignments_sparse
+from corvid.util.strings import normalize_cell_text
+from corvid.util.profiling import span
+from corvid.util.lazy import lazy_import
+
+sparse = lazy_import('scipy.sparse')
+
+CELL_LEVEL_RECALL_MODES = ['exact', 'fast']
 
 
 def count_matching_cells(row1: List[Cell], row2: List[Cell]) -> float:
@@ -25,7 +34,7 @@ def count_matching_cells(row1: List[Cell], row2: List[Cell]) -> float:
     return compute_similarity(
         x=row1,
         y=row2,
-        sim=lambda cell1, cell2: str(cell1).lower().strip() == str(cell2).lower().strip(),
+        sim=lambda cell1, cell2: normalize_cell_text(str(cell1)) == normalize_cell_text(str(cell2)),
         agg=sum)
 
 
@@ -47,6 +56,16 @@ def row_level_recall(gold_table: Table, pred_table: Table) -> int:
 
     assert gold_table.nrow > 1
 
+    if _is_comparable_cell_ids(gold_table, pred_table) and \
+            gold_table.ncol == pred_table.ncol:
+        gold_ids = gold_table.cell_ids[1:, 1:]
+        pred_ids = pred_table.cell_ids[1:, 1:]
+        # unknown ids never match, though their strings might
+        if not np.any(gold_ids == UNKNOWN_ID) and \
+                not np.any(pred_ids == UNKNOWN_ID):
+            return _count_row_matches_by_ids(gold_ids, pred_ids) / \
+                   (gold_table.nrow - 1)
+
     max_match_count = gold_table.ncol - 1
 
     row_match_count = 0
@@ -66,7 +85,108 @@ def row_level_recall(gold_table: Table, pred_table: Table) -> int:
     return row_match_count / (gold_table.nrow - 1)
 
 
-def cell_level_recall(gold_table: Table, pred_table: Table) -> float:
+def _count_row_matches_by_ids(gold_ids: np.ndarray,
+                              pred_ids: np.ndarray) -> int:
+    """Same count as the loop in `row_level_recall`, i.e. the number of pred
+    rows equal to some gold row, but over integer cell ids.  Rows are
+    blocked by hash, and only pred rows whose hash is shared are compared."""
+    gold_hashes = hash_rows(gold_ids)
+    index_gold_rows = {}
+    for index_gold_row, row_hash in enumerate(gold_hashes.tolist()):
+        index_gold_rows.setdefault(row_hash, []).append(index_gold_row)
+
+    num_cols = gold_ids.shape[1]
+    row_match_count = 0
+    for index_pred_row, row_hash in enumerate(hash_rows(pred_ids).tolist()):
+        candidates = index_gold_rows.get(row_hash)
+        if candidates is not None and np.any(count_matching_ids(
+                gold_ids[candidates], pred_ids[index_pred_row]) == num_cols):
+            row_match_count += 1
+    return row_match_count
+
+
+def compute_matching_cell_counts(gold_rows: np.ndarray,
+                                 pred_rows: np.ndarray) -> 'csr_matrix':
+    """Computes a sparse (gold rows x pred rows) matrix of the number of
+    matching cells between each pair of rows, assuming their columns are
+    aligned.  Equivalent to applying `count_matching_cells` to every pair,
+    but only pairs sharing at least one cell are ever represented.
+
+    Each row is encoded as a set of (column index, cell text) features via an
+    inverted index, so the counts reduce to a sparse matrix product.
+
+    Rows can be given either as Cells or as integer `cell_ids` from a shared
+    `Vocabulary`, in which case the features are built without touching
+    strings.
+    """
+    if gold_rows.shape[1] != pred_rows.shape[1]:
+        raise Exception('Unequal number of cells in each row')
+
+    if np.issubdtype(gold_rows.dtype, np.integer) and \
+            np.issubdtype(pred_rows.dtype, np.integer):
+        return _compute_matching_cell_id_counts(gold_ids=gold_rows,
+                                                pred_ids=pred_rows)
+
+    vocab = {}
+
+    def _encode(rows: np.ndarray, is_grow_vocab: bool) -> 'csr_matrix':
+        indices, indptr = [], [0]
+        for row in rows:
+            for j, cell in enumerate(row):
+                key = (j, normalize_cell_text(str(cell)))
+                if is_grow_vocab:
+                    indices.append(vocab.setdefault(key, len(vocab)))
+                elif key in vocab:
+                    indices.append(vocab[key])
+            indptr.append(len(indices))
+        return sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(len(rows), max(len(vocab), 1)))
+
+    # only pred features that occur in gold can contribute to a match
+    with span('similarity_matrix', shape=[len(gold_rows), len(pred_rows)]):
+        gold_features = _encode(gold_rows, is_grow_vocab=True)
+        pred_features = _encode(pred_rows, is_grow_vocab=False)
+        counts = gold_features.dot(pred_features.T).tocsr()
+    counts.eliminate_zeros()
+    return counts
+
+
+def _compute_matching_cell_id_counts(gold_ids: np.ndarray,
+                                     pred_ids: np.ndarray) -> 'csr_matrix':
+    """Same as `compute_matching_cell_counts` but for integer cell ids"""
+    ncol = gold_ids.shape[1]
+    n_ids = max([ids.max() + 1 for ids in [gold_ids, pred_ids] if ids.size] +
+                [1])
+
+    def _encode(ids: np.ndarray) -> 'csr_matrix':
+        nrow = ids.shape[0]
+        index_rows = np.repeat(np.arange(nrow), ncol)
+        index_features = ids.astype(np.int64).ravel() * ncol + \
+                         np.tile(np.arange(ncol), nrow)
+        is_known = ids.ravel() != UNKNOWN_ID
+        return sparse.csr_matrix(
+            (np.ones(is_known.sum()),
+             (index_rows[is_known], index_features[is_known])),
+            shape=(nrow, n_ids * ncol))
+
+    with span('similarity_matrix', shape=[len(gold_ids), len(pred_ids)]):
+        counts = _encode(gold_ids).dot(_encode(pred_ids).T).tocsr()
+    counts.eliminate_zeros()
+    return counts
+
+
+def _is_comparable_cell_ids(gold_table: Table, pred_table: Table) -> bool:
+    """Whether both Tables have `cell_ids` from the same `Vocabulary` that
+    normalizes cell text the same way as `count_matching_cells`"""
+    return gold_table.cell_ids is not None and \
+           pred_table.cell_ids is not None and \
+           gold_table.vocabulary is pred_table.vocabulary and \
+           gold_table.vocabulary.normalize is normalize_cell_text
+
+
+def cell_level_recall(gold_table: Table, pred_table: Table,
+                      mode: str = 'exact') -> float:
     """Computes normalized count of cells in `gold` reproduced in `pred`
 
     For example:
@@ -85,10 +205,34 @@ def cell_level_recall(gold_table: Table, pred_table: Table) -> float:
     their sum total of matching cells is maximized can be solved via
     the Hungarian algorithm (aka Kuhn-Munkres).  See
     https://docs.scipy.org/doc/scipy-0.18.1/reference/generated/scipy.optimize.linear_sum_assignment.html
+
+    * `mode='exact'` scores every pair of rows in a dense matrix.
+    `mode='fast'` only scores pairs of rows that share at least one cell and
+    solves the assignment on the resulting sparse graph.  Rows sharing no
+    cells have 0 matches, so both modes return the same recall; use 'fast'
+    for very tall tables.  If both Tables were encoded by the same
+    `Vocabulary`, 'fast' works on their `cell_ids` directly.
     """
 
     assert gold_table.nrow > 1
 
+    if mode not in CELL_LEVEL_RECALL_MODES:
+        raise ValueError('`mode` must be one of {}'
+                         .format(CELL_LEVEL_RECALL_MODES))
+
+    if mode == 'fast':
+        if _is_comparable_cell_ids(gold_table, pred_table):
+            gold_rows = gold_table.cell_ids[1:, 1:]
+            pred_rows = pred_table.cell_ids[1:, 1:]
+        else:
+            gold_rows = gold_table.grid[1:, 1:]
+            pred_rows = pred_table.grid[1:, 1:]
+        cell_match_counts = compute_matching_cell_counts(gold_rows=gold_rows,
+                                                         pred_rows=pred_rows)
+        score, row_mappings = compute_best_alignments_sparse(
+            sim_matrix=cell_match_counts)
+        return score / ((gold_table.nrow - 1) * (gold_table.ncol - 1))
+
     # cell_match_counts = np.array([
     #     [
     #         count_matching_cells(row1=gold_row, row2=pred_row)
@@ -110,7 +254,8 @@ def cell_level_recall(gold_table: Table, pred_table: Table) -> float:
 
 
 # TODO: link to documentation that describes formulas for each of these
-def evaluate(gold_table: Table, pred_table: Table) -> Dict[str, float]:
+def evaluate(gold_table: Table, pred_table: Table,
+             mode: str = 'exact') -> Dict[str, float]:
     """Computes all evaluation metrics between a `gold` and `pred` Table pair"""
 
     for gold_cell, pred_cell in zip(gold_table.grid[0, :],
@@ -120,5 +265,6 @@ def evaluate(gold_table: Table, pred_table: Table) -> Dict[str, float]:
 
     return {
         'row_level_recall': row_level_recall(gold_table, pred_table),
-        'cell_level_recall': cell_level_recall(gold_table, pred_table)
+        'cell_level_recall': cell_level_recall(gold_table, pred_table,
+                                               mode=mode)
     }
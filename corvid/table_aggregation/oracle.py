@@ -4,8 +4,11 @@ import numpy as np
 
 from corvid.table.table import Table, Cell
 
+from corvid.table.vocabulary import count_matching_ids
 from corvid.util.lists import compute_best_alignments, \
-    compute_best_alignments_with_threshold, compute_intersection
+    compute_best_alignments_from_matrix_with_threshold, encode_values, \
+    count_unique, compute_intersection_size_from_counts
+from corvid.util.profiling import span
 
 
 def predict_oracle(source_tables: List[Table], gold_table: Table) -> Table:
@@ -31,6 +34,13 @@ def predict_oracle(source_tables: List[Table], gold_table: Table) -> Table:
             s['source'] = np.append(s['source'], padding, axis=1)
         sources.append(s)
 
+    # integer-encode cell strings once so column overlaps are array ops
+    vocab = {}
+    gold_ids = encode_values(gold.ravel(), vocab).reshape(gold.shape)
+    for s in sources:
+        s['source_ids'] = encode_values(s['source'].ravel(), vocab) \
+            .reshape(s['source'].shape)
+
     # initialize predicted output
     pred = np.array([[str(cell) for cell in gold_table.grid[0, :]]],
                     dtype=object)
@@ -42,17 +52,16 @@ def predict_oracle(source_tables: List[Table], gold_table: Table) -> Table:
         #
         scores = []
         all_column_mappings = []
+        # represent each column j as counts of cells [ cell_1j, cell_2j, ... ]
+        # gold & source can have differing-length columns
+        gold_cols = [count_unique(col) for col in gold_ids.T]
         for s in sources:
-            # represent each column j as a list [ cell_1j, cell_2j, ... ]
-            # gold & source can have differing-length columns
-            gold_cols = [list(col) for col in zip(*gold)]
-            source_cols = [list(col) for col in zip(*s['source'])]
+            source_cols = [count_unique(col) for col in s['source_ids'].T]
 
             # align columns between gold & source
             score, column_mappings = compute_best_alignments(
                 x=gold_cols, y=source_cols,
-                sim=lambda gold_col, source_col:
-                len(compute_intersection(x=gold_col, y=source_col))
+                sim=compute_intersection_size_from_counts
             )
             scores.append(score)
             all_column_mappings.append(column_mappings)
@@ -66,6 +75,7 @@ def predict_oracle(source_tables: List[Table], gold_table: Table) -> Table:
             source_col for gold_col, source_col in best_column_mappings
         ]
         source = s['source'][:, permute_source_cols]
+        source_ids = s['source_ids'][:, permute_source_cols]
         subject = s['subject']
 
         #
@@ -73,17 +83,18 @@ def predict_oracle(source_tables: List[Table], gold_table: Table) -> Table:
         #
         # represent each row i as a tuple = ( cell_i1, cell_i2, ..., cell_ik )
         #  where k = ncol(gold)
-        gold_rows = [tuple(cell for cell in row) for row in gold]
         source_rows = [tuple(cell for cell in row) for row in source]
 
-        # align rows between gold & source
+        # align rows between gold & source, scoring every pair of rows by
+        # their number of equal cells at once
         # if score is 0, then break because no more matching is possible
-        score, row_mappings = compute_best_alignments_with_threshold(
-            x=gold_rows, y=source_rows,
-            sim=lambda gold_row, source_row:
-            sum([g_i == s_i for g_i, s_i in zip(gold_row, source_row)]),
-            threshold=0
-        )
+        with span('similarity_matrix',
+                  shape=[len(gold_ids), len(source_ids)]):
+            row_match_counts = count_matching_ids(gold_ids[:, None, :],
+                                                  source_ids[None, :, :])
+        score, row_mappings = \
+            compute_best_alignments_from_matrix_with_threshold(
+                row_match_counts, threshold=0)
         if score == 0:
             break
         index_gold_rows = []
@@ -105,6 +116,7 @@ def predict_oracle(source_tables: List[Table], gold_table: Table) -> Table:
         # (4) remove gold rows that matched
         #
         gold = np.delete(gold, index_gold_rows, axis=0)
+        gold_ids = np.delete(gold_ids, index_gold_rows, axis=0)
 
     return Table(grid=[[Cell([cell], i, j, 0, 0)
                         for j, cell in enumerate(row)]
@@ -0,0 +1,150 @@
+"""
+
+Index over a catalog of known target schemas, for finding which schema a new
+Table belongs to without aligning it against every schema in the catalog.
+
+Each schema (and each query Table) is represented by a TF-IDF weighted,
+L2-normalized sparse vector of the character n-grams of its column names
+(excluding the first, subject column).  Cosine similarity between a query
+and every schema is a single sparse matrix product, which only touches
+schemas sharing at least one n-gram with the query.  Only the top-k
+candidates are then aligned exactly with `ColNameSchemaMatcher`.
+
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+from corvid.table.table import Table
+from corvid.table_aggregation.schema_matcher import ColNameSchemaMatcher, \
+    build_schema_table
+from corvid.util.strings import tokenize_cached
+from corvid.util.lazy import lazy_import
+
+sparse = lazy_import('scipy.sparse')
+
+
+def extract_ngrams(column_names: List[str], ngram_size: int = 3) -> List[str]:
+    """Character n-grams of each (tokenized, lowercased) column name, padded
+    with spaces so short names and word boundaries also produce n-grams"""
+    ngrams = []
+    for name in column_names:
+        text = ' {} '.format(' '.join(tokenize_cached(name)).lower())
+        if len(text) <= ngram_size:
+            ngrams.append(text)
+        else:
+            ngrams.extend(text[i:i + ngram_size]
+                          for i in range(len(text) - ngram_size + 1))
+    return ngrams
+
+
+def _column_names(table: Table) -> List[str]:
+    return [str(table[0, j]) for j in range(1, table.ncol)]
+
+
+class SchemaCatalog(object):
+    """For example:
+
+        catalog = SchemaCatalog(schemas=[['', 'BLEU', 'METEOR'],
+                                         ['', 'Accuracy', 'F1'], ...])
+        catalog.shortlist(table, k=10)  # [(schema index, cosine sim), ...]
+        index, score, column_alignments = catalog.match(table, k=10)
+    """
+
+    def __init__(self, schemas: List[List[str]], ngram_size: int = 3,
+                 schema_matcher: ColNameSchemaMatcher = None):
+        """Each schema is a list of column names, including the first
+        (subject) column, as passed to `ColNameSchemaMatcher.predict`"""
+        assert ngram_size > 0
+        self.schemas = [list(schema) for schema in schemas]
+        self.ngram_size = ngram_size
+        self.schema_matcher = schema_matcher or ColNameSchemaMatcher()
+
+        self._vocab = {}
+        counts = self._count_ngrams([schema[1:] for schema in self.schemas],
+                                    is_grow_vocab=True)
+        document_frequency = np.bincount(counts.indices,
+                                         minlength=len(self._vocab))
+        self._idf = np.log((1.0 + len(self.schemas)) /
+                           (1.0 + document_frequency)) + 1.0
+        self._matrix = self._to_tfidf(counts)
+        self._schema_tables = {}
+
+    def __len__(self) -> int:
+        return len(self.schemas)
+
+    def _count_ngrams(self, column_name_lists: List[List[str]],
+                      is_grow_vocab: bool) -> 'csr_matrix':
+        indices, indptr = [], [0]
+        for column_names in column_name_lists:
+            for ngram in extract_ngrams(column_names, self.ngram_size):
+                if is_grow_vocab:
+                    indices.append(self._vocab.setdefault(ngram,
+                                                          len(self._vocab)))
+                elif ngram in self._vocab:
+                    indices.append(self._vocab[ngram])
+            indptr.append(len(indices))
+        counts = sparse.csr_matrix(
+            (np.ones(len(indices)), indices, indptr),
+            shape=(len(column_name_lists), max(len(self._vocab), 1)))
+        # duplicate n-grams within a row are summed into one entry
+        counts.sum_duplicates()
+        return counts
+
+    def _to_tfidf(self, counts: 'csr_matrix') -> 'csr_matrix':
+        idf = np.zeros(counts.shape[1])
+        idf[:len(self._idf)] = self._idf
+        tfidf = counts.multiply(idf.reshape(1, -1)).tocsr()
+        norms = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1))
+                        .ravel())
+        norms[norms == 0] = 1.0
+        return sparse.diags(1.0 / norms).dot(tfidf).tocsr()
+
+    def shortlist_many(self, tables: List[Table],
+                       k: int = 10) -> List[List[Tuple[int, float]]]:
+        """Top-`k` (schema index, cosine similarity) for each Table, most
+        similar first.  Schemas with similarity 0 are never returned."""
+        tables = list(tables)
+        if not tables or not self.schemas:
+            return [[] for _ in tables]
+        queries = self._to_tfidf(self._count_ngrams(
+            [_column_names(table) for table in tables], is_grow_vocab=False))
+        sims = queries.dot(self._matrix.T).tocsr()
+
+        shortlists = []
+        for i in range(len(tables)):
+            row = sims.getrow(i)
+            index_schemas, scores = row.indices, row.data
+            if len(scores) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                index_schemas, scores = index_schemas[top], scores[top]
+            order = np.lexsort((index_schemas, -scores))
+            shortlists.append([(int(index_schemas[j]), float(scores[j]))
+                               for j in order if scores[j] > 0])
+        return shortlists
+
+    def shortlist(self, table: Table, k: int = 10) -> List[Tuple[int, float]]:
+        return self.shortlist_many([table], k=k)[0]
+
+    def match(self, table: Table, k: int = 10) -> \
+            Tuple[int, float, List[Tuple[int, int]]]:
+        """Aligns `table` exactly against its top-`k` shortlisted schemas and
+        returns the best (schema index, alignment score, column alignments),
+        as given by `compute_column_alignments_by_column_names`.  Returns
+        (None, 0.0, []) if no schema shares any n-gram with `table`."""
+        best = (None, 0.0, [])
+        for index, _ in self.shortlist(table, k=k):
+            score, column_alignments = \
+                self.schema_matcher.compute_column_alignments_by_column_names(
+                    self._get_schema_table(index), table)
+            if best[0] is None or score > best[1]:
+                best = (index, score, column_alignments)
+        return best
+
+    def _get_schema_table(self, index: int) -> Table:
+        schema_table = self._schema_tables.get(index)
+        if schema_table is None:
+            schema_table = self._schema_tables[index] = \
+                build_schema_table(self.schemas[index])
+        return schema_table
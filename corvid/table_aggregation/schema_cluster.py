@@ -0,0 +1,162 @@
+"""
+
+Groups Tables that share a schema so each group can be aggregated separately.
+
+Every Table is described by two sets of features:  the tokens of its column
+names (header) and the texts of its subject column (values).  Similarity
+between two Tables is a weighted sum of the Jaccard similarities of these
+sets, and Tables are connected in a sparse similarity graph if their
+similarity is at least a threshold.  Clusters are the connected components of
+this graph, i.e. single-linkage clusters (the same as cutting the minimum
+spanning tree of the graph at the threshold).
+
+To avoid scoring all O(k^2) pairs of k Tables, only pairs sharing at least one
+feature are scored ("blocking"), and features shared by more than
+`max_block_size` Tables (e.g. 'accuracy') aren't used to propose pairs, so the
+work grows near-linearly with the number of Tables.
+
+"""
+
+from typing import List, Tuple, Set
+
+import numpy as np
+
+from corvid.table.table import Table
+from corvid.table_aggregation.schema_matcher import SchemaMatcher, \
+    ColNameSchemaMatcher
+from corvid.util.strings import tokenize_cached, normalize_cell_text
+from corvid.util.lazy import lazy_import
+from corvid.util.profiling import span
+
+sparse = lazy_import('scipy.sparse')
+csgraph = lazy_import('scipy.sparse.csgraph')
+
+
+def extract_header_features(table: Table) -> Set[str]:
+    """Lowercased tokens of the column names (excluding the first column)"""
+    return {token.lower() for j in range(1, table.ncol)
+            for token in tokenize_cached(str(table[0, j]))}
+
+
+def extract_value_features(table: Table) -> Set[str]:
+    """Nonempty normalized texts of the subject column (excluding header)"""
+    texts = {normalize_cell_text(str(table[i, 0]))
+             for i in range(1, table.nrow)}
+    texts.discard('')
+    return texts
+
+
+def _to_binary_matrix(feature_sets: List[Set[str]]) -> 'csr_matrix':
+    vocab = {}
+    indices, indptr = [], [0]
+    for features in feature_sets:
+        indices.extend(sorted(vocab.setdefault(f, len(vocab))
+                              for f in features))
+        indptr.append(len(indices))
+    return sparse.csr_matrix((np.ones(len(indices)), indices, indptr),
+                             shape=(len(feature_sets), max(len(vocab), 1)))
+
+
+def _compute_jaccard(features: 'csr_matrix', index_x: np.ndarray,
+                     index_y: np.ndarray) -> np.ndarray:
+    """Jaccard similarity of the feature sets of each pair (x_i, y_i)"""
+    intersection = np.asarray(features[index_x].multiply(features[index_y])
+                              .sum(axis=1)).ravel()
+    sizes = np.asarray(features.sum(axis=1)).ravel()
+    union = sizes[index_x] + sizes[index_y] - intersection
+    return np.where(union > 0, intersection / np.maximum(union, 1), 0.0)
+
+
+class SchemaClusterer(object):
+    """Clusters Tables by schema, then aggregates each cluster.  For example:
+
+        clusterer = SchemaClusterer(threshold=0.5)
+        clusters = clusterer.cluster(tables)  # lists of indices into tables
+        aggregated_tables = clusterer.aggregate(tables)
+    """
+
+    def __init__(self,
+                 threshold: float = 0.5,
+                 header_weight: float = 0.75,
+                 max_block_size: int = 100,
+                 schema_matcher: SchemaMatcher = None):
+        """`header_weight` is the weight of header similarity; the remainder
+        goes to value similarity"""
+        assert 0.0 <= header_weight <= 1.0 and max_block_size > 1
+        self.threshold = threshold
+        self.header_weight = header_weight
+        self.max_block_size = max_block_size
+        self.schema_matcher = schema_matcher or ColNameSchemaMatcher()
+
+    def compute_similarity_graph(self, tables: List[Table]) -> 'csr_matrix':
+        """Returns a sparse symmetric (k x k) matrix whose entry (i, j) is the
+        similarity of Tables i and j, for every blocked pair whose similarity
+        is at least `threshold`"""
+        n = len(tables)
+        header = _to_binary_matrix([extract_header_features(t)
+                                    for t in tables])
+        values = _to_binary_matrix([extract_value_features(t)
+                                    for t in tables])
+
+        with span('schema_cluster.blocking', num_tables=n):
+            # propose pairs sharing at least one sufficiently rare feature
+            blocking = sparse.hstack([header, values], format='csc')
+            document_frequency = np.diff(blocking.indptr)
+            is_rare = (document_frequency > 1) & \
+                      (document_frequency <= self.max_block_size)
+            blocking = blocking[:, np.flatnonzero(is_rare)].tocsr()
+            candidates = sparse.triu(blocking.dot(blocking.T), k=1).tocoo()
+            index_x, index_y = candidates.row, candidates.col
+
+        with span('schema_cluster.scoring', num_pairs=len(index_x)):
+            sims = self.header_weight * \
+                   _compute_jaccard(header, index_x, index_y) + \
+                   (1.0 - self.header_weight) * \
+                   _compute_jaccard(values, index_x, index_y)
+
+        is_edge = sims >= self.threshold
+        graph = sparse.coo_matrix((sims[is_edge], (index_x[is_edge],
+                                                   index_y[is_edge])),
+                                  shape=(n, n)).tocsr()
+        return (graph + graph.T).tocsr()
+
+    def _cluster(self, tables: List[Table]) -> Tuple['csr_matrix',
+                                                      List[List[int]]]:
+        graph = self.compute_similarity_graph(tables)
+        _, labels = csgraph.connected_components(graph, directed=False)
+        clusters = {}
+        for index, label in enumerate(labels):
+            clusters.setdefault(label, []).append(index)
+        return graph, sorted(clusters.values(), key=lambda c: (-len(c), c[0]))
+
+    def cluster(self, tables: List[Table]) -> List[List[int]]:
+        """Returns clusters as lists of indices into `tables`, largest
+        cluster first (ties broken by first index)"""
+        tables = list(tables)
+        if not tables:
+            return []
+        _, clusters = self._cluster(tables)
+        return clusters
+
+    def aggregate(self, tables: List[Table],
+                  min_cluster_size: int = 1) -> List[Table]:
+        """Aggregates each cluster of at least `min_cluster_size` Tables into
+        one Table, whose schema is the header of the cluster's most central
+        Table (the one with the largest total similarity to the others)"""
+        tables = list(tables)
+        if not tables:
+            return []
+        graph, clusters = self._cluster(tables)
+        weighted_degree = np.asarray(graph.sum(axis=1)).ravel()
+
+        aggregated_tables = []
+        for cluster in clusters:
+            if len(cluster) < min_cluster_size:
+                continue
+            index_center = max(cluster, key=lambda i: weighted_degree[i])
+            target_schema = [str(cell) for cell in
+                             tables[index_center].grid[0, :]]
+            aggregated_tables.append(self.schema_matcher.predict(
+                tables=[tables[i] for i in cluster],
+                target_schema=target_schema))
+        return aggregated_tables
@@ -1,13 +1,48 @@
-from typing import List, Callable, Tuple
+from typing import Callable, Iterable, List, Tuple
 
 import numpy as np
-from scipy.sparse import csr_matrix
-from scipy.sparse.csgraph import minimum_spanning_tree
-from fuzzywuzzy import fuzz
 
 from corvid.table.table import Table, Cell
 
-from corvid.util.lists import compute_best_alignments_with_threshold
+from corvid.util.lists import compute_best_alignments_with_threshold, \
+    compute_best_alignments_from_matrix_with_threshold
+from corvid.util.strings import tokenize_cached
+from corvid.util.lazy import lazy_import
+from corvid.util.memo import SimilarityCache
+from corvid.util.profiling import span, timed
+
+fuzz = lazy_import('fuzzywuzzy.fuzz')
+fuzz_utils = lazy_import('fuzzywuzzy.utils')
+
+
+def compute_column_name_similarity(c1: str, c2: str) -> float:
+    """Token-order-invariant fuzzy similarity of two column names in [0, 1]"""
+    return fuzz.token_set_ratio(c1, c2) / 100
+
+
+def normalize_column_name(s: str) -> str:
+    """Lowercased alphanumeric text of `s`, i.e. what `token_set_ratio`
+    compares, so e.g. 'Acc.' and 'acc' have the same similarities"""
+    return fuzz_utils.full_process(s, force_ascii=True)
+
+
+# shared by every ColNameSchemaMatcher that isn't given its own cache, since
+# the same column names (e.g. 'Accuracy', 'F1') recur across many Tables.
+# `token_set_ratio` isn't symmetric without python-Levenshtein, so (a, b) and
+# (b, a) are cached separately.
+COLUMN_NAME_SIMILARITY_CACHE = SimilarityCache(
+    compute_column_name_similarity, is_symmetric=False,
+    normalize=normalize_column_name)
+
+
+def build_schema_table(target_schema: List[str]) -> Table:
+    """Single-row Table whose header is `target_schema`"""
+    return Table(cells=[Cell(tokens=[s],
+                             index_topleft_row=0,
+                             index_topleft_col=j,
+                             rowspan=1, colspan=1)
+                        for j, s in enumerate(target_schema)],
+                 nrow=1, ncol=len(target_schema))
 
 
 class SchemaMatcher(object):
@@ -16,25 +51,60 @@ class SchemaMatcher(object):
 
 
 class ColNameSchemaMatcher(SchemaMatcher):
-    def predict(self, tables: List[Table], target_schema: List[str]) -> Table:
-        schema_table = Table(cells=[Cell(tokens=[s],
-                                         index_topleft_row=0,
-                                         index_topleft_col=j,
-                                         rowspan=1, colspan=1)
-                                    for j, s in enumerate(target_schema)],
-                             nrow=1, ncol=len(target_schema))
-
-        # match each table to the schema (order doesnt matter)
+    def __init__(self, similarity_cache: SimilarityCache = None):
+        """Column name similarities are memoized in `similarity_cache`
+        (default: `COLUMN_NAME_SIMILARITY_CACHE`)"""
+        if similarity_cache is None:
+            similarity_cache = COLUMN_NAME_SIMILARITY_CACHE
+        self.similarity_cache = similarity_cache
+
+    def predict(self, tables: Iterable[Table],
+                target_schema: List[str]) -> Table:
+        """Merges `tables` one at a time as they arrive, so `tables` can be
+        a stream (e.g. the output of a `Pipeline`)"""
+        schema_table = build_schema_table(target_schema)
+
+        # alignments only depend on the header, which merging never changes,
+        # so each table is matched to the schema (order doesnt matter).
+        # aligned rows are collected and the merged Table built once at the
+        # end, instead of rebuilding it after every table
+        rows = self._table_to_rows(schema_table)
         for table in tables:
-            score, column_alignments = \
+            _, column_alignments = \
                 self.compute_column_alignments_by_column_names(schema_table,
                                                                table)
-            schema_table = self.merge_two_tables(target=schema_table,
-                                                 source=table,
-                                                 column_alignments=column_alignments)
-        return schema_table
+            rows.extend(self._align_rows(
+                source=table, column_alignments=column_alignments,
+                ncol=schema_table.ncol))
+        return self._rows_to_table(rows)
+
+    def predict_many(self, table_lists: List[List[Table]],
+                     target_schema: List[str]) -> List[Table]:
+        """Same as calling `predict` on each list of Tables, but all Tables
+        are aligned to `target_schema` in one batch (see
+        `compute_column_alignments_many`), so every Table is held in memory
+        at once.  Use `predict` to stream Tables instead."""
+        table_lists = [list(tables) for tables in table_lists]
+        schema_table = build_schema_table(target_schema)
+        alignments = self.compute_column_alignments_many(
+            schema_table, [table for tables in table_lists
+                           for table in tables])
+
+        # alignments only depend on the header, which merging never changes,
+        # so each table is matched to the schema (order doesnt matter)
+        predicted_tables = []
+        index_alignment = 0
+        for tables in table_lists:
+            rows = self._table_to_rows(schema_table)
+            for table in tables:
+                _, column_alignments = alignments[index_alignment]
+                index_alignment += 1
+                rows.extend(self._align_rows(
+                    source=table, column_alignments=column_alignments,
+                    ncol=schema_table.ncol))
+            predicted_tables.append(self._rows_to_table(rows))
+        return predicted_tables
 
-    # TODO: replace `str(cell)` with additional tokenization and processing
     # TODO: allow for matching to columns containing NONE strings
     def compute_column_alignments_by_column_names(self, t1: Table,
                                                   t2: Table) -> \
@@ -45,7 +115,7 @@ class ColNameSchemaMatcher(SchemaMatcher):
         Table similarity equals the sum of column similarities.
 
         Column similarity equals the string edit distance between the column names
-        (string is tokenized and distance is token-order-invariant).
+        (string is tokenized via `tokenize` and distance is token-order-invariant).
 
         Returns the table similarity score, and a list of tuples (i, j) where i
         is the column index for t1 and j is the column index for t2.
@@ -53,16 +123,52 @@ class ColNameSchemaMatcher(SchemaMatcher):
         Similarity scores are thresholded such that scores 0.0 or below have their
         alignments removed.
         """
-        t1_cols = [str(t1[0, j]) for j in range(1, t1.ncol)]
-        t2_cols = [str(t2[0, j]) for j in range(1, t2.ncol)]
+        t1_cols = [' '.join(tokenize_cached(str(t1[0, j])))
+                   for j in range(1, t1.ncol)]
+        t2_cols = [' '.join(tokenize_cached(str(t2[0, j])))
+                   for j in range(1, t2.ncol)]
         score, column_alignments = compute_best_alignments_with_threshold(
             x=t1_cols, y=t2_cols,
-            sim=lambda c1, c2: fuzz.token_set_ratio(c1, c2) / 100,
+            sim=self.similarity_cache,
             threshold=0.0
         )
         # matching ignores first column, so indices need to be incremented by 1
         return score, [(0, 0)] + [(i + 1, j + 1) for i, j in column_alignments]
 
+    def compute_column_alignments_many(self, t1: Table,
+                                       tables: List[Table]) -> \
+            List[Tuple[float, List[Tuple[int, int]]]]:
+        """Same as `compute_column_alignments_by_column_names(t1, t2)` for
+        each t2 in `tables`, but `t1` is preprocessed once and similarities
+        are computed once per distinct pair of column names, in one matrix
+        shared by all `tables`"""
+        t1_cols = [' '.join(tokenize_cached(str(t1[0, j])))
+                   for j in range(1, t1.ncol)]
+        index_cols = {}
+        table_index_cols = []
+        for table in tables:
+            table_index_cols.append(np.array(
+                [index_cols.setdefault(' '.join(tokenize_cached(
+                    str(table[0, j]))), len(index_cols))
+                 for j in range(1, table.ncol)], dtype=int))
+
+        with span('similarity_matrix', shape=[len(t1_cols), len(index_cols)]):
+            sim_matrix = np.array([[self.similarity_cache(c1, c2)
+                                    for c2 in index_cols] for c1 in t1_cols],
+                                  dtype=float).reshape(len(t1_cols),
+                                                       len(index_cols))
+
+        results = []
+        for index_table_cols in table_index_cols:
+            score, column_alignments = \
+                compute_best_alignments_from_matrix_with_threshold(
+                    sim_matrix[:, index_table_cols], threshold=0.0)
+            # matching ignores first column, so indices need to be incremented
+            results.append((score, [(0, 0)] + [(i + 1, j + 1) for i, j
+                                               in column_alignments]))
+        return results
+
+    @timed()
     def merge_two_tables(self, target: Table, source: Table,
                          column_alignments: List[Tuple[int, int]],
                          pad: str = 'NONE') -> Table:
@@ -71,32 +177,32 @@ class ColNameSchemaMatcher(SchemaMatcher):
         the `target` column and the `source` column, respectively.
 
         Unaligned target columns are padded."""
-
-        t = np.array([[str(cell) for cell in row] for row in target.grid],
-                     dtype=object)
-        s = np.array([[str(cell) for cell in row] for row in source.grid[1:]],
-                     dtype=object)
-        index_t_cols = [i for i, j in column_alignments]
-        index_s_cols = [j for i, j in column_alignments]
-
-        new_rows = np.array([], dtype=object).reshape(source.nrow - 1, 0)
-        for j in range(target.ncol):
-            # target column has a source column alignment
-            if j in index_t_cols:
-                new_col = s[:, index_s_cols[index_t_cols.index(j)]] \
-                    .reshape(source.nrow - 1, 1)
-            # padding if target column doesnt have a source column alignment
-            else:
-                new_col = np.array([[pad]] * (source.nrow - 1), dtype=object)
-
-            new_rows = np.append(new_rows, new_col, axis=1)
-
         # append rows of permuted source (excluding header) into target
-        t = np.append(t, new_rows, axis=0)
-
-        # convert to a table
-        new_table = Table(grid=[[Cell([cell], i, j)
-                                 for j, cell in enumerate(row)]
-                                for i, row in enumerate(t)])
-        return new_table
+        rows = self._table_to_rows(target)
+        rows.extend(self._align_rows(source=source,
+                                     column_alignments=column_alignments,
+                                     ncol=target.ncol, pad=pad))
+        return self._rows_to_table(rows)
+
+    @classmethod
+    def _table_to_rows(cls, table: Table) -> List[List[str]]:
+        return [[str(cell) for cell in row] for row in table.grid]
+
+    @classmethod
+    def _align_rows(cls, source: Table,
+                    column_alignments: List[Tuple[int, int]], ncol: int,
+                    pad: str = 'NONE') -> List[List[str]]:
+        """Rows of `source` (excluding header) permuted into `ncol` target
+        columns by `column_alignments`.  Target columns without a source
+        column alignment are padded."""
+        index_s_cols = [None] * ncol
+        for i, j in reversed(column_alignments):
+            index_s_cols[i] = j
+        return [[pad if j is None else str(row[j]) for j in index_s_cols]
+                for row in source.grid[1:]]
+
+    @classmethod
+    def _rows_to_table(cls, rows: List[List[str]]) -> Table:
+        return Table(grid=[[Cell([cell], i, j) for j, cell in enumerate(row)]
+                           for i, row in enumerate(rows)])
 
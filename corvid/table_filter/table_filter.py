@@ -1,19 +1,188 @@
 """
 
+Predicts whether a Table reports results (and hence is worth normalizing and
+aggregating) using cheap features of its cells and shape.
+
+Cell features come from `extract_cell_features_many`, so scoring a batch of
+Tables processes each distinct cell string once.  Scores are the logistic of
+a weighted sum of features, in [0, 1].
+
+Because shape features are known before looking at any cell, `is_relevant`
+and `iter_relevant_tables` can reject a Table whose score couldn't reach the
+threshold even if all of its cells looked like results (e.g. a single row),
+without extracting any cell features.
 
 """
 
-from typing import List
+from typing import List, Iterable, Iterator, Dict
+
+import numpy as np
 
 from corvid.table.table import Table
+from corvid.util.strings import extract_cell_features_many
+
+# features computed from Cells; each lies in [0, 1]
+CELL_FEATURE_NAMES = [
+    'result_ratio',  # fraction of nonempty cells that look like results
+    'citation_ratio',  # fraction of nonempty cells that look like citations
+    'numeric_ratio',  # fraction of nonempty cells that are floatable
+    'digit_density',  # digits as a fraction of all alphanumeric characters
+    'empty_ratio'  # fraction of cells that are empty
+]
+
+# features computed from `Table.shape` alone; each lies in [0, 1]
+SHAPE_FEATURE_NAMES = [
+    'is_too_small',  # fewer than 2 rows or 2 columns
+    'log_size'  # log(nrow * ncol), scaled so a 32x32 Table has log_size 1
+]
+
+FEATURE_NAMES = CELL_FEATURE_NAMES + SHAPE_FEATURE_NAMES
+
+# hand-set to separate results tables from e.g. tables of hyperparameters,
+# dataset descriptions or layout artifacts
+DEFAULT_WEIGHTS = {
+    'result_ratio': 5.0,
+    'citation_ratio': 1.0,
+    'numeric_ratio': 1.0,
+    'digit_density': 1.0,
+    'empty_ratio': -2.0,
+    'is_too_small': -6.0,
+    'log_size': 0.5
+}
+DEFAULT_BIAS = -2.5
+
+MAX_LOG_SIZE = np.log(32 * 32)
+
+
+def compute_shape_features(tables: List[Table]) -> np.ndarray:
+    """Returns an array of shape (len(tables), len(SHAPE_FEATURE_NAMES))"""
+    shapes = np.array([table.shape for table in tables],
+                      dtype=float).reshape(-1, 2)
+    is_too_small = np.min(shapes, axis=1) < 2
+    num_cells = np.maximum(np.prod(shapes, axis=1), 1.0)
+    log_size = np.minimum(np.log(num_cells) / MAX_LOG_SIZE, 1.0)
+    return np.column_stack([is_too_small, log_size]).astype(float)
+
+
+def compute_cell_features(tables: List[Table]) -> np.ndarray:
+    """Returns an array of shape (len(tables), len(CELL_FEATURE_NAMES)).
+
+    Each multispan Cell is counted once."""
+    strings = []
+    table_index = []
+    for i, table in enumerate(tables):
+        for cell in table.cells:
+            strings.append(str(cell).strip())
+            table_index.append(i)
+    table_index = np.array(table_index, dtype=int)
+
+    features = extract_cell_features_many(strings)
+    is_empty = np.array([len(s) == 0 for s in strings], dtype=float)
+    is_result = np.array([f.is_like_result for f in features], dtype=float)
+    is_citation = np.array([f.is_like_citation for f in features],
+                           dtype=float)
+    is_numeric = np.array([f.is_floatable for f in features], dtype=float)
+    num_digits = np.array([f.num_alphanumeric_digits for f in features],
+                          dtype=float)
+    num_chars = np.array([f.num_alphanumeric for f in features], dtype=float)
+
+    def _sum_per_table(values: np.ndarray) -> np.ndarray:
+        return np.bincount(table_index, weights=values,
+                           minlength=len(tables))
+
+    num_cells = np.bincount(table_index, minlength=len(tables))
+    num_nonempty = num_cells - _sum_per_table(is_empty)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.nan_to_num(np.column_stack([
+            _sum_per_table(is_result * (1 - is_empty)) / num_nonempty,
+            _sum_per_table(is_citation * (1 - is_empty)) / num_nonempty,
+            _sum_per_table(is_numeric * (1 - is_empty)) / num_nonempty,
+            _sum_per_table(num_digits) / _sum_per_table(num_chars),
+            _sum_per_table(is_empty) / num_cells
+        ]))
+
+
+class TableRelevanceScorer(object):
+    """Scores how likely Tables are to report results.  For example:
+
+        scorer = TableRelevanceScorer()
+        scores = scorer.score_many(tables)
+        tables = list(scorer.iter_relevant_tables(tables, min_relevance=0.5))
+    """
+
+    def __init__(self, weights: Dict[str, float] = None,
+                 bias: float = DEFAULT_BIAS):
+        weights = weights or DEFAULT_WEIGHTS
+        if set(weights) != set(FEATURE_NAMES):
+            raise ValueError('`weights` must have a weight for each of {}'
+                             .format(FEATURE_NAMES))
+        self.cell_weights = np.array([weights[name]
+                                      for name in CELL_FEATURE_NAMES])
+        self.shape_weights = np.array([weights[name]
+                                       for name in SHAPE_FEATURE_NAMES])
+        self.bias = bias
+        # the most that cell features (each in [0, 1]) can add to the logit
+        self.max_cell_logit = np.sum(np.maximum(self.cell_weights, 0.0))
+
+    def score_many(self, tables: List[Table]) -> np.ndarray:
+        """Relevance scores in [0, 1] for a batch of Tables"""
+        tables = list(tables)
+        if not tables:
+            return np.zeros(0)
+        logits = self.bias + \
+                 compute_shape_features(tables).dot(self.shape_weights) + \
+                 compute_cell_features(tables).dot(self.cell_weights)
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def score(self, table: Table) -> float:
+        return float(self.score_many([table])[0])
+
+    def compute_max_scores(self, tables: List[Table]) -> np.ndarray:
+        """Upper bounds on `score_many(tables)` using only Table shapes"""
+        logits = self.bias + self.max_cell_logit + \
+                 compute_shape_features(tables).dot(self.shape_weights)
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def is_relevant(self, table: Table, min_relevance: float) -> bool:
+        """Whether `table` scores above `min_relevance`, without extracting
+        cell features if its shape already rules it out"""
+        if self.compute_max_scores([table])[0] <= min_relevance:
+            return False
+        return self.score(table) > min_relevance
+
+    def iter_relevant_tables(self, tables: Iterable[Table],
+                             min_relevance: float,
+                             batch_size: int = 64) -> Iterator[Table]:
+        """Lazily yields Tables scoring above `min_relevance`, in order.
+        Tables are scored in batches of `batch_size`, and Tables ruled out
+        by their shape alone are dropped before cell features are computed."""
+        assert batch_size > 0
+        batch = []
+        for table in tables:
+            batch.append(table)
+            if len(batch) == batch_size:
+                yield from self._filter_batch(batch, min_relevance)
+                batch = []
+        if batch:
+            yield from self._filter_batch(batch, min_relevance)
+
+    def _filter_batch(self, tables: List[Table],
+                      min_relevance: float) -> List[Table]:
+        max_scores = self.compute_max_scores(tables)
+        candidates = [table for table, max_score in zip(tables, max_scores)
+                      if max_score > min_relevance]
+        scores = self.score_many(candidates)
+        return [table for table, score in zip(candidates, scores)
+                if score > min_relevance]
+
+
+DEFAULT_SCORER = TableRelevanceScorer()
 
 
-# TODO
 def predict_table_relevance(table: Table) -> float:
-    return float('inf')
+    return DEFAULT_SCORER.score(table)
 
 
-# TODO
 def filter_tables(tables: List[Table], min_relevance: float) -> List[Table]:
-    return [table for table in tables
-            if predict_table_relevance(table) > min_relevance]
+    return list(DEFAULT_SCORER.iter_relevant_tables(tables=tables,
+                                                    min_relevance=min_relevance))
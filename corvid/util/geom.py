@@ -4,9 +4,11 @@ Functions for computations related to geometry of the page
 
 """
 
-from typing import List, Dict
+from typing import List, Dict, Union
 from collections import namedtuple
 
+import numpy as np
+
 Point = namedtuple('Point', ['x', 'y'])
 
 
@@ -100,3 +102,142 @@ class Box(object):
 
         return Box(llx=max_lower_left_x, lly=max_lower_left_y,
                    urx=max_upper_right_x, ury=max_upper_right_y)
+
+
+class BoxArray(object):
+    """Stores N Boxes as an (N, 4) float array of `[llx, lly, urx, ury]` rows
+    so that geometry over many Boxes (e.g. every token on a page) is computed
+    with vectorized NumPy operations instead of Python loops.
+
+    Pairwise predicates between BoxArrays `a` (N Boxes) and `b` (M Boxes)
+    return (N, M) matrices whose `[i, j]` entry equals the corresponding
+    `Box` classmethod applied to `(a[i], b[j])`.  Note these matrices take
+    N * M memory.
+    """
+
+    def __init__(self, coords: Union[np.ndarray, List[List[float]]]):
+        self.coords = np.asarray(coords, dtype=float).reshape(-1, 4)
+
+    @classmethod
+    def from_boxes(cls, boxes: List[Box]) -> 'BoxArray':
+        return BoxArray(coords=[[box.ll.x, box.ll.y, box.ur.x, box.ur.y]
+                                for box in boxes])
+
+    def to_boxes(self) -> List[Box]:
+        return [Box(llx=llx, lly=lly, urx=urx, ury=ury)
+                for llx, lly, urx, ury in self.coords.tolist()]
+
+    @classmethod
+    def from_json(cls, json: List[Dict]) -> 'BoxArray':
+        return BoxArray(coords=[[d['llx'], d['lly'], d['urx'], d['ury']]
+                                for d in json])
+
+    def to_json(self) -> List[Dict]:
+        return [{'llx': llx, 'lly': lly, 'urx': urx, 'ury': ury}
+                for llx, lly, urx, ury in self.coords.tolist()]
+
+    def __len__(self) -> int:
+        return self.coords.shape[0]
+
+    def __getitem__(self, index) -> Union[Box, 'BoxArray']:
+        """An integer index returns a Box; anything else (slices, masks,
+        index arrays) returns a BoxArray"""
+        if isinstance(index, (int, np.integer)):
+            llx, lly, urx, ury = self.coords[index].tolist()
+            return Box(llx=llx, lly=lly, urx=urx, ury=ury)
+        return BoxArray(coords=self.coords[index])
+
+    def __repr__(self):
+        return 'BoxArray({} boxes)'.format(len(self))
+
+    @property
+    def llx(self) -> np.ndarray:
+        return self.coords[:, 0]
+
+    @property
+    def lly(self) -> np.ndarray:
+        return self.coords[:, 1]
+
+    @property
+    def urx(self) -> np.ndarray:
+        return self.coords[:, 2]
+
+    @property
+    def ury(self) -> np.ndarray:
+        return self.coords[:, 3]
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.ury - self.lly
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.urx - self.llx
+
+    @property
+    def area(self) -> np.ndarray:
+        return self.width * self.height
+
+    @classmethod
+    def _is_interval_overlap(cls, lo1: np.ndarray, hi1: np.ndarray,
+                             lo2: np.ndarray, hi2: np.ndarray) -> np.ndarray:
+        """Vectorized version of the logic in `Box.is_x_overlap`"""
+        lo1, hi1 = lo1[:, None], hi1[:, None]
+        lo2, hi2 = lo2[None, :], hi2[None, :]
+        is_lo_within_2 = (lo2 < lo1) & (lo1 < hi2)
+        is_hi_within_2 = (lo2 < hi1) & (hi1 < hi2)
+        is_contains_2 = (lo1 < lo2) & (hi1 > hi2)
+        return is_lo_within_2 | is_hi_within_2 | is_contains_2
+
+    def is_x_overlap(self, other: 'BoxArray' = None) -> np.ndarray:
+        other = self if other is None else other
+        return self._is_interval_overlap(self.llx, self.urx,
+                                         other.llx, other.urx)
+
+    def is_y_overlap(self, other: 'BoxArray' = None) -> np.ndarray:
+        other = self if other is None else other
+        return self._is_interval_overlap(self.lly, self.ury,
+                                         other.lly, other.ury)
+
+    def is_above(self, other: 'BoxArray' = None) -> np.ndarray:
+        """`[i, j]` is whether `self[i]` is above `other[j]`"""
+        other = self if other is None else other
+        return ~self.is_y_overlap(other) & self.is_x_overlap(other) & \
+               (self.lly[:, None] > other.ury[None, :])
+
+    def min_x_dist(self, other: 'BoxArray' = None) -> np.ndarray:
+        """Entries for pairs that overlap in x are NaN, since
+        `Box.min_x_dist` is undefined for them"""
+        other = self if other is None else other
+        dist = np.minimum(np.abs(self.llx[:, None] - other.urx[None, :]),
+                          np.abs(self.urx[:, None] - other.llx[None, :]))
+        dist[self.is_x_overlap(other)] = np.nan
+        return dist
+
+    def min_y_dist(self, other: 'BoxArray' = None) -> np.ndarray:
+        """Entries for pairs that overlap in y are NaN, since
+        `Box.min_y_dist` is undefined for them"""
+        other = self if other is None else other
+        dist = np.minimum(np.abs(self.lly[:, None] - other.ury[None, :]),
+                          np.abs(self.ury[:, None] - other.lly[None, :]))
+        dist[self.is_y_overlap(other)] = np.nan
+        return dist
+
+    def iou(self, other: 'BoxArray' = None) -> np.ndarray:
+        """Intersection over Union of the areas of every pair of Boxes"""
+        other = self if other is None else other
+        width = np.minimum(self.urx[:, None], other.urx[None, :]) - \
+                np.maximum(self.llx[:, None], other.llx[None, :])
+        height = np.minimum(self.ury[:, None], other.ury[None, :]) - \
+                 np.maximum(self.lly[:, None], other.lly[None, :])
+        intersection = np.clip(width, 0, None) * np.clip(height, 0, None)
+        union = self.area[:, None] + other.area[None, :] - intersection
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(union > 0, intersection / union, 0.0)
+
+    def compute_bounding_box(self) -> Box:
+        """Vectorized version of `Box.compute_bounding_box`"""
+        if len(self) == 0:
+            return Box.compute_bounding_box(boxes=[])
+        return Box(llx=float(self.llx.min()), lly=float(self.lly.min()),
+                   urx=float(self.urx.max()), ury=float(self.ury.max()))
@@ -0,0 +1,60 @@
+"""
+
+Deferred imports for heavy dependencies (e.g. scipy, fuzzywuzzy), so that
+importing corvid modules stays cheap and the cost is only paid by callers
+that actually use the functionality.  For example:
+
+    optimize = lazy_import('scipy.optimize')
+
+    def solve(cost_matrix):
+        return optimize.linear_sum_assignment(cost_matrix)  # imports here
+
+"""
+
+import importlib
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder for a module that is imported on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with self.__dict__['_lazy_lock']:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__['_lazy_module'] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        return '<lazy module {!r}{}>'.format(
+            self.__name__, '' if self.is_loaded else ' (not loaded)')
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Returns module `name` if it's already imported, otherwise a
+    `LazyModule` that imports it on first use.  A missing module raises
+    `ImportError` on first use rather than here."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
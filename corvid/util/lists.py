@@ -9,8 +9,21 @@ from typing import List, Callable, Tuple, Iterable, Union, Any, Dict
 import numpy as np
 from itertools import permutations
 from collections import Counter
+from statistics import mean
 
-from scipy.optimize import linear_sum_assignment
+from corvid.util.lazy import lazy_import
+from corvid.util.profiling import timed, span
+
+# scipy is only imported once an assignment actually needs solving
+optimize = lazy_import('scipy.optimize')
+sparse = lazy_import('scipy.sparse')
+csgraph = lazy_import('scipy.sparse.csgraph')
+
+
+@timed('linear_sum_assignment')
+def _linear_sum_assignment(cost_matrix: np.ndarray) -> Tuple[np.ndarray,
+                                                              np.ndarray]:
+    return optimize.linear_sum_assignment(cost_matrix)
 
 
 def permute_list(x: List, permutation_indices: Iterable[int]) -> List:
@@ -39,19 +52,138 @@ def compute_similarity(x: List, y: List,
     return agg([sim(x_i, y_i) for x_i, y_i in zip(x, y)])
 
 
+MAX_BRUTE_FORCE_PERMUTATION_SIZE = 8
+
+SUM_AGGS = [sum, np.sum, np.mean, mean]
+MIN_AGGS = [min, np.min, np.amin]
+MAX_AGGS = [max, np.max, np.amax]
+
+
+def _solve_sum_permutation(sim_matrix: np.ndarray) -> List[int]:
+    """Permutation maximizing the sum of `sim_matrix[i, perm[i]]`.  When
+    scores are integers (e.g. counts of exact matches), ties are broken in
+    favor of leaving `y` in its original order."""
+    n = sim_matrix.shape[0]
+    sim_matrix = sim_matrix.astype(float)
+    if np.all(sim_matrix == np.round(sim_matrix)):
+        # bonus on the diagonal sums to < 1 so it only reorders ties
+        sim_matrix = sim_matrix + np.eye(n) / (n + 1)
+    _, index_y = _linear_sum_assignment(-1.0 * sim_matrix)
+    return [int(j) for j in index_y]
+
+
+def _solve_max_permutation(sim_matrix: np.ndarray) -> List[int]:
+    """Permutation maximizing the max of `sim_matrix[i, perm[i]]`, i.e. any
+    permutation through the largest entry.  The remaining items are paired
+    to maximize their sum."""
+    n = sim_matrix.shape[0]
+    i_best, j_best = np.unravel_index(np.argmax(sim_matrix), sim_matrix.shape)
+    index_x_rest = [i for i in range(n) if i != i_best]
+    index_y_rest = [j for j in range(n) if j != j_best]
+    permutation = [None] * n
+    permutation[i_best] = int(j_best)
+    if n > 1:
+        sub_permutation = _solve_sum_permutation(
+            sim_matrix[np.ix_(index_x_rest, index_y_rest)])
+        for i, j in zip(index_x_rest, sub_permutation):
+            permutation[i] = index_y_rest[j]
+    return permutation
+
+
+def _solve_min_permutation(sim_matrix: np.ndarray) -> List[int]:
+    """Bottleneck assignment:  permutation maximizing the min of
+    `sim_matrix[i, perm[i]]`.
+
+    Binary searches for the largest threshold `t` such that a perfect
+    matching exists using only entries >= `t`.  Among permutations achieving
+    the bottleneck, returns the one maximizing the sum.
+    """
+    n = sim_matrix.shape[0]
+    thresholds = np.unique(sim_matrix)
+
+    def _is_perfect_matching(t: float) -> bool:
+        is_allowed = (sim_matrix >= t).astype(float)
+        index_x, index_y = _linear_sum_assignment(-1.0 * is_allowed)
+        return is_allowed[index_x, index_y].sum() == n
+
+    # smallest threshold always admits a perfect matching
+    lo, hi = 0, len(thresholds) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _is_perfect_matching(thresholds[mid]):
+            lo = mid
+        else:
+            hi = mid - 1
+    bottleneck = thresholds[lo]
+
+    # forbid entries below the bottleneck, then maximize the sum;  one
+    # forbidden entry must cost more than the whole range of allowed sums
+    penalty = n * (sim_matrix.max() - sim_matrix.min()) + 1.0
+    cost_matrix = -1.0 * sim_matrix.astype(float)
+    cost_matrix[sim_matrix < bottleneck] += penalty
+    _, index_y = _linear_sum_assignment(cost_matrix)
+    return [int(j) for j in index_y]
+
+
 def compute_best_permutation(x: List,
                              y: List,
                              sim: Callable[[Any, Any], Union[bool, int, float]],
-                             agg: Callable[[List], float]) -> \
+                             agg: Callable[[List], float],
+                             max_brute_force_size: int =
+                             MAX_BRUTE_FORCE_PERMUTATION_SIZE) -> \
         Tuple[float, Tuple]:
     """Computes similarity for all possible pairings of `x` and `permute(y)`,
     and returns the permutation that gives highest score
+
+    Rather than enumerating all n! permutations, common `agg` functions are
+    dispatched to polynomial-time solvers:
+
+        - sum, mean:  linear assignment (Hungarian algorithm)
+        - min:  bottleneck assignment
+        - max:  any permutation through the single best pairing
+
+    Any other `agg` falls back to brute-force enumeration, which raises a
+    `ValueError` if there are more than `max_brute_force_size` items.
     """
     n = len(x)
     if len(y) != n:
         raise Exception('Unequal number of elements in each list')
 
-    sim_matrix = np.array([[float(sim(x_i, y_j)) for y_j in y] for x_i in x])
+    with span('similarity_matrix', shape=[n, n]):
+        sim_matrix = np.array([[float(sim(x_i, y_j)) for y_j in y]
+                               for x_i in x])
+
+    if n == 0:
+        return agg([]), ()
+    elif agg in SUM_AGGS:
+        best_permutation = _solve_sum_permutation(sim_matrix)
+    elif agg in MIN_AGGS:
+        best_permutation = _solve_min_permutation(sim_matrix)
+    elif agg in MAX_AGGS:
+        best_permutation = _solve_max_permutation(sim_matrix)
+    else:
+        return _compute_best_permutation_brute_force(
+            sim_matrix=sim_matrix, agg=agg,
+            max_brute_force_size=max_brute_force_size)
+
+    best_permutation = tuple(best_permutation)
+    return agg([sim_matrix[i, j] for i, j in enumerate(best_permutation)]), \
+           best_permutation
+
+
+def _compute_best_permutation_brute_force(sim_matrix: np.ndarray,
+                                          agg: Callable[[List], float],
+                                          max_brute_force_size: int) -> \
+        Tuple[float, Tuple]:
+    """Scores every permutation.  Only feasible for a handful of items."""
+    n = sim_matrix.shape[0]
+    if n > max_brute_force_size:
+        raise ValueError('Cannot brute-force {}! permutations for `agg={}`; '
+                         'use sum, mean, min or max, or raise '
+                         '`max_brute_force_size` (currently {})'
+                         .format(n, getattr(agg, '__name__', agg),
+                                 max_brute_force_size))
+
     col_index_permutations = list(permutations(range(n)))
     agg_sims = [
         agg([sim_matrix[i, j] for i, j in zip(range(n), col_index_permutation)])
@@ -82,10 +214,17 @@ def compute_best_alignments(x: List, y: List,
     """
 
     # similarity matrix
-    sim_matrix = np.array([[sim(xi, yj) for yj in y] for xi in x])
+    with span('similarity_matrix', shape=[len(x), len(y)]):
+        sim_matrix = np.array([[sim(xi, yj) for yj in y] for xi in x])
+    return compute_best_alignments_from_matrix(sim_matrix)
 
+
+def compute_best_alignments_from_matrix(sim_matrix: np.ndarray) -> \
+        Tuple[float, List[Tuple[int, int]]]:
+    """Same as `compute_best_alignments`, but given a precomputed (dense)
+    similarity matrix whose entry (i, j) is `sim(x_i, y_j)`"""
     # negative sign here because scipy implementation minimizes sum of weights
-    index_x, index_y = linear_sum_assignment(-1.0 * sim_matrix)
+    index_x, index_y = _linear_sum_assignment(-1.0 * sim_matrix)
 
     # results
     best_alignment_indices = [(i, j) for i, j in zip(index_x, index_y)]
@@ -94,6 +233,60 @@ def compute_best_alignments(x: List, y: List,
     return score_best_alignment, best_alignment_indices
 
 
+def compute_best_alignments_sparse(sim_matrix: 'csr_matrix') -> \
+        Tuple[float, List[Tuple[int, int]]]:
+    """Sparse analogue of `compute_best_alignments` that takes a precomputed
+    (possibly rectangular) similarity matrix whose stored entries are the only
+    candidate pairings.  Missing entries are treated as similarity 0, so
+    items with no candidates are simply left unaligned.
+
+    Every stored similarity must be positive.  Returns the total similarity
+    of the best alignment and the aligned (i, j) index pairs.
+    """
+    sim_matrix = sparse.csr_matrix(sim_matrix, dtype=float)
+    sim_matrix.eliminate_zeros()
+    n_x, n_y = sim_matrix.shape
+    if sim_matrix.nnz == 0:
+        return 0.0, []
+    if sim_matrix.data.min() < 0:
+        raise ValueError('Sparse alignment requires non-negative similarities')
+
+    # convert to a positive cost so stored entries are never dropped, and
+    # give each `x_i` a private dummy `y` with cost equal to similarity 0
+    # so that a full matching on `x` always exists
+    offset = sim_matrix.data.max() + 1.0
+    cost_matrix = sim_matrix.copy()
+    cost_matrix.data = offset - cost_matrix.data
+    dummy_matrix = offset * sparse.identity(n_x, format='csr')
+    cost_matrix = sparse.hstack([cost_matrix, dummy_matrix], format='csr')
+
+    # scipy < 1.6 doesnt have a sparse assignment solver
+    min_weight_full_bipartite_matching = getattr(
+        csgraph, 'min_weight_full_bipartite_matching', None)
+    if min_weight_full_bipartite_matching is not None:
+        with span('min_weight_full_bipartite_matching',
+                  shape=list(cost_matrix.shape)):
+            index_x, index_y = min_weight_full_bipartite_matching(cost_matrix)
+    else:
+        # fallback solves dense problem only on the rows/cols with candidates
+        index_rows = np.unique(sim_matrix.nonzero()[0])
+        index_cols = np.unique(sim_matrix.nonzero()[1])
+        dense = sim_matrix[index_rows][:, index_cols].toarray()
+        index_x, index_y = _linear_sum_assignment(-1.0 * dense)
+        index_x, index_y = index_rows[index_x], index_cols[index_y]
+
+    # drop pairings with dummies (or with zero similarity)
+    is_real = np.asarray(index_y) < n_y
+    index_x, index_y = np.asarray(index_x)[is_real], np.asarray(index_y)[is_real]
+    sims = np.asarray(sim_matrix[index_x, index_y]).ravel()
+    is_positive = sims > 0
+
+    best_alignment_indices = [(int(i), int(j)) for i, j in
+                              zip(index_x[is_positive], index_y[is_positive])]
+    score_best_alignment = float(sims[is_positive].sum())
+    return score_best_alignment, best_alignment_indices
+
+
 def compute_best_alignments_with_threshold(x: List, y: List, sim: Callable,
                                            threshold: float) -> \
         Tuple[float, List[Tuple[int, int]]]:
@@ -112,6 +305,24 @@ def compute_best_alignments_with_threshold(x: List, y: List, sim: Callable,
     return score, clean_alignments
 
 
+def compute_best_alignments_from_matrix_with_threshold(
+        sim_matrix: np.ndarray, threshold: float) -> \
+        Tuple[float, List[Tuple[int, int]]]:
+    """Same as `compute_best_alignments_with_threshold`, but given a
+    precomputed (dense) similarity matrix"""
+    _, raw_alignments = compute_best_alignments_from_matrix(sim_matrix)
+
+    clean_alignments = []
+    score = 0
+    for i, j in raw_alignments:
+        sim_ij = sim_matrix[i, j]
+        if sim_ij > threshold:
+            score += sim_ij
+            clean_alignments.append((i, j))
+
+    return score, clean_alignments
+
+
 def compute_union(x: Iterable, y: Iterable) -> List:
     """Returns union of items in `x` and `y`, where `x` and `y` allow for
     duplicates.  Items must be hashable.  For example:
@@ -164,3 +375,75 @@ def compute_intersection(x: Iterable, y: Iterable) -> List:
         intersection.extend([key for _ in range(min(count_x, count_y))])
 
     return intersection
+
+
+def encode_values(x: Iterable, vocab: Dict[Any, int]) -> np.ndarray:
+    """Integer-encodes hashable items in `x` using `vocab`, which maps each
+    item to a dense integer id.  Unseen items are added to `vocab`, so the
+    same `vocab` can be shared to encode many lists consistently."""
+    return np.array([vocab.setdefault(item, len(vocab)) for item in x],
+                    dtype=np.int64)
+
+
+def count_unique(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the sorted unique values of integer array `x` and their
+    counts.  Computing this once lets a list be compared against many
+    others via `compute_intersection_size_from_counts`."""
+    return np.unique(np.asarray(x, dtype=np.int64), return_counts=True)
+
+
+def _align_counts(x_counts: Tuple[np.ndarray, np.ndarray],
+                  y_counts: Tuple[np.ndarray, np.ndarray]) -> \
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Merges two sorted (values, counts) pairs, returning the values that
+    appear in both along with their count in `x` and in `y`"""
+    values_x, counts_x = x_counts
+    values_y, counts_y = y_counts
+    if len(values_x) == 0 or len(values_y) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, empty
+    index_y = np.searchsorted(values_y, values_x)
+    index_y[index_y == len(values_y)] = 0
+    is_common = values_y[index_y] == values_x
+    return values_x[is_common], counts_x[is_common], \
+           counts_y[index_y[is_common]]
+
+
+def compute_union_array(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Array version of `compute_union` for integer-encoded items (see
+    `encode_values`).  Output is sorted."""
+    values_x, counts_x = count_unique(x)
+    values_y, counts_y = count_unique(y)
+    values = np.concatenate([values_x, values_y])
+    counts = np.concatenate([counts_x, counts_y])
+
+    # for values in both, keep the larger count
+    order = np.lexsort((-counts, values))
+    values, counts = values[order], counts[order]
+    is_first = np.ones(len(values), dtype=bool)
+    is_first[1:] = values[1:] != values[:-1]
+    return np.repeat(values[is_first], counts[is_first])
+
+
+def compute_intersection_array(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Array version of `compute_intersection` for integer-encoded items
+    (see `encode_values`).  Output is sorted."""
+    values, counts_x, counts_y = _align_counts(count_unique(x),
+                                               count_unique(y))
+    return np.repeat(values, np.minimum(counts_x, counts_y))
+
+
+def compute_intersection_size_from_counts(
+        x_counts: Tuple[np.ndarray, np.ndarray],
+        y_counts: Tuple[np.ndarray, np.ndarray]) -> int:
+    """Same as `compute_intersection_size` but takes the precomputed output
+    of `count_unique` for each list"""
+    _, counts_x, counts_y = _align_counts(x_counts, y_counts)
+    return int(np.minimum(counts_x, counts_y).sum())
+
+
+def compute_intersection_size(x: np.ndarray, y: np.ndarray) -> int:
+    """Returns `len(compute_intersection(x, y))` for integer-encoded items
+    (see `encode_values`) without materializing the intersection"""
+    return compute_intersection_size_from_counts(count_unique(x),
+                                                 count_unique(y))
@@ -0,0 +1,136 @@
+"""
+
+Memoization of expensive pairwise string similarities (e.g. fuzzy matching of
+column names), which recur across many Tables.
+
+`SimilarityCache` wraps a similarity function with a bounded LRU cache keyed
+on the pair of (optionally normalized) strings.  Only if the function is
+symmetric are sim(a, b) and sim(b, a) allowed to share one entry.  The cache
+can be saved to and loaded from disk so it persists between runs, and keeps
+hit/miss counts.  For example:
+
+    cache = SimilarityCache(lambda a, b: fuzz.ratio(a, b) / 100,
+                            normalize=str.lower, is_symmetric=True,
+                            path='column_sims.json')
+    cache('accuracy', 'Acc')  # computed
+    cache('ACC', 'Accuracy')  # a dict lookup
+    cache.save()
+    print(cache.stats())
+
+"""
+
+import os
+import json
+import threading
+
+from collections import OrderedDict
+from typing import Callable, Dict, Tuple
+
+SIMILARITY_CACHE_SIZE = 2 ** 18
+
+
+class SimilarityCache(object):
+    """Bounded, thread-safe LRU cache around `func(a, b) -> float`"""
+
+    def __init__(self, func: Callable[[str, str], float],
+                 maxsize: int = SIMILARITY_CACHE_SIZE,
+                 path: str = None, is_symmetric: bool = False,
+                 normalize: Callable[[str], str] = None):
+        """If `path` exists, entries are loaded from it, and `save()` writes
+        back to it.  `is_symmetric` must only be set if func(a, b) always
+        equals func(b, a) (e.g. not for fuzzywuzzy's pure-python matcher).
+        If given, `normalize` is applied to both strings before lookup, and
+        `func` is called on the normalized strings, so it must not change
+        the result of `func`."""
+        assert maxsize > 0
+        self.func = func
+        self.maxsize = maxsize
+        self.path = path
+        self.is_symmetric = is_symmetric
+        self.normalize = normalize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def _key(self, a: str, b: str) -> Tuple[str, str]:
+        if self.normalize is not None:
+            a, b = self.normalize(a), self.normalize(b)
+        if self.is_symmetric and b < a:
+            return b, a
+        return a, b
+
+    def __call__(self, a: str, b: str) -> float:
+        key = self._key(a, b)
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return value
+            self.misses += 1
+
+        # computed outside the lock;  concurrent misses on the same key just
+        # compute the same value twice
+        value = self.func(*key)
+        with self._lock:
+            self._cache[key] = value
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, pair: Tuple[str, str]) -> bool:
+        return self._key(*pair) in self._cache
+
+    @property
+    def hit_rate(self) -> float:
+        num_calls = self.hits + self.misses
+        return self.hits / num_calls if num_calls > 0 else 0.0
+
+    def stats(self) -> Dict:
+        return OrderedDict([('size', len(self._cache)),
+                            ('maxsize', self.maxsize),
+                            ('hits', self.hits),
+                            ('misses', self.misses),
+                            ('hit_rate', self.hit_rate)])
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path: str = None):
+        """Writes entries (least recently used first) as JSON.  The file is
+        replaced atomically so concurrent readers never see a partial one."""
+        path = path or self.path
+        if path is None:
+            raise ValueError('No path to save SimilarityCache to')
+        with self._lock:
+            entries = [[a, b, value] for (a, b), value in self._cache.items()]
+        tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump({'is_symmetric': self.is_symmetric,
+                       'entries': entries}, f)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str):
+        """Adds entries from a file written by `save()`.  Only the most
+        recently used `maxsize` entries are kept."""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data['is_symmetric'] != self.is_symmetric:
+            raise ValueError('{} was saved with is_symmetric={}'
+                             .format(path, data['is_symmetric']))
+        with self._lock:
+            for a, b, value in data['entries']:
+                key = (a, b)
+                self._cache[key] = value
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
@@ -0,0 +1,182 @@
+"""
+
+Drives the `omnipage/` command-line tool over many documents.
+
+The tool's batch mode (`-m MANIFEST`) initializes the OCR engine once and then
+converts every `INPUT<TAB>OUTPUT` pair in the manifest, printing one status
+line per pair:
+
+    OK<TAB>INPUT<TAB>OUTPUT<TAB>SECONDS
+    ERROR<TAB>INPUT<TAB>OUTPUT<TAB>SECONDS<TAB>ERROR_CODE
+
+`OmniPageBatchDriver` splits documents into batches, runs a bounded number of
+these worker processes at a time, skips documents whose output already
+exists, retries failures, and reports per-document timings.  Workers write to
+a temporary `OUTPUT.PID.part` that is only renamed to `OUTPUT` once reported
+OK, so a crashed or timed out run never leaves a truncated `OUTPUT` behind to
+be skipped by the next run.  Any executable that follows the same protocol
+(e.g. a stub in tests) can stand in for the real binary.
+
+"""
+
+import os
+import subprocess
+import tempfile
+import time
+
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple, Dict, Iterable
+
+ExtractionResult = namedtuple('ExtractionResult', [
+    'input_path',
+    'output_path',
+    'status',  # one of 'ok', 'skipped' or 'failed'
+    'seconds',  # time spent converting the document on its final attempt
+    'attempts',
+    'message'
+])
+
+
+class OmniPageBatchDriver(object):
+    def __init__(self,
+                 command: List[str] = None,
+                 num_workers: int = 4,
+                 batch_size: int = 16,
+                 num_retries: int = 2,
+                 timeout: float = None,
+                 is_skip_existing: bool = True):
+        """
+        `command` is the executable (plus any leading arguments) to which
+        `-m MANIFEST` is appended; defaults to the `corvid` binary on PATH.
+
+        `timeout` is in seconds per batch.  Documents in a batch that times
+        out or crashes without reporting a status are counted as failures.
+        """
+        assert num_workers > 0 and batch_size > 0 and num_retries >= 0
+        self.command = command or ['corvid']
+        self.num_workers = num_workers
+        self.batch_size = batch_size
+        self.num_retries = num_retries
+        self.timeout = timeout
+        self.is_skip_existing = is_skip_existing
+
+    def convert(self, jobs: Iterable[Tuple[str, str]]) -> \
+            List[ExtractionResult]:
+        """Converts each (input path, output path) pair.  Returns results in
+        the same order as `jobs`."""
+        jobs = [(os.path.abspath(i), os.path.abspath(o)) for i, o in jobs]
+        results = {}
+        pending = []
+        for input_path, output_path in OrderedDict.fromkeys(jobs):
+            if self.is_skip_existing and os.path.exists(output_path) and \
+                    os.path.getsize(output_path) > 0:
+                results[(input_path, output_path)] = ExtractionResult(
+                    input_path=input_path, output_path=output_path,
+                    status='skipped', seconds=0.0, attempts=0, message='')
+            else:
+                pending.append((input_path, output_path))
+
+        attempt = 0
+        while pending and attempt <= self.num_retries:
+            attempt += 1
+            batches = [pending[i:i + self.batch_size]
+                       for i in range(0, len(pending), self.batch_size)]
+            with ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+                batch_statuses = list(executor.map(self._run_batch, batches))
+
+            pending = []
+            for batch, statuses in zip(batches, batch_statuses):
+                for input_path, output_path in batch:
+                    status, seconds, message = statuses.get(
+                        (input_path, output_path),
+                        ('failed', 0.0, 'no status reported'))
+                    partial_path = self._partial_path(output_path)
+                    if status == 'ok':
+                        if os.path.exists(partial_path):
+                            os.replace(partial_path, output_path)
+                        else:
+                            status, message = 'failed', 'no output written'
+                    elif os.path.exists(partial_path):
+                        os.remove(partial_path)
+                    results[(input_path, output_path)] = ExtractionResult(
+                        input_path=input_path, output_path=output_path,
+                        status=status, seconds=seconds, attempts=attempt,
+                        message=message)
+                    if status == 'failed':
+                        pending.append((input_path, output_path))
+
+        return [results[job] for job in jobs]
+
+    def convert_dir(self, input_paths: Iterable[str], output_dir: str,
+                    extension: str = '.xml') -> List[ExtractionResult]:
+        """Converts each input to `output_dir/NAME.xml`, e.g.
+        `PAPER_ID.pdf -> output_dir/PAPER_ID.xml`"""
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = []
+        for input_path in input_paths:
+            name = os.path.splitext(os.path.basename(input_path))[0]
+            jobs.append((input_path,
+                         os.path.join(output_dir, name + extension)))
+        return self.convert(jobs)
+
+    @classmethod
+    def _partial_path(cls, output_path: str) -> str:
+        """Where a worker writes `output_path` until it reports OK"""
+        return '{}.{}.part'.format(output_path, os.getpid())
+
+    def _run_batch(self, batch: List[Tuple[str, str]]) -> \
+            Dict[Tuple[str, str], Tuple[str, float, str]]:
+        """Runs one worker process over `batch`, returning a map from
+        (input path, output path) to (status, seconds, message) for every
+        reported document"""
+        partial_to_output = {self._partial_path(output_path): output_path
+                             for _, output_path in batch}
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.tsv',
+                                         delete=False) as f:
+            for input_path, output_path in batch:
+                f.write('{}\t{}\n'.format(input_path,
+                                          self._partial_path(output_path)))
+            manifest_path = f.name
+
+        start = time.time()
+        try:
+            process = subprocess.run(self.command + ['-m', manifest_path],
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.PIPE,
+                                     universal_newlines=True,
+                                     timeout=self.timeout)
+            stdout = process.stdout
+        except subprocess.TimeoutExpired as e:
+            stdout = e.stdout or ''
+            if isinstance(stdout, bytes):
+                stdout = stdout.decode('utf-8', errors='replace')
+        except OSError as e:
+            return {job: ('failed', time.time() - start, str(e))
+                    for job in batch}
+        finally:
+            os.remove(manifest_path)
+
+        return {(input_path, partial_to_output[partial_path]): status
+                for (input_path, partial_path), status
+                in self._parse_statuses(stdout).items()
+                if partial_path in partial_to_output}
+
+    @classmethod
+    def _parse_statuses(cls, stdout: str) -> \
+            Dict[Tuple[str, str], Tuple[str, float, str]]:
+        statuses = {}
+        for line in stdout.splitlines():
+            fields = line.split('\t')
+            if len(fields) < 4 or fields[0] not in ('OK', 'ERROR'):
+                continue
+            try:
+                seconds = float(fields[3])
+            except ValueError:
+                continue
+            if fields[0] == 'OK':
+                statuses[(fields[1], fields[2])] = ('ok', seconds, '')
+            else:
+                message = 'error code ' + fields[4] if len(fields) > 4 else ''
+                statuses[(fields[1], fields[2])] = ('failed', seconds, message)
+        return statuses
@@ -0,0 +1,297 @@
+"""
+
+Composable streaming pipelines for running corvid stages over a corpus.
+
+Each `Stage` wraps a function applied to every item, and stages are connected
+by bounded queues.  A stage whose downstream queue is full blocks, so a slow
+stage applies backpressure all the way up to the input and only a bounded
+number of items (e.g. Tables) are ever in memory.  For example:
+
+    pipeline = Pipeline(stages=[
+        Stage(name='load', func=OmniPageTableLoader().iter_tables,
+              is_flatten=True),
+        Stage(name='normalize',
+              func=lambda t: LabelCollapseSemanticTable(t).normalized_table,
+              num_workers=4, skip_exceptions=(NormalizationError,)),
+    ])
+    tables = pipeline.run(xml_paths)
+    schema_table = ColNameSchemaMatcher().predict(tables, target_schema)
+    print(pipeline.format_stats())
+
+Stages run `num_workers` threads by default.  With `executor='process'`, the
+work is sent to a pool of `num_workers` processes instead (so `func` and the
+items must be picklable).  Outputs of stages with more than one worker are
+not guaranteed to be in input order.
+
+"""
+
+import time
+import threading
+
+from queue import Queue, Full, Empty
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Tuple, Any, Dict
+
+EXECUTORS = ['thread', 'process']
+
+# signals that no more items will be put on a queue
+_DONE = object()
+
+_POLL_SECONDS = 0.1
+
+
+class PipelineError(Exception):
+    pass
+
+
+class StageStats(object):
+    """Counters describing the work done by a single Stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.num_in = 0
+        self.num_out = 0
+        self.num_skipped = 0
+        self.busy_seconds = 0.0
+        self.start_time = None
+        self.end_time = None
+        self._lock = threading.Lock()
+
+    def update(self, num_in: int, num_out: int, num_skipped: int,
+               busy_seconds: float):
+        with self._lock:
+            self.num_in += num_in
+            self.num_out += num_out
+            self.num_skipped += num_skipped
+            self.busy_seconds += busy_seconds
+
+    @property
+    def wall_seconds(self) -> float:
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.time()) - self.start_time
+
+    @property
+    def throughput(self) -> float:
+        """Input items processed per second of wall time"""
+        wall_seconds = self.wall_seconds
+        return self.num_in / wall_seconds if wall_seconds > 0 else 0.0
+
+    def to_json(self) -> Dict:
+        return {
+            'name': self.name,
+            'num_in': self.num_in,
+            'num_out': self.num_out,
+            'num_skipped': self.num_skipped,
+            'busy_seconds': self.busy_seconds,
+            'wall_seconds': self.wall_seconds,
+            'throughput': self.throughput
+        }
+
+
+class Stage(object):
+    def __init__(self,
+                 name: str,
+                 func: Callable[[Any], Any],
+                 num_workers: int = 1,
+                 executor: str = 'thread',
+                 batch_size: int = None,
+                 is_flatten: bool = False,
+                 skip_exceptions: Tuple = ()):
+        """
+        `func` maps an input item to an output item.  Returning None drops
+        the item, so stages can also filter.  If `is_flatten`, `func`
+        instead returns an iterable of outputs (e.g. every Table in a
+        document), which is consumed lazily when running in threads.
+
+        If `batch_size` is given, `func` instead maps a list of up to
+        `batch_size` items to a list of outputs, which are passed downstream
+        one by one (e.g. for vectorized scoring of many Tables at once).
+
+        Items whose `func` raises one of `skip_exceptions` are dropped and
+        counted; any other exception stops the whole pipeline.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError('`executor` must be one of {}'.format(EXECUTORS))
+        assert num_workers > 0
+        assert batch_size is None or batch_size > 0
+        assert not (is_flatten and batch_size is not None)
+        self.name = name
+        self.func = func
+        self.num_workers = num_workers
+        self.executor = executor
+        self.batch_size = batch_size
+        self.is_flatten = is_flatten
+        self.skip_exceptions = tuple(skip_exceptions)
+
+
+class Pipeline(object):
+    def __init__(self, stages: List[Stage], queue_size: int = 64):
+        """`queue_size` bounds the number of items waiting between each pair
+        of consecutive stages"""
+        assert len(stages) > 0 and queue_size > 0
+        self.stages = stages
+        self.queue_size = queue_size
+        self.stats = {}
+
+    def run(self, items: Iterable) -> Iterator:
+        """Streams `items` through every stage, yielding outputs of the last
+        stage as they become available.  `self.stats` is reset per run."""
+        self.stats = {stage.name: StageStats(stage.name)
+                      for stage in self.stages}
+        queues = [Queue(maxsize=self.queue_size)
+                  for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        errors = []
+        pools = [ProcessPoolExecutor(max_workers=stage.num_workers)
+                 if stage.executor == 'process' else None
+                 for stage in self.stages]
+
+        threads = [threading.Thread(target=self._feed,
+                                    args=(items, queues[0], stop, errors),
+                                    daemon=True)]
+        for index, stage in enumerate(self.stages):
+            remaining = [stage.num_workers]
+            lock = threading.Lock()
+            for _ in range(stage.num_workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, pools[index], queues[index],
+                          queues[index + 1], remaining, lock, stop, errors),
+                    daemon=True))
+        for thread in threads:
+            thread.start()
+
+        try:
+            output_queue = queues[-1]
+            while True:
+                if errors:
+                    raise PipelineError('Pipeline stopped') from errors[0]
+                try:
+                    item = output_queue.get(timeout=_POLL_SECONDS)
+                except Empty:
+                    continue
+                if item is _DONE:
+                    break
+                yield item
+            if errors:
+                raise PipelineError('Pipeline stopped') from errors[0]
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            for pool in pools:
+                if pool is not None:
+                    pool.shutdown()
+
+    def format_stats(self) -> str:
+        lines = ['{:>16} {:>8} {:>8} {:>8} {:>10} {:>10}'.format(
+            'stage', 'in', 'out', 'skipped', 'busy_sec', 'items/sec')]
+        for stage in self.stages:
+            s = self.stats.get(stage.name) or StageStats(stage.name)
+            lines.append('{:>16} {:>8} {:>8} {:>8} {:>10.3f} {:>10.1f}'.format(
+                s.name, s.num_in, s.num_out, s.num_skipped, s.busy_seconds,
+                s.throughput))
+        return '\n'.join(lines)
+
+    @classmethod
+    def _put(cls, queue: Queue, item: Any, stop: threading.Event) -> bool:
+        """Blocks until `item` is on `queue`; returns False if stopped"""
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=_POLL_SECONDS)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _feed(self, items: Iterable, queue: Queue, stop: threading.Event,
+              errors: List[Exception]):
+        try:
+            for item in items:
+                if not self._put(queue, item, stop):
+                    return
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+            return
+        self._put(queue, _DONE, stop)
+
+    def _work(self, stage: Stage, pool: ProcessPoolExecutor,
+              in_queue: Queue, out_queue: Queue, remaining: List[int],
+              lock: threading.Lock, stop: threading.Event,
+              errors: List[Exception]):
+        stats = self.stats[stage.name]
+        with lock:
+            if stats.start_time is None:
+                stats.start_time = time.time()
+
+        is_done = False
+        while not is_done and not stop.is_set():
+            # gather one item (or batch); `_DONE` is passed on to siblings
+            batch = []
+            while len(batch) < (stage.batch_size or 1):
+                try:
+                    item = in_queue.get(timeout=_POLL_SECONDS)
+                except Empty:
+                    if stop.is_set() or batch:
+                        break
+                    continue
+                if item is _DONE:
+                    in_queue.put(_DONE)
+                    is_done = True
+                    break
+                batch.append(item)
+            if not batch:
+                continue
+
+            # time spent blocked on a full downstream queue isn't counted
+            busy_seconds = 0.0
+            num_out = 0
+            num_skipped = 0
+            start = time.time()
+            try:
+                if stage.batch_size is not None:
+                    outputs = iter(self._call(stage, pool, batch))
+                elif stage.is_flatten:
+                    outputs = iter(self._call(stage, pool, batch[0]))
+                else:
+                    outputs = iter([self._call(stage, pool, batch[0])])
+                for output in outputs:
+                    busy_seconds += time.time() - start
+                    if output is not None:
+                        if not self._put(out_queue, output, stop):
+                            return
+                        num_out += 1
+                    start = time.time()
+            except stage.skip_exceptions:
+                num_skipped = len(batch)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+                return
+            busy_seconds += time.time() - start
+            stats.update(num_in=len(batch), num_out=num_out,
+                         num_skipped=num_skipped, busy_seconds=busy_seconds)
+
+        # last worker of this stage to finish signals the next stage
+        with lock:
+            remaining[0] -= 1
+            is_last = remaining[0] == 0
+            if is_last:
+                stats.end_time = time.time()
+        if is_last and not stop.is_set():
+            self._put(out_queue, _DONE, stop)
+
+    @classmethod
+    def _call(cls, stage: Stage, pool: ProcessPoolExecutor, arg: Any) -> Any:
+        if pool is None:
+            return stage.func(arg)
+        if stage.is_flatten:
+            # generators can't be sent back from another process
+            return pool.submit(_call_to_list, stage.func, arg).result()
+        return pool.submit(stage.func, arg).result()
+
+
+def _call_to_list(func: Callable[[Any], Iterable], arg: Any) -> List:
+    return list(func(arg))
@@ -0,0 +1,251 @@
+"""
+
+Lightweight instrumentation of corvid hot paths.
+
+Code is instrumented with `timed` (decorator), `span` (context manager) and
+`count`.  These do nothing unless a `Recorder` is active, in which case spans
+are recorded as trace events and aggregated per name.  For example:
+
+    with recording() as recorder:
+        LabelCollapseSemanticTable(table)
+    print(recorder.format_summary())
+    recorder.dump('trace.json')  # open in chrome://tracing or Perfetto
+
+Setting the `CORVID_PROFILE` environment variable to a comma-separated
+subset of `cprofile`, `tracemalloc` and `trace` makes `profile_from_env`
+(used by entry points such as the benchmarks) capture a cProfile, a
+tracemalloc snapshot and/or a trace of the run, written to
+`CORVID_PROFILE_DIR` (default: the working directory).
+
+"""
+
+import os
+import time
+import json
+import threading
+
+from contextlib import contextmanager, ExitStack
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, List, Iterator
+
+PROFILE_ENV_VAR = 'CORVID_PROFILE'
+PROFILE_DIR_ENV_VAR = 'CORVID_PROFILE_DIR'
+PROFILE_MODES = ['cprofile', 'tracemalloc', 'trace']
+
+# the active Recorder;  None means instrumentation is disabled
+_recorder = None
+
+
+class Recorder(object):
+    """Collects spans (as Chrome trace 'complete' events) and counters"""
+
+    def __init__(self, max_events: int = 1000000):
+        """At most `max_events` trace events are kept, but every span is
+        still counted in `summary()`"""
+        self.max_events = max_events
+        self.events = []
+        self.counters = OrderedDict()
+        self.timers = OrderedDict()  # name -> [num calls, total seconds]
+        self.start_time = time.perf_counter()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, start: float, end: float, args: Dict):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                timer = self.timers[name] = [0, 0.0]
+            timer[0] += 1
+            timer[1] += end - start
+            if len(self.events) < self.max_events:
+                self.events.append({
+                    'name': name, 'ph': 'X', 'pid': self._pid,
+                    'tid': threading.get_ident(),
+                    'ts': (start - self.start_time) * 1e6,
+                    'dur': (end - start) * 1e6,
+                    'args': args
+                })
+
+    def add_count(self, name: str, value: float):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict[str, Dict]:
+        """Number of calls and total/mean seconds for each span name"""
+        return OrderedDict(
+            (name, {'calls': calls, 'total_seconds': total,
+                    'mean_seconds': total / calls})
+            for name, (calls, total) in self.timers.items())
+
+    def format_summary(self) -> str:
+        lines = ['{:>48} {:>10} {:>12} {:>12}'.format(
+            'span', 'calls', 'total_sec', 'mean_sec')]
+        for name, s in sorted(self.summary().items(),
+                              key=lambda item: -item[1]['total_seconds']):
+            lines.append('{:>48} {:>10} {:>12.6f} {:>12.6f}'.format(
+                name, s['calls'], s['total_seconds'], s['mean_seconds']))
+        for name, value in self.counters.items():
+            lines.append('{:>48} {:>10}'.format(name, value))
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self) -> Dict:
+        """Trace in the Chrome Trace Event format.  Counters are added as
+        one 'C' event each at the end of the trace."""
+        end = (time.perf_counter() - self.start_time) * 1e6
+        counter_events = [{'name': name, 'ph': 'C', 'pid': self._pid,
+                           'tid': 0, 'ts': end, 'args': {'value': value}}
+                          for name, value in self.counters.items()]
+        return {'traceEvents': self.events + counter_events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'summary': self.summary()}}
+
+    def dump(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+
+class _Span(object):
+    __slots__ = ['name', 'args', 'start']
+
+    def __init__(self, name: str, args: Dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        recorder = _recorder
+        if recorder is not None:
+            recorder.add_span(self.name, self.start, time.perf_counter(),
+                              self.args)
+        return False
+
+
+class _NullSpan(object):
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def is_enabled() -> bool:
+    return _recorder is not None
+
+
+def span(name: str, **args):
+    """Context manager timing its body as a span named `name`.  Keyword
+    `args` are attached to the trace event."""
+    if _recorder is None:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def count(name: str, value: float = 1):
+    """Adds `value` to the counter named `name`"""
+    recorder = _recorder
+    if recorder is not None:
+        recorder.add_count(name, value)
+
+
+def timed(name: str = None) -> Callable:
+    """Decorator that records each call as a span (named after the function
+    by default).  When disabled, costs one global lookup per call."""
+
+    def _decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @wraps(func)
+        def _wrapper(*args, **kwargs):
+            if _recorder is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder = _recorder
+                if recorder is not None:
+                    recorder.add_span(span_name, start, time.perf_counter(),
+                                      {})
+
+        return _wrapper
+
+    return _decorator
+
+
+@contextmanager
+def recording(recorder: Recorder = None) -> Iterator[Recorder]:
+    """Enables instrumentation within the block, yielding the Recorder.
+    Instrumentation is process-wide, so spans from all threads are
+    recorded.  The previously active Recorder (if any) is restored after."""
+    global _recorder
+    previous = _recorder
+    _recorder = recorder or Recorder()
+    try:
+        yield _recorder
+    finally:
+        _recorder = previous
+
+
+def _parse_profile_modes(value: str) -> List[str]:
+    modes = [mode.strip().lower() for mode in value.split(',') if mode.strip()]
+    for mode in modes:
+        if mode not in PROFILE_MODES:
+            raise ValueError('{} must be a comma-separated subset of {}'
+                             .format(PROFILE_ENV_VAR, PROFILE_MODES))
+    return modes
+
+
+@contextmanager
+def profile_from_env(name: str, top_n: int = 50) -> Iterator[None]:
+    """Profiles the block according to `CORVID_PROFILE`, writing
+    `NAME.prof` (cProfile), `NAME.tracemalloc.txt` (top `top_n` allocation
+    sites) and/or `NAME.trace.json` (instrumentation spans).  Does nothing
+    if the variable isn't set."""
+    modes = _parse_profile_modes(os.environ.get(PROFILE_ENV_VAR, ''))
+    if not modes:
+        yield
+        return
+
+    output_dir = os.environ.get(PROFILE_DIR_ENV_VAR, '.')
+    os.makedirs(output_dir, exist_ok=True)
+    path_prefix = os.path.join(output_dir, name)
+
+    profiler = None
+    if 'cprofile' in modes:
+        import cProfile
+        profiler = cProfile.Profile()
+    if 'tracemalloc' in modes:
+        import tracemalloc
+        tracemalloc.start()
+
+    with ExitStack() as stack:
+        recorder = stack.enter_context(recording()) \
+            if 'trace' in modes else None
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(path_prefix + '.prof')
+            if 'tracemalloc' in modes:
+                snapshot = tracemalloc.take_snapshot()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                with open(path_prefix + '.tracemalloc.txt', 'w') as f:
+                    f.write('current: {} bytes\npeak: {} bytes\n\n'
+                            .format(current, peak))
+                    for stat in snapshot.statistics('lineno')[:top_n]:
+                        f.write('{}\n'.format(stat))
+            if recorder is not None:
+                recorder.dump(path_prefix + '.trace.json')
@@ -0,0 +1,184 @@
+"""
+
+Spatial index over the Boxes of a page layout, so that geometry queries over
+thousands of (e.g. OCR word) Boxes don't need pairwise checks between every
+pair of Boxes.
+
+The index is a static R-tree bulk-loaded with Sort-Tile-Recursive packing.
+Queries descend only into nodes whose bounding box can contain a result, so
+they take roughly O(log n + k) for k results.
+
+Queries return indices into the list of Boxes the index was built from.
+
+"""
+
+import heapq
+
+from math import ceil, sqrt
+from typing import List, Tuple, Iterable
+
+from corvid.util.geom import Box
+
+INF = float('inf')
+
+
+class _Node(object):
+    """An R-tree node.  `children` are `_Node`s, or Box indices for leaves"""
+
+    def __init__(self, bounds: Tuple[float, float, float, float],
+                 children: List, is_leaf: bool):
+        self.bounds = bounds
+        self.children = children
+        self.is_leaf = is_leaf
+
+
+def _bounds_of(bounds: Iterable[Tuple[float, float, float, float]]) -> \
+        Tuple[float, float, float, float]:
+    llx, lly, urx, ury = zip(*bounds)
+    return min(llx), min(lly), max(urx), max(ury)
+
+
+def _is_intersect(b1: Tuple[float, float, float, float],
+                  b2: Tuple[float, float, float, float]) -> bool:
+    return b1[0] <= b2[2] and b2[0] <= b1[2] and \
+           b1[1] <= b2[3] and b2[1] <= b1[3]
+
+
+def _dist(b1: Tuple[float, float, float, float],
+          b2: Tuple[float, float, float, float]) -> float:
+    """Minimum Euclidean distance between two boxes (0 if they intersect)"""
+    dx = max(b1[0] - b2[2], b2[0] - b1[2], 0.0)
+    dy = max(b1[1] - b2[3], b2[1] - b1[3], 0.0)
+    return sqrt(dx * dx + dy * dy)
+
+
+class BoxIndex(object):
+    """Static R-tree over a list of Boxes.  For example:
+
+        index = BoxIndex(boxes=word_boxes)
+        index.intersect(Box(llx=0, lly=0, urx=100, ury=20))
+        index.nearest(word_boxes[0], k=5)
+        index.above(word_boxes[0])
+        index.in_y_band(lly=700, ury=720)
+
+    Unlike the pairwise `Box.is_x_overlap` / `Box.is_y_overlap`, which use
+    strict inequalities, intersection queries here treat Boxes as closed,
+    so Boxes that share an edge intersect.
+    """
+
+    def __init__(self, boxes: List[Box], node_capacity: int = 16):
+        assert node_capacity > 1
+        self.boxes = list(boxes)
+        self.node_capacity = node_capacity
+        self._bounds = [(box.ll.x, box.ll.y, box.ur.x, box.ur.y)
+                        for box in self.boxes]
+        self._root = self._build() if self.boxes else None
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    def _pack(self, entries: List[Tuple[Tuple, object]],
+              is_leaf: bool) -> List[_Node]:
+        """Sort-Tile-Recursive packing of (bounds, child) entries into nodes"""
+        m = self.node_capacity
+        n_slices = int(ceil(sqrt(ceil(len(entries) / m))))
+        slice_size = n_slices * m
+
+        def _center_x(entry):
+            return entry[0][0] + entry[0][2]
+
+        def _center_y(entry):
+            return entry[0][1] + entry[0][3]
+
+        entries = sorted(entries, key=_center_x)
+        nodes = []
+        for start in range(0, len(entries), slice_size):
+            vertical_slice = sorted(entries[start:start + slice_size],
+                                    key=_center_y)
+            for i in range(0, len(vertical_slice), m):
+                group = vertical_slice[i:i + m]
+                nodes.append(_Node(bounds=_bounds_of([b for b, _ in group]),
+                                   children=[c for _, c in group],
+                                   is_leaf=is_leaf))
+        return nodes
+
+    def _build(self) -> _Node:
+        nodes = self._pack(list(zip(self._bounds, range(len(self.boxes)))),
+                           is_leaf=True)
+        while len(nodes) > 1:
+            nodes = self._pack([(node.bounds, node) for node in nodes],
+                               is_leaf=False)
+        return nodes[0]
+
+    def _search(self, bounds: Tuple[float, float, float, float]) -> List[int]:
+        """Indices of all Boxes intersecting `bounds`, in index order"""
+        if self._root is None:
+            return []
+        results = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if not _is_intersect(node.bounds, bounds):
+                continue
+            if node.is_leaf:
+                results.extend([i for i in node.children
+                                if _is_intersect(self._bounds[i], bounds)])
+            else:
+                stack.extend(node.children)
+        return sorted(results)
+
+    def intersect(self, box: Box) -> List[int]:
+        """Indices of Boxes that intersect `box`"""
+        return self._search((box.ll.x, box.ll.y, box.ur.x, box.ur.y))
+
+    def in_x_band(self, llx: float, urx: float) -> List[int]:
+        """Indices of Boxes intersecting the vertical band (column) of the
+        page between `llx` and `urx`"""
+        return self._search((llx, -INF, urx, INF))
+
+    def in_y_band(self, lly: float, ury: float) -> List[int]:
+        """Indices of Boxes intersecting the horizontal band (row) of the
+        page between `lly` and `ury`"""
+        return self._search((-INF, lly, INF, ury))
+
+    def nearest(self, box: Box, k: int = 1) -> List[int]:
+        """Indices of the `k` Boxes with smallest distance to `box`, nearest
+        first.  Distance is 0 for Boxes intersecting `box`."""
+        if self._root is None or k < 1:
+            return []
+        query = (box.ll.x, box.ll.y, box.ur.x, box.ur.y)
+
+        # best-first search; `counter` breaks ties without comparing nodes
+        counter = 0
+        heap = [(0.0, counter, False, self._root)]
+        results = []
+        while heap and len(results) < k:
+            dist, _, is_box, item = heapq.heappop(heap)
+            if is_box:
+                results.append(item)
+                continue
+            for child in item.children:
+                counter += 1
+                if item.is_leaf:
+                    heapq.heappush(heap, (_dist(self._bounds[child], query),
+                                          counter, True, child))
+                else:
+                    heapq.heappush(heap, (_dist(child.bounds, query),
+                                          counter, False, child))
+        return results
+
+    def above(self, box: Box, k: int = None) -> List[int]:
+        """Indices of Boxes `b` for which `Box.is_above(b, box)`, nearest
+        first.  If `k` is given, only the nearest `k` are returned."""
+        candidates = self._search((box.ll.x, box.ur.y, box.ur.x, INF))
+        results = [i for i in candidates if Box.is_above(self.boxes[i], box)]
+        results.sort(key=lambda i: self._bounds[i][1] - box.ur.y)
+        return results if k is None else results[:k]
+
+    def below(self, box: Box, k: int = None) -> List[int]:
+        """Indices of Boxes `b` for which `Box.is_above(box, b)`, nearest
+        first.  If `k` is given, only the nearest `k` are returned."""
+        candidates = self._search((box.ll.x, -INF, box.ur.x, box.ll.y))
+        results = [i for i in candidates if Box.is_above(box, self.boxes[i])]
+        results.sort(key=lambda i: box.ll.y - self._bounds[i][3])
+        return results if k is None else results[:k]
@@ -5,13 +5,50 @@ Miscellaneous functions for performing operations on strings
 """
 
 import re
+import string
 
-from typing import List
+from typing import List, Tuple, Iterable
+from functools import lru_cache
+from collections import namedtuple
+
+import numpy as np
+
+# numbers (incl. decimals & thousands separators), then alphanumeric words,
+# then any other single non-whitespace symbol (e.g. '%', '±', '(')
+TOKEN_PATTERN = re.compile(r'\d+(?:[.,]\d+)*|\w+|[^\w\s]')
+
+TOKENIZE_CACHE_SIZE = 2 ** 16
 
 
 def tokenize(s: str) -> List[str]:
-    """Standard function for string tokenization used throughout this module"""
-    pass
+    """Standard function for string tokenization used throughout this module
+
+    e.g.
+    input: 'Acc. (92.3%)'
+    output: ['Acc', '.', '(', '92.3', '%', ')']
+    """
+    return TOKEN_PATTERN.findall(s)
+
+
+@lru_cache(maxsize=TOKENIZE_CACHE_SIZE)
+def tokenize_cached(s: str) -> Tuple[str, ...]:
+    """Same as `tokenize`, but memoized for strings that recur often (e.g.
+    column headers).  Returns a tuple so cached results can't be mutated."""
+    return tuple(TOKEN_PATTERN.findall(s))
+
+
+def tokenize_many(strings: Iterable[str]) -> List[List[str]]:
+    """Tokenizes a batch of strings.  Each distinct string is only scanned
+    once per batch, and duplicates share the same token list."""
+    findall = TOKEN_PATTERN.findall
+    seen = {}
+    results = []
+    for s in strings:
+        tokens = seen.get(s)
+        if tokens is None:
+            tokens = seen[s] = findall(s)
+        results.append(tokens)
+    return results
 
 
 # TODO: clean up syntax/style
@@ -33,6 +70,11 @@ def format_grid(grid: List[List[str]]) -> str:
     return '\n'.join([fmt.format(*row) for row in g])
 
 
+def normalize_cell_text(s: str) -> str:
+    """Canonical form of cell text used when comparing cells for equality"""
+    return s.lower().strip()
+
+
 def is_floatable(s: str) -> bool:
     try:
         float(s)
@@ -41,17 +83,31 @@ def is_floatable(s: str) -> bool:
         return False
 
 
+ALPHA_PATTERN = re.compile(r'[a-zA-Z]')
+DIGIT_PATTERN = re.compile(r'\d')
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^A-Za-z0-9]+')
+NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+
+# `is_like_citation` year/reference patterns collapse into a single search
+CITATION_PATTERN = re.compile(r'\[[0-9]*\]|[1-2][0-9]{3}')
+YEAR_IN_PARENTHESES_PATTERN = re.compile(r'\([1-2][0-9]{3}\)')
+YEAR_IN_BRACKETS_PATTERN = re.compile(r'\[[1-2][0-9]{3}\]')
+REFERENCE_BRACKETS_PATTERN = re.compile(r'\[[0-9]*\]')
+YEAR_PATTERN = re.compile(r'[1-2][0-9]{3}')
+FLOAT_PATTERN = re.compile(r'[0-9]*\.[0-9]*')
+DIGIT_PERCENTAGE_PATTERN = re.compile(r'[0-9]\%')
+
+
 def is_contains_alpha(s: str) -> bool:
-    return len(re.findall(pattern=r'[a-zA-Z]', string=s)) > 0
-    # return re.search(pattern=r'[a-z,A-Z]', string=s) is not None
+    return ALPHA_PATTERN.search(s) is not None
 
 
 def count_digits(s: str) -> int:
-    return len(re.findall(pattern=r'\d', string=s))
+    return len(DIGIT_PATTERN.findall(s))
 
 
 def remove_non_alphanumeric(s: str) -> str:
-    return re.sub(r'[^A-Za-z0-9]+', '', s)
+    return NON_ALPHANUMERIC_PATTERN.sub('', s)
 
 
 def is_like_citation(s: str) -> bool:
@@ -60,12 +116,13 @@ def is_like_citation(s: str) -> bool:
         return False
     is_begins_capitalized = s[0].isupper()
     is_contains_et_al = 'etal' in s
-    is_contains_year_in_parentheses = re.search(r'\([1-2][0-9]{3}\)',
-                                                s) is not None
-    is_contains_year_in_brackets = re.search(r'\[[1-2][0-9]{3}\]',
-                                             s) is not None
-    is_contains_reference_brackets = re.search(r'\[[0-9]*\]', s) is not None
-    is_contains_year = re.search(r'[1-2][0-9]{3}', s) is not None
+    is_contains_year_in_parentheses = \
+        YEAR_IN_PARENTHESES_PATTERN.search(s) is not None
+    is_contains_year_in_brackets = \
+        YEAR_IN_BRACKETS_PATTERN.search(s) is not None
+    is_contains_reference_brackets = \
+        REFERENCE_BRACKETS_PATTERN.search(s) is not None
+    is_contains_year = YEAR_PATTERN.search(s) is not None
     return is_contains_et_al or \
            (is_begins_capitalized and is_contains_year_in_parentheses) or \
            (is_begins_capitalized and is_contains_year_in_brackets) or \
@@ -76,9 +133,172 @@ def is_like_citation(s: str) -> bool:
 def is_like_result(s: str) -> bool:
     s = s.strip()
     is_one_or_zero = s == '1' or s == '0'
-    is_contains_float = re.search(r'[0-9]*\.[0-9]*', s) is not None
-    is_contains_digit_percentage = re.search(r'[0-9]\%', s) is not None
+    is_contains_float = FLOAT_PATTERN.search(s) is not None
+    is_contains_digit_percentage = \
+        DIGIT_PERCENTAGE_PATTERN.search(s) is not None
     is_only_number_symbol = not is_contains_alpha(s)
     return is_one_or_zero or \
            (is_only_number_symbol and is_contains_float) or \
            (is_only_number_symbol and is_contains_digit_percentage)
+
+
+CellFeatures = namedtuple('CellFeatures', [
+    'num_digits',  # count_digits(s)
+    'num_alphanumeric',  # len(remove_non_alphanumeric(s))
+    'num_alphanumeric_digits',  # count_digits(remove_non_alphanumeric(s))
+    'is_contains_alpha',
+    'is_like_citation',
+    'is_like_result',
+    'is_floatable'
+])
+
+# maps every ASCII digit to 'd' and ASCII letter to 'a' so that one
+# `str.translate` pass gives the character classes the features need
+_CHAR_CLASS_TABLE = str.maketrans(
+    dict([(c, 'd') for c in string.digits] +
+         [(c, 'a') for c in string.ascii_letters]))
+
+_INF_OR_NAN = {'inf', 'infinity', 'nan'}
+
+
+def extract_cell_features(s: str) -> CellFeatures:
+    """Computes all of the above per-string features at once.  Results are
+    identical to calling each helper separately, but `s` is classified in a
+    single pass instead of running a separate regex per helper."""
+    char_classes = s.translate(_CHAR_CLASS_TABLE)
+    num_ascii_digits = char_classes.count('d')
+    num_ascii_alpha = char_classes.count('a')
+
+    # `\d` also matches non-ASCII decimal digits
+    if NON_ASCII_PATTERN.search(s) is None:
+        num_digits = num_ascii_digits
+    else:
+        num_digits = count_digits(s)
+
+    # see `is_like_citation`; the year & bracket patterns only matter if
+    # the lowercased string still begins with an uppercase character
+    citation_text = s.replace(' ', '').lower()
+    if len(citation_text) < 1:
+        is_citation = False
+    elif 'etal' in citation_text:
+        is_citation = True
+    else:
+        is_citation = citation_text[0].isupper() and \
+                      CITATION_PATTERN.search(citation_text) is not None
+
+    # see `is_like_result`
+    stripped = s.strip()
+    is_only_number_symbol = num_ascii_alpha == 0
+    is_result = stripped == '1' or stripped == '0' or \
+                (is_only_number_symbol and
+                 ('.' in stripped or 'd%' in char_classes))
+
+    # avoid raising exceptions for (most) strings without any digits
+    if num_digits > 0:
+        is_float = is_floatable(s)
+    else:
+        unsigned = stripped.lower()
+        if unsigned[:1] in ('+', '-'):
+            unsigned = unsigned[1:]
+        is_float = unsigned in _INF_OR_NAN
+
+    return CellFeatures(num_digits=num_digits,
+                        num_alphanumeric=num_ascii_digits + num_ascii_alpha,
+                        num_alphanumeric_digits=num_ascii_digits,
+                        is_contains_alpha=not is_only_number_symbol,
+                        is_like_citation=is_citation,
+                        is_like_result=is_result,
+                        is_floatable=is_float)
+
+
+def extract_cell_features_many(strings: Iterable[str]) -> List[CellFeatures]:
+    """Batch version of `extract_cell_features`, e.g. over the text of every
+    Cell in a Table.  Each distinct string is only processed once."""
+    seen = {}
+    results = []
+    for s in strings:
+        features = seen.get(s)
+        if features is None:
+            features = seen[s] = extract_cell_features(s)
+        results.append(features)
+    return results
+
+
+# a number, possibly w/ thousands separators or an exponent (e.g. '1,234',
+# '.85', '1e-3'), but not a decimal comma (e.g. '12,34')
+_NUMBER = r'(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?'
+
+# one line per string:  either a (signed) number, optionally followed by
+# '%' and/or an uncertainty (e.g. '92.3 %', '- 1,234', '0.85 ± 0.02',
+# '0.85 +/- 0.02 %'), or else any other line, whose groups are all empty
+NUMERIC_VALUE_PATTERN = re.compile(
+    r'^(?:[ \t]*(?P<value>[+-]?[ \t]*{number})[ \t]*(?P<value_unit>%?)'
+    r'(?:[ \t]*(?:±|\+[ \t]*/?[ \t]*-)[ \t]*(?P<uncertainty>{number})'
+    r'[ \t]*(?P<uncertainty_unit>%?))?[ \t]*$|.*$)'.format(number=_NUMBER),
+    re.MULTILINE)
+
+ParsedNumbers = namedtuple('ParsedNumbers', [
+    'values',  # float64;  NaN if not a number
+    'uncertainties',  # float64;  NaN if no uncertainty
+    'is_number',
+    'has_uncertainty',
+    'is_percent'
+])
+
+
+def _to_floats(numbers: Tuple[str, ...]) -> np.ndarray:
+    """Floats of `value` or `uncertainty` matches, NaN if empty"""
+    # drop whitespace after signs and thousands separators all at once
+    text = '\n'.join([number or 'nan' for number in numbers])
+    text = text.replace(' ', '').replace('\t', '').replace(',', '')
+    return np.fromiter(map(float, text.split('\n')), dtype=np.float64,
+                       count=len(numbers))
+
+
+def parse_numbers_many(strings: Iterable[str]) -> ParsedNumbers:
+    """Parses numeric cell text (e.g. '92.3%', '0.85±0.02', '1,234') into
+    arrays with one entry per string.  Values are kept as written, so
+    '92.3%' is 92.3 with `is_percent` set.  Unlike `is_floatable`, 'nan' or
+    'inf' aren't numbers.
+
+    Each distinct string is parsed once, and all of them are matched by a
+    single `NUMERIC_VALUE_PATTERN.findall` over their lines, rather than a
+    separate regex search and `float` call (in a try/except) per string."""
+    strings = list(strings)
+    distinct = {s: i for i, s in enumerate(dict.fromkeys(strings))}
+    if len(distinct) == len(strings):
+        indices = slice(None)
+    else:
+        indices = np.fromiter(map(distinct.__getitem__, strings),
+                              dtype=np.int64, count=len(strings))
+    if len(distinct) == 0:
+        empty = np.zeros(0, dtype=np.float64)
+        return ParsedNumbers(values=empty, uncertainties=empty.copy(),
+                             is_number=np.zeros(0, dtype=bool),
+                             has_uncertainty=np.zeros(0, dtype=bool),
+                             is_percent=np.zeros(0, dtype=bool))
+
+    text = '\n'.join(distinct)
+    if text.count('\n') != len(distinct) - 1:
+        # line breaks within a string would split it across lines
+        text = '\n'.join([s.replace('\n', ' ') for s in distinct])
+    text = text.replace('\r', ' ').replace('\u2212', '-')
+    matches = NUMERIC_VALUE_PATTERN.findall(text)
+    assert len(matches) == len(distinct)
+    values, value_units, uncertainties, uncertainty_units = zip(*matches)
+
+    num_distinct = len(distinct)
+    is_number = np.fromiter(map(bool, values), dtype=bool,
+                            count=num_distinct)
+    has_uncertainty = np.fromiter(map(bool, uncertainties), dtype=bool,
+                                  count=num_distinct)
+    is_percent = np.fromiter(map(bool, value_units), dtype=bool,
+                             count=num_distinct) | \
+        np.fromiter(map(bool, uncertainty_units), dtype=bool,
+                    count=num_distinct)
+
+    return ParsedNumbers(values=_to_floats(values)[indices],
+                         uncertainties=_to_floats(uncertainties)[indices],
+                         is_number=is_number[indices],
+                         has_uncertainty=has_uncertainty[indices],
+                         is_percent=is_percent[indices])
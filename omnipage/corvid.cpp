@@ -6,6 +6,7 @@
 #include <errno.h>
 #include <libgen.h>
 #include <string.h>
+#include <time.h>
 
 #include "KernelApi.h"
 #include "RecApiPlus.h"
@@ -14,6 +15,66 @@ using namespace std;
 
 #define SID 0
 
+static double nowSeconds ()
+{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec + ts.tv_nsec / 1e9;
+}
+
+static RECERR processFile (const char *strInput, const char *strOutput)
+{
+    LPCSTR inputFiles[2];
+    inputFiles[0] = strInput;
+    inputFiles[1] = NULL;
+    return kRecProcessPages(SID, strOutput, inputFiles, NULL, NULL, NULL);
+}
+
+// Batch mode:  each line of the manifest is "INPUT_PATH<TAB>OUTPUT_PATH".
+// The engine is initialized once, and one status line is printed per line:
+//     OK<TAB>INPUT_PATH<TAB>OUTPUT_PATH<TAB>SECONDS
+//     ERROR<TAB>INPUT_PATH<TAB>OUTPUT_PATH<TAB>SECONDS<TAB>ERROR_CODE
+// Returns the number of inputs that failed.
+static int processManifest (const char *strManifest)
+{
+    FILE *manifest = fopen(strManifest, "r");
+    if (manifest == NULL)
+    {
+        printf("Error opening manifest: %s\n", strManifest);
+        return -1;
+    }
+
+    char line[2 * PATH_MAX + 2];
+    int nErrors = 0;
+    while (fgets(line, sizeof(line), manifest) != NULL)
+    {
+        line[strcspn(line, "\r\n")] = '\0';
+        char *tab = strchr(line, '\t');
+        if (tab == NULL)
+            continue;
+        *tab = '\0';
+        const char *strInput = line;
+        const char *strOutput = tab + 1;
+
+        double start = nowSeconds();
+        RECERR rc = processFile(strInput, strOutput);
+        double elapsed = nowSeconds() - start;
+        if (rc == REC_OK)
+        {
+            printf("OK\t%s\t%s\t%.3f\n", strInput, strOutput, elapsed);
+        }
+        else
+        {
+            printf("ERROR\t%s\t%s\t%.3f\t%X\n", strInput, strOutput, elapsed,
+                   rc);
+            nErrors++;
+        }
+        fflush(stdout);
+    }
+    fclose(manifest);
+    return nErrors;
+}
+
 int main (int argc, char *argv[])
 {
     char opt;
@@ -21,8 +82,9 @@ int main (int argc, char *argv[])
     char *strOutput = (char *) malloc (PATH_MAX);
     char *strFormat = (char *) malloc (PATH_MAX);
     char *strOutputLevel = (char *) malloc (PATH_MAX);
+    char *strManifest = NULL;
 
-    while ((opt = (char) (getopt (argc, argv, "Ri:o:f:l:"))) != EOF)
+    while ((opt = (char) (getopt (argc, argv, "Ri:o:f:l:m:"))) != EOF)
     {
         switch (opt)
         {
@@ -38,14 +100,15 @@ int main (int argc, char *argv[])
               case 'l':
                   strOutputLevel = optarg;
                   break;
+              case 'm':
+                  strManifest = optarg;
+                  break;
               default:
-                  printf("Use -i filenamein -o filenameout -f outputformat -l outputlevel; do not use STDIO\n");
+                  printf("Use -i filenamein -o filenameout -f outputformat -l outputlevel, "
+                         "or -m manifest for batches; do not use STDIO\n");
                   exit (1);
         }
     }
-    LPCSTR inputFiles[2];
-    inputFiles[0] = strInput;
-    inputFiles[1] = NULL;
     RECERR rc;
     
     rc = RecInitPlus(NULL, NULL);    
@@ -56,8 +119,14 @@ int main (int argc, char *argv[])
     printf("XML output\n");
     kRecSetDTXTFormat(0, DTXT_XMLCOORD);
 
+    if (strManifest != NULL)
+    {
+        int nErrors = processManifest(strManifest);
+        RecQuitPlus();
+        return nErrors == 0 ? 0 : 1;
+    }
 
-    kRecProcessPages(0, strOutput, inputFiles, NULL, NULL, NULL);
+    rc = processFile(strInput, strOutput);
     if(rc != REC_OK)
     {    
         //Handle errors (add similar code elsewhere as needed)
@@ -68,6 +137,3 @@ int main (int argc, char *argv[])
     RecQuitPlus();
     return 0;
 }
-
-
-
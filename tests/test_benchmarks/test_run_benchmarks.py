@@ -0,0 +1,43 @@
+import os
+import json
+import unittest
+
+from benchmarks import run_benchmarks
+from benchmarks.run_benchmarks import BENCHMARKS, SCALES, compare_results
+
+
+def _results(**best_seconds):
+    return {'results': {name: {'best': seconds}
+                        for name, seconds in best_seconds.items()}}
+
+
+class TestCompareResults(unittest.TestCase):
+    def test_compare_results(self):
+        baseline = _results(a=1.0, b=1.0, c=2.0, d=0.0)
+        results = _results(a=1.5, b=1.25, c=1.0, d=0.0, new=1.0)
+        comparisons = compare_results(results, baseline, threshold=0.25)
+        # benchmarks missing from the baseline aren't compared
+        self.assertListEqual([c[0] for c in comparisons],
+                             ['a', 'b', 'c', 'd'])
+        name, previous, current, ratio, is_regression = comparisons[0]
+        self.assertEqual((previous, current, ratio), (1.0, 1.5, 1.5))
+        self.assertTrue(is_regression)
+        # only slowdowns beyond the threshold are regressions
+        self.assertListEqual([c[4] for c in comparisons[1:]],
+                             [False, False, False])
+        self.assertEqual(comparisons[2][3], 0.5)
+
+        comparisons = compare_results(results, baseline, threshold=0.1)
+        self.assertListEqual([c[4] for c in comparisons],
+                             [True, True, False, False])
+
+
+class TestBaseline(unittest.TestCase):
+    def test_baseline_covers_benchmarks(self):
+        path = os.path.join(os.path.dirname(run_benchmarks.__file__),
+                            'baseline.json')
+        with open(path) as f:
+            baseline = json.load(f)
+        self.assertSetEqual(set(baseline['results']),
+                            {'{}[{}]'.format(name, scale)
+                             for scale in SCALES for name in BENCHMARKS})
@@ -0,0 +1,91 @@
+import unittest
+
+import numpy as np
+
+from corvid.table.table import Cell, Table
+from corvid.table.vocabulary import Vocabulary, UNKNOWN_ID
+from corvid.util.strings import remove_non_alphanumeric
+from corvid.semantic_table.evaluate import is_same_dimensions, \
+    shape_agreement, bag_of_cells_iou, cell_level_grid_accuracy, evaluate, \
+    evaluate_many
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                             index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+class TestEvaluate(unittest.TestCase):
+    def setUp(self):
+        self.gold = _build_table([['', 'acc'], ['ours', '9.0'],
+                                  ['ours', '8.0']])
+        # '9.0' and '90' match after removing non-alphanumeric characters
+        self.pred = _build_table([['', 'acc'], ['ours', '90'],
+                                  ['theirs', '8.1']])
+        self.wide = _build_table([['', 'acc', 'f1'], ['ours', '9.0', '1']])
+
+    def test_shape(self):
+        self.assertTrue(is_same_dimensions(self.gold, self.pred))
+        self.assertFalse(is_same_dimensions(self.gold, self.wide))
+        self.assertAlmostEqual(shape_agreement(self.gold, self.wide),
+                               2 / 3 * 2 / 3)
+
+    def test_cell_level_grid_accuracy(self):
+        self.assertAlmostEqual(cell_level_grid_accuracy(self.gold, self.pred),
+                               4 / 6)
+        with self.assertRaises(Exception):
+            cell_level_grid_accuracy(self.gold, self.wide)
+
+    def test_bag_of_cells_iou(self):
+        # bags share {'', 'acc', 'ours', '90'}; 'ours' is twice in gold only
+        self.assertAlmostEqual(bag_of_cells_iou(self.gold, self.pred),
+                               4 / (6 + 6 - 4))
+        self.assertAlmostEqual(bag_of_cells_iou(self.gold, self.gold), 1.0)
+        self.assertAlmostEqual(bag_of_cells_iou(self.gold, self.wide),
+                               4 / (6 + 6 - 4))
+
+    def test_evaluate(self):
+        self.assertDictEqual(evaluate(self.gold, self.pred), {
+            'is_same_dimensions': 1.0,
+            'shape_agreement': 1.0,
+            'bag_of_cells_iou': 0.5,
+            'cell_level_grid_accuracy': 4 / 6
+        })
+        with self.assertRaises(Exception):
+            evaluate(self.gold, self.wide)
+
+    def test_evaluate_many(self):
+        pairs = [(self.gold, self.pred), (self.gold, self.wide),
+                 (self.pred, self.pred)]
+        results = evaluate_many(pairs)
+        np.testing.assert_array_equal(results['is_same_dimensions'],
+                                      [True, False, True])
+        np.testing.assert_allclose(results['cell_level_grid_accuracy'],
+                                   [4 / 6, np.nan, 1.0])
+        for (gold, pred), iou in zip(pairs, results['bag_of_cells_iou']):
+            self.assertAlmostEqual(iou, bag_of_cells_iou(gold, pred))
+        self.assertEqual(len(evaluate_many([])['bag_of_cells_iou']), 0)
+
+    def test_reuses_cell_ids(self):
+        vocabulary = Vocabulary(normalize=remove_non_alphanumeric)
+        gold, pred = vocabulary.attach(self.gold), vocabulary.attach(self.pred)
+        gold.cell_ids = np.zeros_like(gold.cell_ids)
+        pred.cell_ids = np.zeros_like(pred.cell_ids)
+        results = evaluate_many([(gold, pred)], vocabulary=vocabulary)
+        self.assertEqual(results['cell_level_grid_accuracy'][0], 1.0)
+
+    def test_unknown_cell_ids(self):
+        vocabulary = Vocabulary(normalize=remove_non_alphanumeric)
+        vocabulary.add('ours')
+        gold = vocabulary.attach(self.gold, is_grow=False)
+        pred = vocabulary.attach(self.pred, is_grow=False)
+        self.assertTrue(np.any(gold.cell_ids == UNKNOWN_ID))
+        results = evaluate_many([(self.wide, self.gold), (gold, pred)],
+                                vocabulary=vocabulary)
+        expected = evaluate(self.gold, self.pred)
+        self.assertAlmostEqual(results['bag_of_cells_iou'][1],
+                               expected['bag_of_cells_iou'])
+        self.assertAlmostEqual(results['cell_level_grid_accuracy'][1],
+                               expected['cell_level_grid_accuracy'])
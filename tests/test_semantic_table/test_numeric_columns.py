@@ -0,0 +1,43 @@
+import unittest
+
+from numpy.testing import assert_array_equal
+
+from corvid.table.table import Cell, Table
+from corvid.semantic_table.semantic_table import LabelCollapseSemanticTable
+from corvid.semantic_table.numeric_columns import extract_numeric_columns
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                             index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+class TestNumericColumns(unittest.TestCase):
+    def test_extract_numeric_columns(self):
+        table = _build_table([['', 'Acc', 'BLEU', 'Notes', 'Params'],
+                              ['ours', '92.3 %', '0.85 ± 0.02', 'new', ''],
+                              ['base', '90.1 %', '-', 'old', '1,234']])
+        columns = extract_numeric_columns(table)
+        self.assertListEqual([c.name for c in columns],
+                             ['Acc', 'BLEU', 'Params'])
+        acc, bleu, params = columns
+        assert_array_equal(acc.values, [92.3, 90.1])
+        assert_array_equal(acc.is_percent, [True, True])
+        assert_array_equal(bleu.is_number, [True, False])
+        assert_array_equal(bleu.uncertainties[:1], [0.02])
+        assert_array_equal(bleu.has_uncertainty, [True, False])
+        self.assertEqual(params.index_col, 4)
+        assert_array_equal(params.values[1:], [1234.0])
+
+        # '-' doesn't count as a number
+        columns = extract_numeric_columns(table, min_fraction_numeric=0.75)
+        self.assertListEqual([c.name for c in columns], ['Acc', 'Params'])
+
+    def test_semantic_table(self):
+        semantic_table = LabelCollapseSemanticTable(_build_table(
+            [['', 'F1'], ['ours', '88.5'], ['base', '80.0']]))
+        columns = extract_numeric_columns(semantic_table)
+        self.assertEqual(len(columns), 1)
+        assert_array_equal(columns[0].values, [88.5, 80.0])
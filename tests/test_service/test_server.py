@@ -0,0 +1,103 @@
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from corvid.table.table import Cell, Table
+from corvid.service.server import CorvidService, LatencyHistogram
+from corvid.service.client import Client, LocalClient, ServiceError
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                             index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for seconds in [0.0005] * 90 + [0.03] * 9 + [20.0]:
+            histogram.record(seconds)
+        self.assertEqual(histogram.percentile(50), 1)
+        self.assertEqual(histogram.percentile(95), 50)
+        self.assertEqual(histogram.percentile(100), float('inf'))
+        summary = histogram.to_json()
+        self.assertEqual(summary['num_requests'], 100)
+        self.assertEqual(summary['buckets']['inf'], 1)
+
+
+class TestCorvidService(unittest.TestCase):
+    def setUp(self):
+        self.tables = [
+            _build_table([['', 'BLEU', 'METEOR'], ['ours', '30.1', '25.0']]),
+            _build_table([['', 'METEOR', 'BLEU'], ['seq2seq', '24.9', '29.7']])
+        ]
+        self.target_schema = ['', 'BLEU', 'METEOR']
+
+    def test_endpoints(self):
+        service = CorvidService(num_workers=2, executor='thread')
+        with LocalClient(service) as client:
+            normalized = client.normalize(self.tables + [_build_table([['']])])
+            self.assertListEqual([str(c) for c in normalized[1].grid[1]],
+                                 ['seq2seq', '24.9', '29.7'])
+            self.assertIsNone(normalized[2])
+
+            matches = client.match(self.tables, self.target_schema)
+            self.assertListEqual(matches[1][1], [(0, 0), (1, 2), (2, 1)])
+
+            aggregated = client.aggregate(self.tables, self.target_schema)
+            self.assertListEqual([str(c) for c in aggregated.grid[2]],
+                                 ['seq2seq', '29.7', '24.9'])
+
+            metrics = client.evaluate(self.tables[0], self.tables[0])
+            self.assertEqual(metrics['cell_level_grid_accuracy'], 1.0)
+            with self.assertRaises(ServiceError) as e:
+                client.evaluate(self.tables[0], aggregated)
+            self.assertEqual(e.exception.status, 400)
+
+            self.assertEqual(client.request('GET', '/health')[0], 200)
+            self.assertEqual(client.request('GET', '/nothing')[0], 404)
+            self.assertEqual(client.request('GET', '/normalize')[0], 405)
+            self.assertEqual(client.request('POST', '/normalize',
+                                            {'strategy': 'x'})[0], 400)
+
+            latency = client.metrics()['latency']
+            self.assertEqual(latency['/normalize']['num_requests'], 2)
+            self.assertEqual(latency['/evaluate']['num_requests'], 2)
+
+    def test_batching(self):
+        service = CorvidService(num_workers=1, executor='thread',
+                                max_batch_size=4, max_batch_wait=0.05)
+        with LocalClient(service) as client:
+            def normalize(_):
+                with Client(port=client.port) as other:
+                    return other.normalize(self.tables)
+
+            def aggregate(_):
+                with Client(port=client.port) as other:
+                    return other.aggregate(self.tables, self.target_schema)
+
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                results = list(pool.map(normalize, range(4)))
+                aggregated = list(pool.map(aggregate, range(4)))
+            self.assertTrue(all(r[0].shape == (2, 3) for r in results))
+            self.assertTrue(all(t.shape == (3, 3) for t in aggregated))
+
+            batching = client.metrics()['batching']
+            self.assertEqual(batching['normalize']['num_items'], 8)
+            self.assertLess(batching['normalize']['num_batches'], 8)
+            self.assertEqual(batching['aggregate']['num_items'], 4)
+            self.assertLess(batching['aggregate']['num_batches'], 4)
+
+            # a bad Table only fails the request it was sent with
+            status, response = client.request('POST', '/match', {
+                'tables': [{'cells': 'bad'}],
+                'target_schema': self.target_schema})
+            self.assertEqual(status, 400)
+            self.assertIn('Invalid table', response['error'])
+
+    def test_process_pool(self):
+        with LocalClient(CorvidService(num_workers=1)) as client:
+            aggregated = client.aggregate(self.tables, self.target_schema)
+            self.assertEqual(aggregated.shape, (3, 3))
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from importlib.util import find_spec
+
+from corvid.table.table import Cell, Table
+from corvid.semantic_table.semantic_table import IdentitySemanticTable
+
+IS_PYARROW_INSTALLED = find_spec('pyarrow') is not None
+
+if IS_PYARROW_INSTALLED:
+    import pyarrow as pa
+    from corvid.table.columnar import to_arrow, to_record_batches, \
+        from_arrow, write_parquet, read_parquet
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                             index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+def _texts(table):
+    return [[str(cell) for cell in row] for row in table.grid]
+
+
+@unittest.skipUnless(IS_PYARROW_INSTALLED, 'requires pyarrow')
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        self.table = _build_table([
+            ['', 'BLEU', 'size', 'note', 'BLEU'],
+            ['ours', '30.10', '4', 'best', '1'],
+            ['baseline', 'NONE', '12', '', '2.5'],
+            ['seq2seq', '-1e3', '', 'NONE', '3']
+        ])
+
+    def test_to_arrow(self):
+        data = to_arrow(self.table)
+        self.assertListEqual(data.schema.names,
+                             ['column_0', 'BLEU', 'size', 'note', 'BLEU_2'])
+        self.assertListEqual(data.schema.types,
+                             [pa.string(), pa.float64(), pa.int64(),
+                              pa.string(), pa.float64()])
+        self.assertListEqual(data.column('BLEU').to_pylist(),
+                             [30.1, None, -1000.0])
+        self.assertListEqual(data.column('note').to_pylist(),
+                             ['best', '', 'NONE'])
+
+        data = to_arrow(self.table, is_typed=False)
+        self.assertTrue(all(t == pa.string() for t in data.schema.types))
+        self.assertListEqual(_texts(from_arrow(data)), _texts(self.table))
+
+    def test_record_batches(self):
+        batches = list(to_record_batches(IdentitySemanticTable(self.table),
+                                         batch_size=2))
+        self.assertListEqual([b.num_rows for b in batches], [2, 1])
+        self.assertTrue(all(b.schema == batches[0].schema for b in batches))
+
+        table = from_arrow(pa.Table.from_batches(batches), null_text='NONE')
+        self.assertListEqual(_texts(table), [
+            ['', 'BLEU', 'size', 'note', 'BLEU'],
+            ['ours', '30.1', '4', 'best', '1.0'],
+            ['baseline', 'NONE', '12', '', '2.5'],
+            ['seq2seq', '-1000.0', 'NONE', 'NONE', '3.0']
+        ])
+
+    def test_parquet(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'table.parquet')
+            write_parquet(self.table, path, batch_size=2)
+            table = read_parquet(path)
+        self.assertEqual(table.shape, self.table.shape)
+        self.assertListEqual(_texts(table)[0], _texts(self.table)[0])
+        self.assertEqual(str(table[1, 1]), '30.1')
+
+        header_only = _build_table([['', 'a']])
+        self.assertEqual(from_arrow(to_arrow(header_only)).shape, (1, 2))
@@ -0,0 +1,108 @@
+"""
+
+
+
+"""
+
+import io
+import unittest
+
+from corvid.table.table_loader import CellLoader, TableLoader
+from corvid.table.omnipage_loader import BoxCell, BoxTable, \
+    OmniPageTableLoader
+
+XML = b'''<?xml version="1.0" encoding="UTF-8"?>
+<document xmlns="http://www.scansoft.com/omnipage/xml/ssdoc-schema3.xsd">
+  <page>
+    <description>
+      <theoreticalPage width="12240" height="15840"/>
+    </description>
+    <body>
+      <section><column><region><paragraph><ln>
+        <wd l="100" t="100" r="200" b="150">Introduction</wd>
+      </ln></paragraph></region></column></section>
+      <table l="1000" t="2000" r="5000" b="3000">
+        <gridTable>
+          <gridCol>1</gridCol><gridCol>1</gridCol><gridCol>1</gridCol>
+          <gridRow>1</gridRow><gridRow>1</gridRow>
+        </gridTable>
+        <cell gridColFrom="1" gridColTill="2" gridRowFrom="0" gridRowTill="0">
+          <para><ln>
+            <wd l="2000" t="2000" r="2500" b="2200">F1</wd>
+            <wd l="2600" t="2000" r="3000" b="2200">score</wd>
+          </ln></para>
+        </cell>
+        <cell gridColFrom="0" gridColTill="0" gridRowFrom="1" gridRowTill="1"
+              l="1000" t="2500" r="1800" b="3000">
+          <para><ln><wd l="1000" t="2500" r="1800" b="2700">ours</wd></ln></para>
+        </cell>
+        <cell gridColFrom="1" gridColTill="1" gridRowFrom="1" gridRowTill="1">
+          <para><ln><wd l="2000" t="2500" r="2400" b="2700">92.3</wd></ln></para>
+        </cell>
+        <cell gridColFrom="2" gridColTill="2" gridRowFrom="1" gridRowTill="1">
+          <para><ln><wd l="2600" t="2500" r="3000" b="2700">0.85</wd></ln></para>
+        </cell>
+      </table>
+    </body>
+  </page>
+  <page>
+    <body>
+      <table>
+        <cell gridColFrom="0" gridColTill="0" gridRowFrom="0" gridRowTill="0">
+          <para><ln><wd l="1" t="2" r="3" b="4">a</wd></ln></para>
+        </cell>
+        <cell gridColFrom="0" gridColTill="0" gridRowFrom="1" gridRowTill="1">
+          <para><ln><wd l="1" t="5" r="3" b="6">b</wd></ln></para>
+        </cell>
+      </table>
+    </body>
+  </page>
+</document>
+'''
+
+
+class TestOmniPageTableLoader(unittest.TestCase):
+    def setUp(self):
+        self.loader = OmniPageTableLoader()
+
+    def test_iter_tables(self):
+        tables = list(self.loader.iter_tables(io.BytesIO(XML)))
+        self.assertEqual(len(tables), 2)
+
+        table = tables[0]
+        self.assertIsInstance(table, BoxTable)
+        self.assertEqual(table.page_num, 0)
+        self.assertEqual(table.shape, (2, 3))
+        self.assertEqual(str(table).replace(' ', ''),
+                         '\tF1score\tF1score\nours\t92.3\t0.85')
+        self.assertListEqual(table[0, 1].tokens, ['F1', 'score'])
+        self.assertEqual(table[0, 1].colspan, 2)
+        self.assertListEqual(table[0, 0].tokens, [])
+
+        # y-axis is flipped using page height
+        self.assertDictEqual(table.box.to_json(), {'llx': 1000.0,
+                                                   'lly': 12840.0,
+                                                   'urx': 5000.0,
+                                                   'ury': 13840.0})
+        self.assertDictEqual(table[0, 1].box.to_json(), {'llx': 2000.0,
+                                                         'lly': 13640.0,
+                                                         'urx': 3000.0,
+                                                         'ury': 13840.0})
+        self.assertDictEqual(table[1, 0].box.to_json(), {'llx': 1000.0,
+                                                         'lly': 12840.0,
+                                                         'urx': 1800.0,
+                                                         'ury': 13340.0})
+
+        table = tables[1]
+        self.assertEqual(table.page_num, 1)
+        self.assertIsNone(table.box)
+        self.assertEqual(table.shape, (2, 1))
+        self.assertEqual(table[1, 0].box.ur.y, -5.0)
+
+    def test_json_roundtrip(self):
+        table = next(self.loader.iter_tables(io.BytesIO(XML)))
+        table_loader = TableLoader(table_type=BoxTable,
+                                   cell_loader=CellLoader(cell_type=BoxCell))
+        loaded = table_loader.from_json(table.to_json())
+        self.assertDictEqual(loaded.to_json(), table.to_json())
+        self.assertEqual(loaded.page_num, 0)
@@ -0,0 +1,69 @@
+import pickle
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+from corvid.table.table import Cell, Table
+from corvid.table.shared_table import SharedTables
+
+
+def _describe(shared_tables: SharedTables, index: int):
+    table = shared_tables[index]
+    return table.shape, [str(cell) for cell in table.cells]
+
+
+class TestSharedTables(unittest.TestCase):
+    def setUp(self):
+        self.tables = [
+            Table(cells=[
+                Cell(tokens=['héader'], index_topleft_row=0,
+                     index_topleft_col=0, colspan=2),
+                Cell(tokens=['a', 'b'], index_topleft_row=1,
+                     index_topleft_col=0, rowspan=2),
+                Cell(tokens=[], index_topleft_row=1, index_topleft_col=1),
+                Cell(tokens=['±1'], index_topleft_row=2, index_topleft_col=1)
+            ], nrow=3, ncol=2),
+            Table(grid=[[Cell(tokens=['x'], index_topleft_row=0,
+                              index_topleft_col=0)]])
+        ]
+
+    def test_roundtrip(self):
+        with SharedTables.create(self.tables) as shared_tables:
+            self.assertEqual(len(shared_tables), 2)
+            for table, rebuilt in zip(self.tables, shared_tables):
+                self.assertEqual(rebuilt.shape, table.shape)
+                self.assertListEqual(
+                    [(c.tokens, c.indices) for c in rebuilt.cells],
+                    [(c.tokens, c.indices) for c in table.cells])
+                self.assertListEqual(
+                    [[str(c) for c in row] for row in rebuilt.grid],
+                    [[str(c) for c in row] for row in table.grid])
+            # spanned Cells are the same object at every grid position
+            rebuilt = shared_tables[0]
+            self.assertIs(rebuilt[1, 0], rebuilt[2, 0])
+
+            handle = pickle.dumps(shared_tables)
+            self.assertLess(len(handle), 500)
+            unpickled = pickle.loads(handle)
+            self.assertFalse(unpickled.is_owner)
+            self.assertEqual(str(unpickled[-1]), 'x')
+            unpickled.close()
+            # closing a non-owning handle leaves the block usable
+            self.assertEqual(str(shared_tables[1]), 'x')
+
+        with self.assertRaises(ValueError):
+            shared_tables[0]
+
+    def test_empty(self):
+        with SharedTables.create([]) as shared_tables:
+            self.assertEqual(len(shared_tables), 0)
+            self.assertListEqual(list(shared_tables), [])
+
+    def test_process_pool(self):
+        with SharedTables.create(self.tables) as shared_tables:
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                results = list(pool.map(_describe, [shared_tables] * 2,
+                                        range(2)))
+        self.assertEqual(results[0][0], (3, 2))
+        self.assertListEqual(results[0][1], ['héader', 'a b', '', '±1'])
+        self.assertListEqual(results[1][1], ['x'])
@@ -3,12 +3,15 @@
 
 """
 
+import copy
+import pickle
 import unittest
 
 import numpy as np
 from numpy.testing import assert_array_equal
 
 from corvid.table.table import Cell, Table
+from corvid.table.vocabulary import Vocabulary
 
 
 class TestCell(unittest.TestCase):
@@ -203,3 +206,55 @@ class TestTable(unittest.TestCase):
     def test_str(self):
         t = '\t\tC\tC\n\t\tC:1\tC:2\nR\tR:1\ta\tb\nR\tR:2\tc\td\nR\tR:3\te\tf'
         self.assertEqual(str(self.full_table).replace(' ', ''), t)
+
+    def _assert_same_table(self, table, other):
+        self.assertEqual(table.shape, other.shape)
+        self.assertListEqual([(c.tokens, c.indices) for c in table.cells],
+                             [(c.tokens, c.indices) for c in other.cells])
+        self.assertListEqual([[str(c) for c in row] for row in table.grid],
+                             [[str(c) for c in row] for row in other.grid])
+
+    def test_pickle(self):
+        table = pickle.loads(pickle.dumps(self.full_table))
+        self._assert_same_table(table, self.full_table)
+        # spanned cells are still shared across grid positions
+        self.assertIs(table[0, 0], table[1, 1])
+        self.assertIs(table[0, 0], table.cells[0])
+        # the grid isn't pickled
+        self.assertNotIn('grid', self.full_table.__getstate__())
+
+        # cells that can't be packed are pickled as is
+        self.full_table.cells[-1].label = 'VALUE'
+        state = self.full_table.__getstate__()
+        self.assertIn('cells', state)
+        table = Table.__new__(Table)
+        table.__setstate__(state)
+        self.assertEqual(table[4, 3].label, 'VALUE')
+
+    def test_pickle_with_vocabulary(self):
+        size = len(pickle.dumps(self.full_table))
+        vocabulary = Vocabulary()
+        for k in range(1000):
+            vocabulary.add('cell {}'.format(k))
+        vocabulary.attach(self.full_table)
+        data = pickle.dumps(self.full_table)
+        # neither the shared Vocabulary nor its ids are pickled
+        self.assertLess(len(data), size + 100)
+        table = pickle.loads(data)
+        self.assertIsNone(table.vocabulary)
+        self.assertIsNone(table.cell_ids)
+        self._assert_same_table(table, self.full_table)
+        self.assertIs(self.full_table.vocabulary, vocabulary)
+
+    def test_deepcopy(self):
+        self.full_table.cell_ids = np.arange(20).reshape(5, 4)
+        self.full_table.vocabulary = object()
+        table = copy.deepcopy(self.full_table)
+        self._assert_same_table(table, self.full_table)
+        self.assertIsNot(table.cells[0], self.full_table.cells[0])
+        self.assertIsNot(table.cells[0].tokens,
+                         self.full_table.cells[0].tokens)
+        self.assertIs(table[0, 0], table[1, 1])
+        assert_array_equal(table.cell_ids, self.full_table.cell_ids)
+        self.assertIsNot(table.cell_ids, self.full_table.cell_ids)
+        self.assertIs(table.vocabulary, self.full_table.vocabulary)
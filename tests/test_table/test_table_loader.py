@@ -6,8 +6,10 @@
 
 import unittest
 
+from numpy.testing import assert_array_equal
+
 from corvid.table.table_loader import Cell, CellLoader, Table, \
-    TableLoader
+    TableLoader, Vocabulary
 
 
 class TestCellLoader(unittest.TestCase):
@@ -72,3 +74,28 @@ class TestTableLoader(unittest.TestCase):
         })
         self.assertEqual(str(table).replace(' ', ''),
                          'a\ta\tb\tb\na\ta\tc\tc\nd\td\td\td\nd\td\td\td')
+
+    def test_from_json_with_vocabulary(self):
+        vocabulary = Vocabulary()
+        table_loader = TableLoader(table_type=Table,
+                                   cell_loader=self.cell_loader,
+                                   vocabulary=vocabulary)
+        json = {
+            'cells': [
+                {'tokens': ['a'], 'index_topleft_row': 0,
+                 'index_topleft_col': 0, 'rowspan': 1, 'colspan': 2},
+                {'tokens': ['b'], 'index_topleft_row': 1,
+                 'index_topleft_col': 0, 'rowspan': 1, 'colspan': 1},
+                {'tokens': ['A'], 'index_topleft_row': 1,
+                 'index_topleft_col': 1, 'rowspan': 1, 'colspan': 1}
+            ],
+            'nrow': 2,
+            'ncol': 2
+        }
+        table1 = table_loader.from_json(json)
+        table2 = table_loader.from_json(json)
+        assert_array_equal(table1.cell_ids, [[0, 0], [1, 0]])
+        assert_array_equal(table2.cell_ids, table1.cell_ids)
+        self.assertIs(table1[1].tokens[0], table2[1].tokens[0])
+        self.assertEqual(len(vocabulary), 2)
+        self.assertIsNone(self.table_loader.from_json(json).cell_ids)
@@ -0,0 +1,70 @@
+"""
+
+
+
+"""
+
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_equal
+
+from corvid.table.table import Cell, Table
+from corvid.table.vocabulary import Vocabulary, UNKNOWN_ID, \
+    count_matching_ids, hash_rows
+
+
+class TestVocabulary(unittest.TestCase):
+    def setUp(self):
+        self.vocabulary = Vocabulary()
+        self.table = Table(cells=[
+            Cell(tokens=['Header'], index_topleft_row=0, index_topleft_col=0,
+                 rowspan=1, colspan=2),
+            Cell(tokens=['0.5'], index_topleft_row=1, index_topleft_col=0),
+            Cell(tokens=[' header '], index_topleft_row=1,
+                 index_topleft_col=1),
+        ], nrow=2, ncol=2)
+
+    def test_add_and_lookup(self):
+        self.assertEqual(self.vocabulary.add('a'), 0)
+        self.assertEqual(self.vocabulary.add('b'), 1)
+        self.assertEqual(self.vocabulary.add(' A'), 0)
+        self.assertEqual(self.vocabulary.lookup('B'), 1)
+        self.assertEqual(self.vocabulary.lookup('c'), UNKNOWN_ID)
+        self.assertEqual(self.vocabulary.decode(1), 'b')
+        self.assertEqual(len(self.vocabulary), 2)
+        self.assertIn('a', self.vocabulary)
+
+    def test_encode_table(self):
+        cell_ids = self.vocabulary.encode_table(self.table)
+        self.assertEqual(cell_ids.dtype, np.int32)
+        assert_array_equal(cell_ids, [[0, 0], [1, 0]])
+
+        other = Table(grid=[[Cell(tokens=['0.5'], index_topleft_row=0,
+                                  index_topleft_col=0),
+                             Cell(tokens=['new'], index_topleft_row=0,
+                                  index_topleft_col=1)]])
+        assert_array_equal(self.vocabulary.encode_table(other, is_grow=False),
+                           [[1, UNKNOWN_ID]])
+        self.assertEqual(len(self.vocabulary), 2)
+
+        self.vocabulary.attach(other)
+        assert_array_equal(other.cell_ids, [[1, 2]])
+        self.assertIs(other.vocabulary, self.vocabulary)
+
+    def test_encode_zero_span_cells(self):
+        # e.g. as built by `predict_oracle`
+        table = Table(grid=[[Cell(['a'], 0, 0, 0, 0), Cell(['b'], 0, 1, 0, 0)],
+                            [Cell(['b'], 1, 0, 0, 0), Cell(['a'], 1, 1, 0, 0)]])
+        assert_array_equal(self.vocabulary.encode_table(table),
+                           [[0, 1], [1, 0]])
+
+    def test_id_operations(self):
+        a = np.array([[0, 1, 2], [0, 1, 3], [0, 1, 2]])
+        b = np.array([[0, 1, 2], [UNKNOWN_ID, 1, 3]])
+        assert_array_equal(count_matching_ids(a[:, None, :], b[None, :, :]),
+                           [[3, 1], [2, 2], [3, 1]])
+
+        hashes = hash_rows(a)
+        self.assertEqual(hashes[0], hashes[2])
+        self.assertNotEqual(hashes[0], hashes[1])
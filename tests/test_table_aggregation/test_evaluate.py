@@ -1,3 +1,95 @@
+import unittest
+
+from corvid.table.table import Cell, Table
+from corvid.table.vocabulary import Vocabulary
+from corvid.table_aggregation.evaluate import cell_level_recall, \
+    compute_matching_cell_counts, row_level_recall
+
+
+class TestCellLevelRecall(unittest.TestCase):
+    def setUp(self):
+        def _table(rows):
+            return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                                     index_topleft_col=j)
+                                for j, s in enumerate(row)]
+                               for i, row in enumerate(rows)])
+
+        self.gold_table = _table([['subject', 'header1', 'header2'],
+                                  ['x', '1', '2'],
+                                  ['y', '3', '4'],
+                                  ['z', '5', '6']])
+        self.pred_table_extra_rows = _table([['subject', 'header1', 'header2'],
+                                             ['w', '7', '8'],
+                                             ['z', '5', '6'],
+                                             ['x', '1', '2'],
+                                             ['y', '3', '9']])
+        self.pred_table_partial_credit = _table([['subject', 'header1', 'header2'],
+                                                 ['x', '1', '1'],
+                                                 ['y', '4', '4'],
+                                                 ['z', '3', '3']])
+        self.pred_table_empty = _table([['subject', 'header1', 'header2']])
+
+    def test_compute_matching_cell_counts(self):
+        counts = compute_matching_cell_counts(
+            gold_rows=self.gold_table.grid[1:, 1:],
+            pred_rows=self.pred_table_extra_rows.grid[1:, 1:])
+        self.assertEqual(counts.shape, (3, 4))
+        self.assertEqual(counts.nnz, 3)
+        self.assertEqual(counts[0, 2], 2)
+        self.assertEqual(counts[1, 3], 1)
+        self.assertEqual(counts[2, 1], 2)
+
+    def test_modes_agree(self):
+        for pred_table, recall in [(self.gold_table, 1.0),
+                                   (self.pred_table_extra_rows, 5 / 6),
+                                   (self.pred_table_partial_credit, 1 / 3),
+                                   (self.pred_table_empty, 0.0)]:
+            self.assertAlmostEqual(
+                cell_level_recall(self.gold_table, pred_table, mode='exact'),
+                recall)
+            self.assertAlmostEqual(
+                cell_level_recall(self.gold_table, pred_table, mode='fast'),
+                recall)
+
+        with self.assertRaises(ValueError):
+            cell_level_recall(self.gold_table, self.gold_table, mode='slow')
+
+        # same result from `cell_ids` encoded by a shared vocabulary
+        vocabulary = Vocabulary()
+        vocabulary.attach(self.gold_table)
+        vocabulary.attach(self.pred_table_extra_rows)
+        self.assertAlmostEqual(
+            cell_level_recall(self.gold_table, self.pred_table_extra_rows,
+                              mode='fast'), 5 / 6)
+
+
+class TestRowLevelRecall(unittest.TestCase):
+    def _table(self, rows):
+        return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                                 index_topleft_col=j)
+                            for j, s in enumerate(row)]
+                           for i, row in enumerate(rows)])
+
+    def test_cell_ids(self):
+        gold_table = self._table([['', 'a', 'b'], ['x', '1', '2'],
+                                  ['y', '1', '2'], ['z', '3', '4']])
+        pred_table = self._table([['', 'a', 'b'], ['w', '1', '2'],
+                                  ['v', '3', '5'], ['u', '1', '2']])
+        expected = row_level_recall(gold_table, pred_table)
+        self.assertEqual(expected, 2 / 3)
+
+        vocabulary = Vocabulary()
+        vocabulary.attach(gold_table)
+        vocabulary.attach(pred_table)
+        self.assertEqual(row_level_recall(gold_table, pred_table), expected)
+
+        # rows with unknown ids are compared by their strings instead
+        vocabulary = Vocabulary()
+        vocabulary.attach(gold_table)
+        vocabulary.attach(pred_table, is_grow=False)
+        self.assertEqual(row_level_recall(gold_table, pred_table), expected)
+
+
 # """
 #
 #
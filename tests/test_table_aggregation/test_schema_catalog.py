@@ -0,0 +1,53 @@
+import unittest
+
+from corvid.table.table import Cell, Table
+from corvid.table_aggregation.schema_catalog import SchemaCatalog, \
+    extract_ngrams
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                             index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+class TestSchemaCatalog(unittest.TestCase):
+    def setUp(self):
+        self.catalog = SchemaCatalog(schemas=[
+            ['', 'BLEU', 'METEOR'],
+            ['', 'Accuracy', 'F1'],
+            ['', 'Precision', 'Recall', 'F1'],
+            ['', 'Perplexity'],
+            ['']
+        ])
+        self.table = _build_table([['', 'Prec.', 'Rec.', 'F1 score'],
+                                   ['ours', '90.1', '80.2', '85.0']])
+
+    def test_extract_ngrams(self):
+        self.assertListEqual(extract_ngrams(['F1', 'a']),
+                             [' f1', 'f1 ', ' a '])
+
+    def test_shortlist(self):
+        shortlist = self.catalog.shortlist(self.table, k=2)
+        self.assertListEqual([index for index, _ in shortlist], [2, 1])
+        self.assertGreater(shortlist[0][1], shortlist[1][1])
+        self.assertLessEqual(shortlist[0][1], 1.0 + 1e-9)
+
+        no_overlap = _build_table([['', 'xyz'], ['a', '1']])
+        self.assertListEqual(self.catalog.shortlist(no_overlap), [])
+
+    def test_shortlist_many(self):
+        bleu = _build_table([['', 'bleu'], ['ours', '30.1']])
+        shortlists = self.catalog.shortlist_many([self.table, bleu], k=1)
+        self.assertListEqual([s[0][0] for s in shortlists], [2, 0])
+        self.assertAlmostEqual(shortlists[1][0][1],
+                               self.catalog.shortlist(bleu, k=1)[0][1])
+        self.assertListEqual(SchemaCatalog(schemas=[]).shortlist(bleu), [])
+
+    def test_match(self):
+        index, score, column_alignments = self.catalog.match(self.table, k=3)
+        self.assertEqual(index, 2)
+        self.assertIn((3, 3), column_alignments)
+        self.assertEqual(self.catalog.match(
+            _build_table([['', 'xyz'], ['a', '1']]))[0], None)
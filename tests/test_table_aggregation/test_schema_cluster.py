@@ -0,0 +1,68 @@
+import unittest
+
+from corvid.table.table import Cell, Table
+from corvid.table_aggregation.schema_cluster import SchemaClusterer, \
+    extract_header_features, extract_value_features
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                             index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+class TestSchemaClusterer(unittest.TestCase):
+    def setUp(self):
+        self.tables = [
+            _build_table([['', 'BLEU', 'METEOR'], ['ours', '30.1', '25.0'],
+                          ['baseline', '28.0', '24.1']]),
+            _build_table([['', 'Accuracy', 'F1'], ['ours', '90.1', '0.8']]),
+            _build_table([['', 'METEOR', 'BLEU'], ['seq2seq', '24.9', '29.7'],
+                          ['baseline', '24.1', '28.0']]),
+            _build_table([['', 'Accuracy', 'F1 score'],
+                          ['svm', '85.0', '0.7']]),
+            _build_table([['', 'Size', 'Language'], ['WMT', '4M', 'En-De']])
+        ]
+
+    def test_features(self):
+        self.assertSetEqual(extract_header_features(self.tables[3]),
+                            {'accuracy', 'f1', 'score'})
+        self.assertSetEqual(extract_value_features(self.tables[0]),
+                            {'ours', 'baseline'})
+
+    def test_similarity_graph(self):
+        graph = SchemaClusterer(threshold=0.0).compute_similarity_graph(
+            self.tables)
+        self.assertEqual(graph.shape, (5, 5))
+        self.assertEqual((graph != graph.T).nnz, 0)
+        # same header tokens, and half the subjects in common
+        self.assertAlmostEqual(graph[0, 2], 0.75 * 1.0 + 0.25 * 1 / 3)
+        # no features in common, so never scored
+        self.assertEqual(graph[0, 4], 0.0)
+
+    def test_cluster(self):
+        clusterer = SchemaClusterer(threshold=0.3)
+        self.assertListEqual(clusterer.cluster(self.tables),
+                             [[0, 2], [1, 3], [4]])
+        self.assertListEqual(clusterer.cluster([]), [])
+
+    def test_blocking(self):
+        tables = self.tables + [_build_table([['', 'Size'], ['ours', '1M']])]
+        graph = SchemaClusterer(threshold=0.0).compute_similarity_graph(tables)
+        self.assertGreater(graph[0, 1], 0.0)
+        # 'ours' is now shared by too many tables to propose pairs
+        clusterer = SchemaClusterer(threshold=0.0, max_block_size=2)
+        graph = clusterer.compute_similarity_graph(tables)
+        self.assertEqual(graph[0, 1], 0.0)
+        self.assertGreater(graph[1, 3], 0.0)
+
+    def test_aggregate(self):
+        clusterer = SchemaClusterer(threshold=0.3)
+        aggregated = clusterer.aggregate(self.tables, min_cluster_size=2)
+        self.assertEqual(len(aggregated), 2)
+        self.assertEqual(aggregated[0].shape, (5, 3))
+        self.assertListEqual([str(cell) for cell in aggregated[0].grid[0]],
+                             ['', 'BLEU', 'METEOR'])
+        self.assertListEqual([str(cell) for cell in aggregated[0].grid[3]],
+                             ['seq2seq', '29.7', '24.9'])
@@ -1,3 +1,94 @@
+import unittest
+
+from corvid.table.table import Cell, Table
+from corvid.table_aggregation.schema_matcher import ColNameSchemaMatcher, \
+    build_schema_table, compute_column_name_similarity
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                             index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+class TestColNameSchemaMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = ColNameSchemaMatcher()
+        self.target_schema = ['', 'BLEU', 'METEOR']
+        self.tables = [
+            _build_table([['', 'METEOR', 'BLEU'], ['a', '1', '2']]),
+            _build_table([['', 'bleu score', 'Size'], ['b', '3', '4M']]),
+            _build_table([['', 'BLEU'], ['c', '5']])
+        ]
+
+    def test_similarity_cache(self):
+        cache = self.matcher.similarity_cache
+        # not symmetric with fuzzywuzzy's pure-python matcher
+        for a, b in [('dev score of', 'the f1'), ('the f1', 'dev score of')]:
+            self.assertEqual(cache(a, b), compute_column_name_similarity(a, b))
+        # names differing only in case or punctuation share an entry
+        self.assertEqual(cache('Acc.', 'BLEU'), cache('acc', 'bleu'))
+        self.assertIn(('ACC', 'bleu .'), cache)
+
+    def test_compute_column_alignments_many(self):
+        schema_table = build_schema_table(self.target_schema)
+        alignments = self.matcher.compute_column_alignments_many(
+            schema_table, self.tables)
+        self.assertEqual(len(alignments), 3)
+        for table, (score, column_alignments) in zip(self.tables,
+                                                     alignments):
+            expected_score, expected_alignments = \
+                self.matcher.compute_column_alignments_by_column_names(
+                    schema_table, table)
+            self.assertAlmostEqual(score, expected_score)
+            self.assertListEqual(column_alignments, expected_alignments)
+        self.assertListEqual(alignments[0][1], [(0, 0), (1, 2), (2, 1)])
+        self.assertListEqual(
+            self.matcher.compute_column_alignments_many(schema_table, []), [])
+
+    def test_predict_many(self):
+        predicted = self.matcher.predict_many(
+            table_lists=[self.tables[:2], self.tables[2:], []],
+            target_schema=self.target_schema)
+        self.assertEqual(len(predicted), 3)
+        for tables, table in zip([self.tables[:2], self.tables[2:]],
+                                 predicted):
+            expected = self.matcher.predict(tables, self.target_schema)
+            self.assertListEqual([[str(c) for c in row] for row in table.grid],
+                                 [[str(c) for c in row]
+                                  for row in expected.grid])
+        self.assertEqual(predicted[2].shape, (1, 3))
+
+    def test_predict_streams_tables(self):
+        events = []
+        align_rows = self.matcher._align_rows
+        rows_to_table = self.matcher._rows_to_table
+
+        def _align(**kwargs):
+            events.append('align')
+            return align_rows(**kwargs)
+
+        def _build(rows):
+            events.append('build')
+            return rows_to_table(rows)
+
+        def _stream():
+            for table in self.tables:
+                events.append('yield')
+                yield table
+
+        self.matcher._align_rows = _align
+        self.matcher._rows_to_table = _build
+        predicted = self.matcher.predict(_stream(), self.target_schema)
+        # each Table is aligned before the next one is pulled, and the
+        # merged Table is only built once
+        self.assertListEqual(events, ['yield', 'align'] * 3 + ['build'])
+        self.assertListEqual([str(c) for c in predicted.grid[1]],
+                             ['a', '2', '1'])
+        self.assertEqual(predicted.shape, (4, 3))
+
+
 # import unittest
 #
 # from corvid.semantic_table.table import Token, Cell, Table
@@ -0,0 +1,75 @@
+import unittest
+from unittest import mock
+
+from corvid.table.table import Cell, Table
+from corvid.table_filter import table_filter
+from corvid.table_filter.table_filter import TableRelevanceScorer, \
+    DEFAULT_WEIGHTS, filter_tables, predict_table_relevance
+
+
+def _build_table(rows):
+    return Table(grid=[[Cell(tokens=[s] if s else [],
+                             index_topleft_row=i, index_topleft_col=j)
+                        for j, s in enumerate(row)]
+                       for i, row in enumerate(rows)])
+
+
+class TestTableRelevanceScorer(unittest.TestCase):
+    def setUp(self):
+        self.scorer = TableRelevanceScorer()
+        self.results = _build_table([
+            ['', 'BLEU', 'ROUGE'],
+            ['Ours', '32.1', '41.0%'],
+            ['Smith et al. (2017)', '30.5', '39.2%']
+        ])
+        self.hyperparameters = _build_table([
+            ['Parameter', 'Value'],
+            ['optimizer', 'Adam'],
+            ['dropout', 'yes'],
+            ['layers', 'two']
+        ])
+        self.single_row = _build_table([['Accuracy', '92.3', '91.0']])
+
+    def test_score_many(self):
+        scores = self.scorer.score_many([self.results, self.hyperparameters,
+                                         self.single_row])
+        self.assertEqual(scores.shape, (3,))
+        self.assertGreater(scores[0], 0.5)
+        self.assertLess(scores[1], 0.5)
+        self.assertLess(scores[2], 0.5)
+        self.assertAlmostEqual(scores[0], self.scorer.score(self.results))
+        self.assertAlmostEqual(scores[0], predict_table_relevance(self.results))
+        self.assertEqual(self.scorer.score_many([]).shape, (0,))
+
+    def test_max_scores_bound_scores(self):
+        tables = [self.results, self.hyperparameters, self.single_row]
+        for score, max_score in zip(self.scorer.score_many(tables),
+                                    self.scorer.compute_max_scores(tables)):
+            self.assertLessEqual(score, max_score)
+
+    def test_early_exit(self):
+        with mock.patch.object(table_filter, 'compute_cell_features',
+                               wraps=table_filter.compute_cell_features) as f:
+            self.assertFalse(self.scorer.is_relevant(self.single_row, 0.5))
+            self.assertEqual(f.call_count, 0)
+            self.assertTrue(self.scorer.is_relevant(self.results, 0.5))
+            self.assertEqual(f.call_count, 1)
+
+    def test_filter_tables(self):
+        tables = [self.single_row, self.results, self.hyperparameters] * 3
+        self.assertListEqual(
+            list(self.scorer.iter_relevant_tables(tables, min_relevance=0.5,
+                                                  batch_size=2)),
+            [self.results] * 3)
+        self.assertListEqual(filter_tables(tables, min_relevance=0.5),
+                             [self.results] * 3)
+        self.assertListEqual(filter_tables(tables, min_relevance=-1.0),
+                             tables)
+
+    def test_weights(self):
+        with self.assertRaises(ValueError):
+            TableRelevanceScorer(weights={'result_ratio': 1.0})
+        weights = dict(DEFAULT_WEIGHTS, is_too_small=0.0)
+        scorer = TableRelevanceScorer(weights=weights)
+        self.assertGreater(scorer.score(self.single_row),
+                           self.scorer.score(self.single_row))
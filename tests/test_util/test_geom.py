@@ -1,6 +1,11 @@
 import unittest
 
-from corvid.util.geom import Box
+import random
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+from corvid.util.geom import Box, BoxArray
 
 
 class TestBox(unittest.TestCase):
@@ -40,3 +45,65 @@ class TestBox(unittest.TestCase):
         self.assertEqual(box.ll.y, -1.0)
         self.assertEqual(box.ur.x, 2.0)
         self.assertEqual(box.ur.y, 0.9)
+
+
+class TestBoxArray(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.boxes = [Box(llx=-1.0, lly=-0.5, urx=1.0, ury=0.5),
+                      Box(llx=1.1, lly=-1.0, urx=2.0, ury=0.0),
+                      Box(llx=0.0, lly=0.6, urx=0.5, ury=0.9)]
+        for _ in range(30):
+            llx, lly = random.randint(0, 10), random.randint(0, 10)
+            self.boxes.append(Box(llx=llx, lly=lly,
+                                  urx=llx + random.randint(1, 4),
+                                  ury=lly + random.randint(1, 4)))
+        self.box_array = BoxArray.from_boxes(self.boxes)
+
+    def _pairwise(self, func):
+        return np.array([[func(b1, b2) for b2 in self.boxes]
+                         for b1 in self.boxes])
+
+    def test_conversion(self):
+        self.assertEqual(len(self.box_array), len(self.boxes))
+        self.assertListEqual([b.to_json() for b in self.box_array.to_boxes()],
+                             [b.to_json() for b in self.boxes])
+        self.assertListEqual(
+            BoxArray.from_json(self.box_array.to_json()).to_json(),
+            [b.to_json() for b in self.boxes])
+        self.assertEqual(self.box_array[1].to_json(), self.boxes[1].to_json())
+        self.assertEqual(len(self.box_array[:2]), 2)
+        assert_array_equal(self.box_array.height,
+                           [b.height for b in self.boxes])
+        assert_array_equal(self.box_array.width,
+                           [b.width for b in self.boxes])
+
+    def test_predicates(self):
+        assert_array_equal(self.box_array.is_x_overlap(),
+                           self._pairwise(Box.is_x_overlap))
+        assert_array_equal(self.box_array.is_y_overlap(),
+                           self._pairwise(Box.is_y_overlap))
+        assert_array_equal(self.box_array.is_above(),
+                           self._pairwise(Box.is_above))
+
+    def test_min_dist(self):
+        min_x_dist = self.box_array.min_x_dist()
+        is_x_overlap = self.box_array.is_x_overlap()
+        for i, b1 in enumerate(self.boxes):
+            for j, b2 in enumerate(self.boxes):
+                if is_x_overlap[i, j]:
+                    self.assertTrue(np.isnan(min_x_dist[i, j]))
+                else:
+                    self.assertAlmostEqual(min_x_dist[i, j],
+                                           Box.min_x_dist(b1, b2))
+        self.assertAlmostEqual(self.box_array[:1].min_y_dist(
+            self.box_array[2:3])[0, 0], 0.1)
+
+    def test_iou(self):
+        iou = BoxArray(coords=[[0, 0, 2, 2], [1, 1, 3, 3]]).iou()
+        assert_array_almost_equal(iou, [[1.0, 1 / 7], [1 / 7, 1.0]])
+
+    def test_compute_bounding_box(self):
+        self.assertDictEqual(
+            self.box_array.compute_bounding_box().to_json(),
+            Box.compute_bounding_box(boxes=self.boxes).to_json())
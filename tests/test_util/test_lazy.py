@@ -0,0 +1,35 @@
+import sys
+import subprocess
+import unittest
+
+from corvid.util.lazy import lazy_import, LazyModule
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_lazy_import(self):
+        module = lazy_import('corvid.util.lazy')
+        self.assertIs(module, sys.modules['corvid.util.lazy'])
+
+        module = LazyModule('json')
+        self.assertFalse(module.is_loaded)
+        self.assertEqual(module.dumps([1]), '[1]')
+        self.assertTrue(module.is_loaded)
+        self.assertIn('loads', dir(module))
+
+        module = lazy_import('corvid.util.does_not_exist')
+        with self.assertRaises(ImportError):
+            module.anything
+
+    def test_heavy_dependencies_are_deferred(self):
+        code = ('import sys\n'
+                'import corvid.table.table_loader\n'
+                'import corvid.table_aggregation.schema_matcher\n'
+                'import corvid.table_aggregation.evaluate\n'
+                'import corvid.table_aggregation.oracle\n'
+                'heavy = ("scipy", "fuzzywuzzy")\n'
+                'print(" ".join(m for m in sys.modules\n'
+                '               if m.split(".")[0] in heavy))')
+        output = subprocess.run([sys.executable, '-c', code],
+                                stdout=subprocess.PIPE,
+                                universal_newlines=True, check=True).stdout
+        self.assertEqual(output.strip(), '')
@@ -6,8 +6,14 @@
 
 import unittest
 
+import numpy as np
+from scipy.sparse import csr_matrix
+
 from corvid.util.lists import compute_similarity, \
-    compute_best_permutation, compute_union, compute_intersection
+    compute_best_permutation, compute_union, compute_intersection, \
+    compute_best_alignments, compute_best_alignments_sparse, \
+    encode_values, compute_union_array, compute_intersection_array, \
+    compute_intersection_size
 
 
 class TestLists(unittest.TestCase):
@@ -55,6 +61,41 @@ class TestLists(unittest.TestCase):
         self.assertEqual(sim, 2.0)
         self.assertTupleEqual(index_y, (1, 0, 2))
 
+    def test_compute_best_permutation_matches_brute_force(self):
+        random = np.random.RandomState(0)
+        for agg in [sum, np.mean, min, max]:
+            for n in [1, 2, 4, 6]:
+                x = list(random.randint(0, 5, size=n))
+                y = list(random.randint(0, 5, size=n))
+                sim = lambda x_i, y_j: -abs(x_i - y_j)
+                brute_force_sim, _ = compute_best_permutation(
+                    x=x, y=y, sim=sim, agg=lambda sims: agg(sims))
+                solver_sim, index_y = compute_best_permutation(
+                    x=x, y=y, sim=sim, agg=agg)
+                self.assertAlmostEqual(solver_sim, brute_force_sim)
+                self.assertListEqual(sorted(index_y), list(range(n)))
+
+    def test_compute_best_permutation_min_negative(self):
+        sim_matrix = [[-10.0, 10.5, -10.5],
+                      [-10.5, -10.0, 10.5],
+                      [-10.5, -10.5, -10.0]]
+        sim, index_y = compute_best_permutation(
+            x=[0, 1, 2], y=[0, 1, 2], sim=lambda i, j: sim_matrix[i][j],
+            agg=min)
+        self.assertEqual(sim, -10.0)
+        self.assertTupleEqual(index_y, (0, 1, 2))
+
+    def test_compute_best_permutation_size_guard(self):
+        x = list(range(10))
+        with self.assertRaises(ValueError):
+            compute_best_permutation(x=x, y=x, sim=lambda x, y: x == y,
+                                     agg=lambda sims: np.prod(sims))
+        sim, index_y = compute_best_permutation(x=x, y=x,
+                                                sim=lambda x, y: x == y,
+                                                agg=sum)
+        self.assertEqual(sim, 10.0)
+        self.assertTupleEqual(index_y, tuple(range(10)))
+
     def test_compute_union(self):
         x = ['a', 'a', 'b', 'c']
         y = ['a', 'c', 'c', 'd', 'e']
@@ -66,3 +107,49 @@ class TestLists(unittest.TestCase):
         y = ['a', 'a', 'c', 'c', 'd', 'e']
         self.assertListEqual(sorted(compute_intersection(x=x, y=y)),
                              ['a', 'a', 'c'])
+
+    def test_compute_best_alignments_sparse(self):
+        sim_matrix = np.array([[3, 0, 1, 0],
+                               [2, 0, 0, 0],
+                               [0, 0, 0, 0]])
+        score, alignments = compute_best_alignments_sparse(
+            sim_matrix=csr_matrix(sim_matrix))
+        self.assertEqual(score, 3.0)
+        self.assertListEqual(sorted(alignments), [(0, 2), (1, 0)])
+
+        # agrees with dense solver on random rectangular problems
+        random = np.random.RandomState(0)
+        for n_x, n_y in [(5, 8), (8, 5), (6, 6)]:
+            sim_matrix = random.randint(0, 4, size=(n_x, n_y)) * \
+                         (random.rand(n_x, n_y) > 0.6)
+            dense_score, _ = compute_best_alignments(
+                x=list(range(n_x)), y=list(range(n_y)),
+                sim=lambda i, j: sim_matrix[i, j])
+            sparse_score, _ = compute_best_alignments_sparse(
+                sim_matrix=csr_matrix(sim_matrix))
+            self.assertEqual(sparse_score, dense_score)
+
+        self.assertEqual(compute_best_alignments_sparse(
+            sim_matrix=csr_matrix((3, 2))), (0.0, []))
+
+    def test_multiset_arrays(self):
+        vocab = {}
+        x = encode_values(['a', 'a', 'a', 'b', 'c'], vocab)
+        y = encode_values(['a', 'a', 'c', 'c', 'd', 'e'], vocab)
+        self.assertDictEqual(vocab, {'a': 0, 'b': 1, 'c': 2, 'd': 3, 'e': 4})
+        self.assertListEqual(compute_union_array(x, y).tolist(),
+                             [0, 0, 0, 1, 2, 2, 3, 4])
+        self.assertListEqual(compute_intersection_array(x, y).tolist(),
+                             [0, 0, 2])
+        self.assertEqual(compute_intersection_size(x, y), 3)
+        self.assertEqual(compute_intersection_size(x, []), 0)
+
+        # agrees with hashable-item versions
+        random = np.random.RandomState(0)
+        x = random.randint(0, 10, size=50)
+        y = random.randint(5, 20, size=30)
+        self.assertListEqual(compute_union_array(x, y).tolist(),
+                             sorted(compute_union(x.tolist(), y.tolist())))
+        self.assertListEqual(compute_intersection_array(x, y).tolist(),
+                             sorted(compute_intersection(x.tolist(),
+                                                         y.tolist())))
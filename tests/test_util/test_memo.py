@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from corvid.util.memo import SimilarityCache
+
+
+class TestSimilarityCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def sim(a, b):
+            self.calls.append((a, b))
+            return float(len(set(a) & set(b))) / len(set(a) | set(b))
+
+        self.sim = sim
+
+    def test_symmetric_pairs_share_entry(self):
+        cache = SimilarityCache(self.sim, is_symmetric=True)
+        self.assertEqual(cache('abc', 'abd'), 0.5)
+        self.assertEqual(cache('abd', 'abc'), 0.5)
+        self.assertListEqual(self.calls, [('abc', 'abd')])
+        self.assertIn(('abd', 'abc'), cache)
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hit_rate, 0.5)
+
+        cache = SimilarityCache(self.sim)
+        cache('abc', 'abd')
+        cache('abd', 'abc')
+        self.assertEqual(cache.misses, 2)
+
+    def test_normalize(self):
+        cache = SimilarityCache(self.sim, normalize=str.lower)
+        self.assertEqual(cache('ABC', 'abd'), 0.5)
+        self.assertEqual(cache('abc', 'ABD'), 0.5)
+        self.assertListEqual(self.calls, [('abc', 'abd')])
+        self.assertIn(('Abc', 'aBd'), cache)
+
+    def test_lru_eviction(self):
+        cache = SimilarityCache(self.sim, maxsize=2)
+        cache('a', 'b')
+        cache('a', 'c')
+        cache('a', 'b')  # 'a', 'c' is now least recently used
+        cache('a', 'd')
+        self.assertEqual(len(cache), 2)
+        self.assertIn(('a', 'b'), cache)
+        self.assertNotIn(('a', 'c'), cache)
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'sims.json')
+            cache = SimilarityCache(self.sim, path=path, is_symmetric=True)
+            cache('abc', 'abd')
+            cache('x', 'y')
+            cache.save()
+            self.assertListEqual(os.listdir(tmp_dir), ['sims.json'])
+
+            loaded = SimilarityCache(self.sim, path=path, is_symmetric=True)
+            self.assertEqual(len(loaded), 2)
+            self.assertEqual(loaded('abd', 'abc'), 0.5)
+            self.assertEqual(len(self.calls), 2)
+            self.assertEqual(loaded.hits, 1)
+
+            with self.assertRaises(ValueError):
+                SimilarityCache(self.sim, path=path)
+        with self.assertRaises(ValueError):
+            SimilarityCache(self.sim).save()
@@ -0,0 +1,108 @@
+import os
+import sys
+import shutil
+import tempfile
+import textwrap
+import unittest
+
+from corvid.util.omnipage import OmniPageBatchDriver
+
+# stands in for the `omnipage/corvid` binary:  inputs named `flaky*` fail
+# the first time they're seen, inputs named `broken*` always fail, and inputs
+# named `crash*` kill the worker halfway through writing their output
+STUB = textwrap.dedent('''
+    import os, sys
+    manifest = sys.argv[sys.argv.index('-m') + 1]
+    print('XML output')
+    for line in open(manifest):
+        input_path, output_path = line.rstrip('\\n').split('\\t')
+        name = os.path.basename(input_path)
+        marker = input_path + '.seen'
+        if name.startswith('broken') or \\
+                (name.startswith('flaky') and not os.path.exists(marker)):
+            open(marker, 'w').close()
+            print('ERROR\\t{}\\t{}\\t0.010\\tDEAD'.format(
+                input_path, output_path))
+            continue
+        with open(output_path, 'w') as f:
+            f.write('<document')
+            if name.startswith('crash'):
+                f.flush()
+                os._exit(1)
+            f.write('/>')
+        print('OK\\t{}\\t{}\\t0.020'.format(input_path, output_path))
+''')
+
+
+class TestOmniPageBatchDriver(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.stub_path = os.path.join(self.tmp_dir, 'stub.py')
+        with open(self.stub_path, 'w') as f:
+            f.write(STUB)
+        self.input_paths = []
+        for name in ['a', 'b', 'c', 'flaky', 'broken', 'done']:
+            path = os.path.join(self.tmp_dir, name + '.pdf')
+            open(path, 'w').close()
+            self.input_paths.append(path)
+        self.output_dir = os.path.join(self.tmp_dir, 'xml')
+        os.makedirs(self.output_dir)
+        with open(os.path.join(self.output_dir, 'done.xml'), 'w') as f:
+            f.write('<document/>')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_convert_dir(self):
+        driver = OmniPageBatchDriver(command=[sys.executable, self.stub_path],
+                                     num_workers=2, batch_size=2,
+                                     num_retries=1)
+        results = driver.convert_dir(input_paths=self.input_paths,
+                                     output_dir=self.output_dir)
+        self.assertListEqual([r.input_path for r in results],
+                             self.input_paths)
+        self.assertListEqual([r.status for r in results],
+                             ['ok', 'ok', 'ok', 'ok', 'failed', 'skipped'])
+        self.assertListEqual([r.attempts for r in results],
+                             [1, 1, 1, 2, 2, 0])
+        self.assertAlmostEqual(results[0].seconds, 0.02)
+        self.assertEqual(results[4].message, 'error code DEAD')
+        for name in ['a', 'b', 'c', 'flaky']:
+            self.assertTrue(os.path.exists(
+                os.path.join(self.output_dir, name + '.xml')))
+
+    def test_missing_executable(self):
+        driver = OmniPageBatchDriver(
+            command=[os.path.join(self.tmp_dir, 'missing')], num_retries=0)
+        results = driver.convert_dir(input_paths=self.input_paths[:2],
+                                     output_dir=self.output_dir)
+        self.assertListEqual([r.status for r in results],
+                             ['failed', 'failed'])
+
+    def test_one_input_many_outputs(self):
+        driver = OmniPageBatchDriver(command=[sys.executable, self.stub_path],
+                                     batch_size=4)
+        output_paths = [os.path.join(self.output_dir, name)
+                        for name in ['a.xml', 'a.txt']]
+        results = driver.convert([(self.input_paths[0], output_path)
+                                  for output_path in output_paths])
+        self.assertListEqual([r.output_path for r in results], output_paths)
+        self.assertListEqual([r.status for r in results], ['ok', 'ok'])
+        for output_path in output_paths:
+            self.assertTrue(os.path.exists(output_path))
+
+    def test_crash_leaves_no_output(self):
+        crash_path = os.path.join(self.tmp_dir, 'crash.pdf')
+        open(crash_path, 'w').close()
+        driver = OmniPageBatchDriver(command=[sys.executable, self.stub_path],
+                                     batch_size=4, num_retries=0)
+        results = driver.convert_dir(input_paths=[crash_path],
+                                     output_dir=self.output_dir)
+        self.assertEqual(results[0].status, 'failed')
+        self.assertEqual(results[0].message, 'no status reported')
+        self.assertListEqual(os.listdir(self.output_dir), ['done.xml'])
+
+        # a truncated output is never mistaken for a finished one
+        results = driver.convert_dir(input_paths=[crash_path],
+                                     output_dir=self.output_dir)
+        self.assertEqual(results[0].status, 'failed')
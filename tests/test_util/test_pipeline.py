@@ -0,0 +1,108 @@
+import io
+import time
+import threading
+import unittest
+
+from corvid.util.pipeline import Pipeline, Stage, PipelineError
+
+from corvid.table.omnipage_loader import OmniPageTableLoader
+from corvid.semantic_table.semantic_table import IdentitySemanticTable
+from corvid.table_aggregation.schema_matcher import ColNameSchemaMatcher
+
+from tests.test_table.test_omnipage_loader import XML
+
+
+def _square(x: int) -> int:
+    return x * x
+
+
+def _fail_on_three(x: int) -> int:
+    if x == 3:
+        raise KeyError(x)
+    return x
+
+
+class TestPipeline(unittest.TestCase):
+    def test_map_and_filter(self):
+        pipeline = Pipeline(stages=[
+            Stage(name='square', func=_square, num_workers=3),
+            Stage(name='odd', func=lambda x: x if x % 2 else None)
+        ], queue_size=2)
+        self.assertListEqual(sorted(pipeline.run(range(10))),
+                             [1, 9, 25, 49, 81])
+        self.assertEqual(pipeline.stats['square'].num_in, 10)
+        self.assertEqual(pipeline.stats['odd'].num_out, 5)
+        self.assertEqual(pipeline.stats['odd'].to_json()['num_in'], 10)
+        self.assertIn('square', pipeline.format_stats())
+
+    def test_order_is_preserved_with_single_workers(self):
+        pipeline = Pipeline(stages=[Stage(name='a', func=_square),
+                                    Stage(name='b', func=lambda x: x + 1)])
+        self.assertListEqual(list(pipeline.run(range(100))),
+                             [x * x + 1 for x in range(100)])
+
+    def test_batch_and_flatten(self):
+        pipeline = Pipeline(stages=[
+            Stage(name='repeat', func=lambda x: [x] * x, is_flatten=True),
+            Stage(name='sum', func=lambda xs: [sum(xs)], batch_size=4)
+        ])
+        self.assertEqual(sum(pipeline.run([1, 2, 3, 4])), 30)
+        self.assertEqual(pipeline.stats['repeat'].num_out, 10)
+        self.assertEqual(pipeline.stats['sum'].num_in, 10)
+
+    def test_process_executor(self):
+        pipeline = Pipeline(stages=[
+            Stage(name='square', func=_square, num_workers=2,
+                  executor='process')
+        ])
+        self.assertListEqual(sorted(pipeline.run(range(6))),
+                             [0, 1, 4, 9, 16, 25])
+        with self.assertRaises(ValueError):
+            Stage(name='bad', func=_square, executor='gpu')
+
+    def test_exceptions(self):
+        pipeline = Pipeline(stages=[Stage(name='a', func=_fail_on_three,
+                                          skip_exceptions=(KeyError,))])
+        self.assertListEqual(list(pipeline.run(range(5))), [0, 1, 2, 4])
+        self.assertEqual(pipeline.stats['a'].num_skipped, 1)
+
+        pipeline = Pipeline(stages=[Stage(name='a', func=_fail_on_three)])
+        with self.assertRaises(PipelineError):
+            list(pipeline.run(range(5)))
+
+    def test_backpressure(self):
+        num_produced = [0]
+        lock = threading.Lock()
+
+        def _produce():
+            for i in range(1000):
+                with lock:
+                    num_produced[0] += 1
+                yield i
+
+        pipeline = Pipeline(stages=[Stage(name='a', func=_square)],
+                            queue_size=4)
+        outputs = pipeline.run(_produce())
+        next(outputs)
+        time.sleep(0.3)
+        # only a bounded number of items are in flight
+        with lock:
+            self.assertLess(num_produced[0], 20)
+        outputs.close()
+
+    def test_xml_to_aggregated_table(self):
+        pipeline = Pipeline(stages=[
+            Stage(name='load', func=OmniPageTableLoader().iter_tables,
+                  is_flatten=True),
+            Stage(name='normalize',
+                  func=lambda t: IdentitySemanticTable(t).normalized_table,
+                  num_workers=2)
+        ])
+        tables = pipeline.run([io.BytesIO(XML), io.BytesIO(XML)])
+        schema_table = ColNameSchemaMatcher().predict(
+            tables=tables, target_schema=['', 'Accuracy'])
+        self.assertEqual(schema_table.ncol, 2)
+        self.assertEqual(pipeline.stats['load'].num_in, 2)
+        # header + one row from each of the 2 tables in both documents
+        self.assertEqual(schema_table.nrow, 5)
+        self.assertEqual(pipeline.stats['normalize'].num_out, 4)
@@ -0,0 +1,118 @@
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from corvid.table.table import Cell, Table
+from corvid.table.table_loader import TableLoader, CellLoader
+from corvid.semantic_table.semantic_table import LabelCollapseSemanticTable
+from corvid.table_aggregation.schema_matcher import ColNameSchemaMatcher
+from corvid.util.lists import compute_best_alignments
+from corvid.util.profiling import Recorder, recording, span, count, timed, \
+    is_enabled, profile_from_env, PROFILE_ENV_VAR, PROFILE_DIR_ENV_VAR
+
+
+@timed()
+def _add(x: int, y: int) -> int:
+    return x + y
+
+
+class TestProfiling(unittest.TestCase):
+    def test_disabled(self):
+        self.assertFalse(is_enabled())
+        with span('a'):
+            count('b')
+        self.assertEqual(_add(1, 2), 3)
+
+    def test_recording(self):
+        with recording() as recorder:
+            self.assertTrue(is_enabled())
+            with span('outer', size=3):
+                self.assertEqual(_add(1, 2), 3)
+                self.assertEqual(_add(3, 4), 7)
+            count('things', 2)
+            count('things')
+        self.assertFalse(is_enabled())
+
+        summary = recorder.summary()
+        self.assertEqual(summary['_add']['calls'], 2)
+        self.assertEqual(summary['outer']['calls'], 1)
+        self.assertGreaterEqual(summary['outer']['total_seconds'],
+                                summary['_add']['total_seconds'])
+        self.assertEqual(recorder.counters['things'], 3)
+        self.assertIn('_add', recorder.format_summary())
+
+        trace = recorder.to_chrome_trace()
+        outer = [e for e in trace['traceEvents'] if e['name'] == 'outer'][0]
+        self.assertEqual(outer['ph'], 'X')
+        self.assertDictEqual(outer['args'], {'size': 3})
+        self.assertEqual(trace['traceEvents'][-1]['ph'], 'C')
+
+    def test_max_events(self):
+        with recording(Recorder(max_events=1)) as recorder:
+            _add(1, 2)
+            _add(1, 2)
+        self.assertEqual(len(recorder.events), 1)
+        self.assertEqual(recorder.summary()['_add']['calls'], 2)
+
+    def test_instrumented_hot_paths(self):
+        table = Table(grid=[[Cell(tokens=[s], index_topleft_row=i,
+                                  index_topleft_col=j)
+                             for j, s in enumerate(row)]
+                            for i, row in enumerate([['', 'acc'],
+                                                     ['ours', '9.0']])])
+        loader = TableLoader(table_type=Table,
+                             cell_loader=CellLoader(cell_type=Cell))
+        with recording() as recorder:
+            LabelCollapseSemanticTable(table)
+            compute_best_alignments(x=[1, 2], y=[2, 1],
+                                    sim=lambda a, b: a == b)
+            loader.from_json(table.to_json())
+            ColNameSchemaMatcher().merge_two_tables(
+                target=table, source=table,
+                column_alignments=[(0, 0), (1, 1)])
+        names = set(recorder.summary())
+        # Tables are constructed in hot loops, so only their callers are
+        # instrumented
+        self.assertNotIn('Table.__init__', names)
+        for name in ['TableLoader.from_json',
+                     'ColNameSchemaMatcher.merge_two_tables',
+                     'LabelCollapseSemanticTable._classify_cells',
+                     'LabelCollapseSemanticTable._standardize_cell_sizes',
+                     'LabelCollapseSemanticTable._merge_label_cells',
+                     'similarity_matrix', 'linear_sum_assignment']:
+            self.assertIn(name, names)
+
+
+class TestProfileFromEnv(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_profile_from_env(self):
+        env = {PROFILE_ENV_VAR: 'cprofile, tracemalloc,trace',
+               PROFILE_DIR_ENV_VAR: self.tmp_dir}
+        with mock.patch.dict(os.environ, env):
+            with profile_from_env('run'):
+                _add(1, 2)
+        self.assertFalse(is_enabled())
+        self.assertListEqual(sorted(os.listdir(self.tmp_dir)),
+                             ['run.prof', 'run.trace.json',
+                              'run.tracemalloc.txt'])
+        with open(os.path.join(self.tmp_dir, 'run.trace.json')) as f:
+            self.assertEqual(json.load(f)['traceEvents'][0]['name'], '_add')
+
+    def test_unset_or_invalid(self):
+        with mock.patch.dict(os.environ, {PROFILE_DIR_ENV_VAR: self.tmp_dir}):
+            os.environ.pop(PROFILE_ENV_VAR, None)
+            with profile_from_env('run'):
+                pass
+        self.assertListEqual(os.listdir(self.tmp_dir), [])
+        with mock.patch.dict(os.environ, {PROFILE_ENV_VAR: 'gprof'}):
+            with self.assertRaises(ValueError):
+                with profile_from_env('run'):
+                    pass
@@ -0,0 +1,59 @@
+import unittest
+
+import random
+
+from corvid.util.geom import Box
+from corvid.util.spatial_index import BoxIndex
+
+
+class TestBoxIndex(unittest.TestCase):
+    def setUp(self):
+        random.seed(0)
+        self.boxes = []
+        for _ in range(500):
+            llx, lly = random.uniform(0, 600), random.uniform(0, 800)
+            self.boxes.append(Box(llx=llx, lly=lly,
+                                  urx=llx + random.uniform(1, 60),
+                                  ury=lly + random.uniform(1, 12)))
+        self.index = BoxIndex(boxes=self.boxes, node_capacity=8)
+        self.query = Box(llx=100, lly=200, urx=180, ury=230)
+
+    def _dist(self, box1: Box, box2: Box) -> float:
+        dx = max(box1.ll.x - box2.ur.x, box2.ll.x - box1.ur.x, 0.0)
+        dy = max(box1.ll.y - box2.ur.y, box2.ll.y - box1.ur.y, 0.0)
+        return (dx ** 2 + dy ** 2) ** 0.5
+
+    def test_intersect(self):
+        expected = [i for i, b in enumerate(self.boxes)
+                    if b.ll.x <= self.query.ur.x and self.query.ll.x <= b.ur.x
+                    and b.ll.y <= self.query.ur.y and self.query.ll.y <= b.ur.y]
+        self.assertListEqual(self.index.intersect(self.query), expected)
+        self.assertListEqual(BoxIndex(boxes=[]).intersect(self.query), [])
+
+    def test_bands(self):
+        self.assertListEqual(
+            self.index.in_y_band(lly=400, ury=410),
+            [i for i, b in enumerate(self.boxes)
+             if b.ll.y <= 410 and 400 <= b.ur.y])
+        self.assertListEqual(
+            self.index.in_x_band(llx=300, urx=305),
+            [i for i, b in enumerate(self.boxes)
+             if b.ll.x <= 305 and 300 <= b.ur.x])
+
+    def test_nearest(self):
+        nearest = self.index.nearest(self.query, k=10)
+        expected = sorted(self._dist(b, self.query) for b in self.boxes)[:10]
+        self.assertListEqual([self._dist(self.boxes[i], self.query)
+                              for i in nearest], expected)
+
+    def test_above_below(self):
+        self.assertListEqual(
+            sorted(self.index.above(self.query)),
+            [i for i, b in enumerate(self.boxes) if Box.is_above(b, self.query)])
+        self.assertListEqual(
+            sorted(self.index.below(self.query)),
+            [i for i, b in enumerate(self.boxes) if Box.is_above(self.query, b)])
+        above = self.index.above(self.query, k=3)
+        self.assertListEqual(above, self.index.above(self.query)[:3])
+        gaps = [self.boxes[i].ll.y - self.query.ur.y for i in above]
+        self.assertListEqual(gaps, sorted(gaps))
@@ -5,7 +5,12 @@
 
 import unittest
 
-from corvid.util.strings import format_grid
+import numpy as np
+
+from corvid.util.strings import format_grid, tokenize, tokenize_cached, \
+    tokenize_many, count_digits, remove_non_alphanumeric, is_contains_alpha, \
+    is_like_citation, is_like_result, is_floatable, extract_cell_features, \
+    extract_cell_features_many, parse_numbers_many
 
 class TestStrings(unittest.TestCase):
 
@@ -32,4 +37,50 @@ class TestStrings(unittest.TestCase):
         self.assertEqual(format_grid(empty_col).replace(' ', ''), '\n')
 
         empty_grid = [['', ''], ['', '']]
-        self.assertEqual(format_grid(empty_grid).replace(' ', ''), '\t\n\t')
\ No newline at end of file
+        self.assertEqual(format_grid(empty_grid).replace(' ', ''), '\t\n\t')
+
+    def test_tokenize(self):
+        self.assertListEqual(tokenize('Acc. (92.3%)'),
+                             ['Acc', '.', '(', '92.3', '%', ')'])
+        self.assertListEqual(tokenize('0.85±0.02 1,234 F1'),
+                             ['0.85', '±', '0.02', '1,234', 'F1'])
+        self.assertListEqual(tokenize('  '), [])
+        self.assertTupleEqual(tokenize_cached('BLEU-4'), ('BLEU', '-', '4'))
+        self.assertListEqual(tokenize_many(['a b', 'F1', 'a b']),
+                             [['a', 'b'], ['F1'], ['a', 'b']])
+
+    def test_extract_cell_features(self):
+        strings = ['', ' ', 'Accuracy', '0.923', '92.3%', '1', ' 0 ', '12',
+                   'Smith et al. (2017)', 'Smith (2017)', '[12]', 'BLEU-4',
+                   '—', 'nan', '-inf', '+-inf', '1e5', '1,234', '\u0661\u0662',
+                   '0.85\u00b10.02', 'p < .05', 'F1 (%)']
+        for s in strings:
+            text = remove_non_alphanumeric(s)
+            self.assertTupleEqual(
+                tuple(extract_cell_features(s)),
+                (count_digits(s), len(text), count_digits(text),
+                 is_contains_alpha(s), is_like_citation(s), is_like_result(s),
+                 is_floatable(s)))
+        self.assertListEqual(extract_cell_features_many(strings),
+                             [extract_cell_features(s) for s in strings])
+
+    def test_parse_numbers_many(self):
+        strings = ['92.3 %', '0.85 \u00b1 0.02', '1,234.5', '- 3', '1e-3',
+                   '0.85 + / - 0.02 %', '12,34', 'nan', '', 'F1 (%)', '92.3 %']
+        numbers = parse_numbers_many(strings)
+        np.testing.assert_array_equal(
+            numbers.values,
+            [92.3, 0.85, 1234.5, -3.0, 0.001, 0.85, np.nan, np.nan, np.nan,
+             np.nan, 92.3])
+        np.testing.assert_array_equal(
+            numbers.uncertainties,
+            [np.nan, 0.02, np.nan, np.nan, np.nan, 0.02] + [np.nan] * 5)
+        self.assertListEqual(numbers.is_number.tolist(),
+                             [True] * 6 + [False] * 4 + [True])
+        self.assertListEqual(numbers.has_uncertainty.tolist(),
+                             [False, True, False, False, False, True] +
+                             [False] * 5)
+        self.assertListEqual(numbers.is_percent.tolist(),
+                             [True] + [False] * 4 + [True] + [False] * 4 +
+                             [True])
+        self.assertEqual(len(parse_numbers_many([]).values), 0)